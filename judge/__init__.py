@@ -1,14 +1,10 @@
-import typer
+from typing import Any
 
-from judge import configure, download, testcase, testing
 
-app = typer.Typer()
-app.command("download")(download.main)
-app.command("add")(testcase.main)
-app.command("test")(testing.main)
-app.command("conf")(configure.main)
+def __getattr__(name: str) -> Any:
+    # the CLI is loaded on demand, so the library API does not import typer
+    if name == "app":
+        from judge.cli import app
 
-
-@app.callback()
-def callback() -> None:
-    """Judgement tool"""
+        return app
+    raise AttributeError(f"module 'judge' has no attribute '{name}'")
@@ -0,0 +1,222 @@
+"""The library API to embed the judge without the CLI.
+
+Ex) the following runs testcases of the working directory configured by `judge conf`:
+
+    from judge import api
+
+    for history in api.run_tests(api.TestConfig.from_workdir(Path("abc188/a"))):
+        print(history.testcase.name, history.status.name)
+
+Nothing here imports typer or prints, and errors are raised as exceptions.
+"""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+import onlinejudge.utils as oj_utils
+from onlinejudge.type import TestCase
+
+from judge.schema import (
+    CompareMode,
+    History,
+    JudgeConfig,
+    JudgeStatus,
+    TestCasePath,
+    TimerMode,
+)
+from judge.tools import testing
+from judge.tools.download import DownloadArgs, LoginForm, SaveArgs
+from judge.tools.download import download as _download
+from judge.tools.download import save as _save
+from judge.tools.httpcache import ResponseCache
+from judge.tools.utils import CommandNotFoundError
+
+__all__ = [
+    "CommandNotFoundError",
+    "CompareMode",
+    "History",
+    "JudgeStatus",
+    "LoginForm",
+    "ResponseCache",
+    "TestCase",
+    "TestCasePath",
+    "TestConfig",
+    "compare",
+    "download",
+    "get_testcases",
+    "run_tests",
+    "run_tests_async",
+    "save",
+]
+
+DEFAULT_FORMAT = "sample%s.%e"
+
+
+@dataclass(frozen=True)
+class TestConfig:
+    command: str  # e.g. python3 main.py
+    testdir: Path  # directory or zip file
+    tests: Optional[List[Path]] = None  # only these testcases if given
+    format: str = DEFAULT_FORMAT
+    tle: Optional[float] = 2000  # ms
+    mle: Optional[float] = None  # MB. requires GNU time
+    mode: CompareMode = CompareMode.EXACT_MATCH
+    tolerance: Optional[float] = None
+    jobs: Optional[int] = None
+    judge: Optional[str] = None  # special judge command
+    checker: Optional[str] = None  # python file or module exposing `check`
+    interactor: Optional[str] = None
+    transcript: bool = False  # record messages of interactive problems as the output
+    dedupe: bool = False  # hashes all inputs before the first run
+
+    @classmethod
+    def from_workdir(cls, workdir: Path, command: Optional[str] = None) -> "TestConfig":
+        """from_workdir loads `.judgecli` in the working directory.
+
+        command (str): the command of the solution. `python3 <file>` by default
+        :raises ValueError: if the configuration is invalid
+        """
+        config = JudgeConfig.from_toml(workdir)
+        if config.testdir is None:
+            raise ValueError(f"testdir is not configured in {workdir}")
+        if command is None:
+            if config.file is None:
+                raise ValueError(f"file is not configured in {workdir}")
+            command = f"{'pypy3' if config.pypy else 'python3'} {config.file}"
+        return cls(
+            command=command,
+            testdir=Path(config.testdir),
+            tle=config.tle,
+            mle=config.mle,
+            mode=config.mode,
+            tolerance=config.tolerance,
+            jobs=config.jobs,
+        )
+
+    def testing_args(self) -> testing.TestingArgs:
+        return testing.TestingArgs(
+            testcases=get_testcases(self.testdir, self.format, self.tests),
+            command=self.command,
+            gnu_time=TimerMode.GNU_TIME.value,
+            mle=self.mle,
+            tle=self.tle,
+            compare_mode=self.mode,
+            jobs=self.jobs,
+            error=self.tolerance,
+            silent=True,
+            judge=self.judge,
+            checker=self.checker,
+            interactor=self.interactor,
+            transcript=self.transcript,
+            dedupe=self.dedupe,
+        )
+
+
+def get_testcases(
+    testdir: Path, format: str = DEFAULT_FORMAT, tests: Optional[List[Path]] = None
+) -> Sequence[TestCasePath]:
+    return testing.get_testcases(
+        testing.GetTestCasesArgs(test=tests or [], directory=testdir, format=format)
+    )
+
+
+def run_tests(
+    config: TestConfig, *, cancel: Optional[threading.Event] = None
+) -> Iterator[History]:
+    """run_tests yields results of testcases in the order of names.
+
+    cancel (threading.Event): stop after the running testcases when set. closing the iterator also cancels.
+    :raises RuntimeError: if `mle` is given but GNU time is not available
+    :raises CommandNotFoundError: if the command is not found or not executable
+    """
+    histories = testing.test(config.testing_args())
+    try:
+        for history in histories:
+            if cancel is not None and cancel.is_set():
+                return
+            yield history
+    finally:
+        histories.close()
+
+
+async def run_tests_async(
+    config: TestConfig, *, cancel: Optional[threading.Event] = None
+) -> AsyncIterator[History]:
+    """run_tests_async is the async version of `run_tests`. testcases run in a thread.
+
+    Cancelling the task or closing the iterator cancels the testcases not started yet.
+    """
+    loop = asyncio.get_event_loop()
+    queue: "asyncio.Queue[Optional[History]]" = asyncio.Queue()
+    cancel = cancel or threading.Event()
+    errors: List[BaseException] = []
+
+    def _run() -> None:
+        try:
+            for history in run_tests(config, cancel=cancel):
+                loop.call_soon_threadsafe(queue.put_nowait, history)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    worker = loop.run_in_executor(None, _run)
+    try:
+        while True:
+            history = await queue.get()
+            if history is None:
+                break
+            yield history
+        if errors:
+            raise errors[0]
+    finally:
+        cancel.set()
+        await asyncio.wait([worker])
+
+
+def compare(
+    actual: bytes,
+    expected: bytes,
+    mode: CompareMode = CompareMode.EXACT_MATCH,
+    tolerance: Optional[float] = None,
+) -> bool:
+    """compare returns True if the actual output is accepted."""
+    comparater = testing.build_comparater(
+        compare_mode=mode, error=tolerance, judge_command=None, silent=True
+    )
+    return comparater(actual, expected)
+
+
+def download(
+    url: str,
+    *,
+    system: bool = False,
+    login_form: Optional[LoginForm] = None,
+    cookie: Path = oj_utils.default_cookie_path,
+    cache: Optional[ResponseCache] = None,
+) -> List[TestCase]:
+    """
+    :raises SampleParseError: if no testcases are found
+    """
+    return _download(
+        DownloadArgs(
+            url=url, system=system, login_form=login_form, cookie=cookie, cache=cache
+        )
+    )
+
+
+def save(
+    testcases: List[TestCase],
+    directory: Path,
+    *,
+    format: str = "sample-%i.%e",
+    sync: bool = False,
+) -> List[Path]:
+    """
+    :returns: the files written
+    :raises FileExistsError: if files with the different content exist unless `sync`
+    """
+    return _save(testcases, SaveArgs(format=format, directory=directory, sync=sync))
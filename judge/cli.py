@@ -0,0 +1,72 @@
+import importlib
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import click  # type: ignore
+import typer
+from typer.models import CommandInfo
+
+# subcommands are imported when invoked, since their dependencies are slow to import
+SUBCOMMANDS: Dict[str, str] = {
+    "download": "judge.download",
+    "add": "judge.testcase",
+    "test": "judge.testing",
+    "conf": "judge.configure",
+    "stress": "judge.stress",
+    "minimize": "judge.minimize",
+    "complexity": "judge.complexity",
+    "daemon": "judge.daemon",
+}
+
+
+class LazyGroup(click.Group):  # type: ignore
+    """LazyGroup builds the command from `main` of the module in SUBCOMMANDS when invoked."""
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return list(SUBCOMMANDS) + [
+            name for name in super().list_commands(ctx) if name not in SUBCOMMANDS
+        ]
+
+    def get_command(self, ctx: click.Context, name: str) -> Optional[click.Command]:
+        if name not in self.commands and name in SUBCOMMANDS:
+            module: Any = importlib.import_module(SUBCOMMANDS[name])
+            self.add_command(
+                typer.main.get_command_from_info(
+                    CommandInfo(name=name, callback=module.main)
+                ),
+                name,
+            )
+        return super().get_command(ctx, name)
+
+    def invoke(self, ctx: click.Context) -> Any:
+        try:
+            return super().invoke(ctx)
+        except OSError as e:
+            from judge.tools.utils import CommandNotFoundError
+
+            if not isinstance(e, CommandNotFoundError):
+                raise
+            typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+            raise typer.Abort()
+
+
+class Judge(typer.Typer):
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """forward the command to the daemon if running"""
+        from judge.tools.daemon import DISABLE_ENV, FORWARDED_COMMANDS, forward
+
+        argv = sys.argv[1:]
+        if argv and argv[0] in FORWARDED_COMMANDS and not os.environ.get(DISABLE_ENV):
+            returncode = forward(argv)
+            if returncode is not None:
+                sys.exit(returncode)
+        return super().__call__(*args, **kwargs)
+
+
+app = Judge(cls=LazyGroup)
+
+
+@app.callback()
+def callback() -> None:
+    """Judgement tool"""
@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+from pydantic import FilePath, ValidationError
+
+from judge.rendering.complexity import render_estimation
+from judge.schema import JudgeConfig
+from judge.tools.complexity import ComplexityArgs, estimate, measure
+from judge.tools.prompt import to_abs
+from judge.tools.stress import StressError
+
+
+class ComplexityJudgeConfig(JudgeConfig):
+    file: FilePath
+
+
+def parse_sizes(sizes: str) -> List[int]:
+    """parse comma separated sizes, allowing exponential notation like 1e5"""
+    return [int(float(size)) for size in sizes.split(",") if size.strip()]
+
+
+def main(
+    # fmt: off
+    workdir: Path = typer.Argument(".", help="A directory path for working directory"),
+    file: Optional[Path] = typer.Option(None, "-f", help="Solution file path"),
+    gen: Path = typer.Option(..., "--gen", help="Generator file path. It is called as `python3 <gen> <seed> <size>` and prints an input of the size to stdout"),
+    sizes: str = typer.Option("1e3,1e4,1e5", "--sizes", help="Comma separated input sizes. ex: 1e3,1e4,1e5,2e5"),
+    max_n: Optional[float] = typer.Option(None, "--max-n", help="The maximum N of the problem to predict the verdict (default: the maximum of sizes)"),
+    repeat: int = typer.Option(3, "--repeat", help="The number of runs per size"),
+    seed: int = typer.Option(0, "--seed", help="The seed passed to the generator"),
+    mle: Optional[float] = typer.Option(None, "--mle", help="Memory limit (default: 1024 MB)"),
+    tle: Optional[float] = typer.Option(None, "--tle", help="Time limit (default: 2000 ms)"),
+    pypy: bool = typer.Option(False, "--pypy", help="Set if you execute PyPy3 for the solution"),
+    # fmt: on
+) -> None:
+    """
+    Here is empirical complexity estimation from runs over scaled inputs.
+
+    At first, call `judge conf` for configuration.
+
+    Ex) the following leads to estimate the complexity of `a.py` and predict the verdict for N = 2 x 10^5:
+    ```complexity -f a.py --gen gen.py --sizes 1e3,1e4,1e5,2e5```
+    """
+    typer.echo("Load configuration...")
+
+    if not workdir.exists():
+        typer.secho(f"Not exists: {str(workdir.resolve())}", fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    try:
+        config = JudgeConfig.from_toml(workdir)
+    except KeyError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    # fmt: off
+    abspath = to_abs(workdir)
+    _config = config.dict()
+    if file is not None: _config["file"] = abspath(file)  # noqa: E701
+    if mle is not None: _config["mle"] = mle  # noqa: E701
+    if tle is not None: _config["tle"] = tle  # noqa: E701
+    # fmt: on
+    try:
+        config = ComplexityJudgeConfig(**_config)
+    except ValidationError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    try:
+        _sizes = parse_sizes(sizes)
+    except ValueError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+    if len(_sizes) < 2:
+        typer.secho("At least two sizes are required", fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    gen_path = abspath(gen)
+    if not gen_path.exists():
+        typer.secho(f"Not exists: {str(gen_path)}", fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    interpreter = "pypy3" if pypy else "python3"
+    colored_file = typer.style(Path(config.file).name, fg=typer.colors.BRIGHT_CYAN)
+    typer.echo(f"\nMeasuring {colored_file} for N = {', '.join(map(str, _sizes))}...\n")
+    args = ComplexityArgs(
+        generator=f"python3 {gen_path}",
+        command=f"{interpreter} {config.file}",
+        sizes=_sizes,
+        repeat=repeat,
+        seed=seed,
+        tle=config.tle,
+        mle=config.mle,
+        gnu_time="gnu-time",
+        max_n=int(max_n) if max_n is not None else None,
+    )
+    try:
+        measurements = measure(args)
+    except StressError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+    render_estimation(estimate(measurements, args))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,51 @@
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from judge.tools import daemon as daemon_tool
+
+
+def run(argv: List[str]) -> int:
+    """run the command in the process forked by the daemon"""
+    from judge.cli import app
+
+    try:
+        typer.main.get_command(app).main(args=argv, prog_name="judge")
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        return 1
+    return 0
+
+
+def main(
+    # fmt: off
+    socket: Optional[Path] = typer.Option(None, "--socket", help="Unix socket path (default: $JUDGE_SOCKET, $XDG_RUNTIME_DIR/judge.sock or ~/.cache/judge/daemon.sock)"),
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon"),
+    # fmt: on
+) -> None:
+    """
+    Here is the daemon to keep the judge warm.
+
+    While running, `judge test` and `judge download` are forwarded to the daemon,
+    and start without loading modules. Set `JUDGE_NO_DAEMON=1` to run them without the daemon.
+
+    Ex) the following leads to run the daemon in background:
+    ```daemon &```
+    """
+    path = socket or daemon_tool.default_socket_path()
+    if stop:
+        if not daemon_tool.stop(path):
+            typer.secho(f"Not running: {path}", fg=typer.colors.BRIGHT_RED)
+            raise typer.Abort()
+        typer.echo("Stopped")
+        return
+
+    try:
+        daemon_tool.serve(run, path, ready=lambda: typer.echo(f"Listening on {path}"))
+    except RuntimeError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+    except KeyboardInterrupt:
+        pass
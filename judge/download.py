@@ -7,9 +7,13 @@ from pydantic.networks import HttpUrl
 from pydantic.types import DirectoryPath
 
 from judge.schema import JudgeConfig
+from judge.tools.contest import ContestDownloadArgs, download_contest
 from judge.tools.download import DownloadArgs, LoginForm, SaveArgs
 from judge.tools.download import download as download_tool
 from judge.tools.download import save as save_tool
+from judge.tools.httpcache import ResponseCache
+from judge.tools.store import TestCaseStore
+from judge.tools.system import download_system
 
 
 class DownloadJudgeConfig(JudgeConfig):
@@ -29,9 +33,40 @@ def main(
     url: Optional[str] = typer.Option(None, help="a download URL"),
     directory: Path = typer.Option(None, help="a directory path for test cases"),
     no_store: bool = typer.Option(False, help="testcases is shown but not saved"),
+    system: bool = typer.Option(
+        False,
+        help="download system testcases into `in/` and `out/`. interrupted downloads are resumed",
+    ),
     format: str = typer.Option("sample-%i.%e", help="custom filename format"),
+    sync: bool = typer.Option(
+        False, help="overwrite testcases changed instead of failing if already exist"
+    ),
+    shared: bool = typer.Option(
+        False,
+        help="link testcases into the shared store to deduplicate them among problems and workdirs",
+    ),
+    store_dir: Optional[Path] = typer.Option(
+        None,
+        help="directory for the shared store (default: $JUDGE_STORE or ~/.cache/judge/store)",
+    ),
     login: bool = typer.Option(False, help="login into target service"),
     cookie: Path = typer.Option(utils.default_cookie_path, help="directory for cookie"),
+    contest: Optional[str] = typer.Option(
+        None, help="a contest name to download with --all. ex: abc188"
+    ),
+    all_problems: bool = typer.Option(
+        False,
+        "--all",
+        help="configure and download all problems of the contest in `workdir/<problem>`",
+    ),
+    jobs: int = typer.Option(4, help="the number of concurrent downloads with --all"),
+    cache: bool = typer.Option(
+        True,
+        help="reuse problem pages and testcases not modified since the last download",
+    ),
+    offline: bool = typer.Option(
+        False, help="download testcases only from the cache without network"
+    ),
 ) -> None:
     """
     Here is shortcut for download with `online-judge-tools`.
@@ -41,7 +76,34 @@ def main(
 
     Ex) the following leads to download test cases for Problem `C` at `ABC 051`:
     ```download```
+
+    Ex) the following leads to configure and download all problems at `ABC 188`:
+    ```download --contest abc188 --all```
     """
+    if offline and not cache:
+        typer.secho("--offline requires the cache", fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+    response_cache = ResponseCache(offline=offline) if cache else None
+
+    if contest or all_problems:
+        if not (contest and all_problems):
+            typer.secho(
+                "Both --contest and --all are required", fg=typer.colors.BRIGHT_RED
+            )
+            raise typer.Abort()
+        download_all(
+            workdir,
+            contest,
+            format=format,
+            store=TestCaseStore(store_dir) if shared else None,
+            login=login,
+            cookie=cookie,
+            jobs=jobs,
+            cache=response_cache,
+            sync=sync,
+        )
+        return
+
     typer.echo("Load configuration...")
 
     if not workdir.exists():
@@ -74,29 +136,83 @@ def main(
         login_form: Optional[LoginForm] = None
         if login:
             login_form = CLILoginForm()
-        testcases = download_tool(
-            DownloadArgs(
-                url=config.URL,
-                login_form=login_form,
-                cookie=cookie,
-            )
+        args = DownloadArgs(
+            url=config.URL,
+            system=system,
+            login_form=login_form,
+            cookie=cookie,
+            cache=response_cache,
         )
+        if system and not no_store:
+            # streamed to disk with bounded memory if supported
+            paths = download_system(args, Path(config.testdir))
+            if paths is not None:
+                typer.echo(f"{len(paths)} files in {config.testdir}")
+                return
+        testcases = download_tool(args)
     except Exception as e:
         typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
         raise typer.Abort()
 
     if not no_store:
         try:
-            save_tool(
+            saved = save_tool(
                 testcases,
                 SaveArgs(
                     format=format,
                     directory=Path(config.testdir),
+                    store=TestCaseStore(store_dir) if shared else None,
+                    sync=sync,
                 ),
             )
         except Exception as e:
             typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
             raise typer.Abort()
+        typer.echo(f"{len(saved)} files written in {config.testdir}")
+
+
+def download_all(
+    workdir: Path,
+    contest: str,
+    *,
+    format: str,
+    store: Optional[TestCaseStore],
+    login: bool,
+    cookie: Path,
+    jobs: int,
+    cache: Optional[ResponseCache],
+    sync: bool,
+) -> None:
+    typer.echo(f"Download all problems at {contest}")
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        args = ContestDownloadArgs(
+            contest=contest,
+            workdir=workdir.resolve(),
+            cookie=cookie,
+            login_form=CLILoginForm() if login else None,
+            jobs=jobs,
+            format=format,
+            store=store,
+            cache=cache,
+            sync=sync,
+        )
+        failed = False
+        for problem in download_contest(args):
+            if problem.error is not None:
+                failed = True
+                typer.secho(
+                    f"{problem.name}: {problem.error}", fg=typer.colors.BRIGHT_RED
+                )
+            else:
+                typer.echo(
+                    f"{problem.name}: {len(problem.testcases)} testcases in {problem.testdir}"
+                )
+    except Exception as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+    if failed:
+        raise typer.Abort()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+from pydantic import FilePath, ValidationError
+from pydantic.types import DirectoryPath
+
+from judge.schema import CompareMode, JudgeConfig, JudgeStatus
+from judge.tools import archive, format, testing
+from judge.tools.minimize import (
+    MinimizeArgs,
+    Reducer,
+    build_verdict,
+    load_reducer,
+)
+from judge.tools.minimize import minimize as minimize_tool
+from judge.tools.minimize import run_reference
+from judge.tools.prompt import to_abs
+
+
+class MinimizeJudgeConfig(JudgeConfig):
+    file: FilePath
+    testdir: DirectoryPath
+
+
+def main(
+    # fmt: off
+    case: str = typer.Argument(..., help="The name of failing test case. ex: sample-1"),
+    workdir: Path = typer.Argument(".", help="A directory path for working directory"),
+    file: Optional[Path] = typer.Option(None, "-f", help="Solution file path"),
+    ref: Optional[Path] = typer.Option(None, "--ref", help="Reference (brute-force) solution file path to produce expected outputs of reduced inputs. Required to minimize WA"),
+    reducer: str = typer.Option("line,token", "--reducer", help="Comma separated reducers applied in order. (line): remove lines. (token): remove tokens. Otherwise, `module:Class` of judge.tools.minimize.Reducer subclass for structure-aware reduction"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", help="The number of concurrency to evaluate candidate reductions"),
+    tolerance: Optional[float] = typer.Option(None, "--tol", help="Set if problem require correctness within absolute or relative error"),
+    tle: Optional[float] = typer.Option(None, "--tle", help="Time limit (default: 2000 ms)"),
+    mode: Optional[CompareMode] = typer.Option(None, "--mode", help="Compare mode. (exact-match): AC if absolutely same answered. (crlf-insensitive-exact-match): ignore escape format (CR, LF, CRLF). (ignore-spaces): ignore extra spaces. (ignore-spaces-and-newlines): ignore extra spaces and extra new lines."),
+    pypy: bool = typer.Option(False, "--pypy", help="Set if you execute PyPy3 for the solution"),
+    # fmt: on
+) -> None:
+    """
+    Here is shortcut to minimize failing input with preserving the verdict (delta debugging).
+
+    At first, call `judge conf` for configuration.
+
+    Ex) the following leads to minimize `sample-stress1.in` failed by `a.py`:
+    ```minimize sample-stress1 -f a.py --ref brute.py```
+
+    The minimized case is saved next to the original as `<case>-min.in`.
+    """
+    typer.echo("Load configuration...")
+
+    if not workdir.exists():
+        typer.secho(f"Not exists: {str(workdir.resolve())}", fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    try:
+        config = JudgeConfig.from_toml(workdir)
+    except KeyError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    # fmt: off
+    abspath = to_abs(workdir)
+    _config = config.dict()
+    if file is not None: _config["file"] = abspath(file)  # noqa: E701
+    if tle is not None: _config["tle"] = tle  # noqa: E701
+    if mode is not None: _config["mode"] = mode  # noqa: E701
+    if tolerance is not None: _config["tolerance"] = tolerance  # noqa: E701
+    if jobs is not None: _config["jobs"] = jobs  # noqa: E701
+    # fmt: on
+    try:
+        config = MinimizeJudgeConfig(**_config)
+    except ValidationError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    try:
+        reducers: List[Reducer] = [load_reducer(r) for r in reducer.split(",")]
+    except Exception as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    test_dir = Path(config.testdir)
+    testcases = testing.get_testcases(
+        testing.GetTestCasesArgs(
+            test=format.glob_with_samplename(test_dir, case),
+            directory=test_dir,
+            format="sample%s.%e",
+        )
+    )
+    if not testcases or testcases[0].in_path is None:
+        typer.secho(f"Not found test case: {case} in {test_dir}", fg=typer.colors.RED)
+        raise typer.Abort()
+    testcase = testcases[0]
+    assert testcase.in_path is not None
+
+    interpreter = "pypy3" if pypy else "python3"
+    args = MinimizeArgs(
+        command=f"{interpreter} {config.file}",
+        status=JudgeStatus.AC,
+        compare_mode=config.mode,
+        reference=None if ref is None else f"python3 {abspath(ref)}",
+        jobs=config.jobs,
+        tle=config.tle,
+        error=config.tolerance,
+    )
+    data = archive.read_testcase(testcase.in_path)
+
+    # the verdict to be preserved
+    status = build_verdict(args)(data)
+    if status is None:
+        typer.secho("The reference solution is failed.", fg=typer.colors.RED)
+        raise typer.Abort()
+    args.status = status
+    if args.status == JudgeStatus.AC:
+        typer.secho(f"{testcase.name} is not failed.", fg=typer.colors.RED)
+        if ref is None:
+            typer.echo("Pass --ref to minimize WA.")
+        raise typer.Abort()
+
+    colored_status = args.status.value.style()
+    typer.echo(f"\nMinimizing {testcase.name} with preserving {colored_status}...\n")
+    minimized = minimize_tool(data, reducers, args)
+
+    expected: Optional[bytes] = None
+    if args.reference is not None:
+        expected = run_reference(minimized, args)
+        if expected is None:
+            typer.secho(
+                "The reference solution is failed for the minimized input.",
+                fg=typer.colors.RED,
+            )
+            raise typer.Abort()
+
+    in_path = testcase.in_path.with_name(f"{testcase.name}-min.in")
+    with in_path.open("wb") as f:
+        f.write(minimized)
+    typer.echo(f"Saved: {in_path} ({len(data)} bytes -> {len(minimized)} bytes)")
+    if expected is not None:
+        out_path = in_path.with_suffix(".out")
+        with out_path.open("wb") as f:
+            f.write(expected)
+        typer.echo(f"Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
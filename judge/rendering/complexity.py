@@ -0,0 +1,36 @@
+from typer import echo as techo
+from typer import secho
+from typer import style as tstyle
+
+from judge.schema import JudgeStatus
+from judge.tools.complexity import Estimation
+
+MAX_FITS = 3
+
+
+def render_estimation(estimation: Estimation) -> None:
+    techo("=====================================================")
+    techo(f"{'N':>12} {'time (ms)':>12} {'memory (MB)':>12}")
+    for m in estimation.measurements:
+        mem_str = f"{m.max_memory:.02f}" if m.max_memory is not None else "-"
+        elapsed = tstyle(
+            f"{m.best_elapsed:12.02f}",
+            fg=(JudgeStatus.TLE.value.color if m.timeout else None),
+        )
+        techo(f"{m.size:>12} {elapsed} {mem_str:>12}")
+
+    techo("\nTime:")
+    for f in estimation.time_fits[:MAX_FITS]:
+        techo(f"  {f.model:<12} (error: {f.error * 100:.01f} %)")
+    if estimation.memory_fits:
+        techo("Memory:")
+        for f in estimation.memory_fits[:MAX_FITS]:
+            techo(f"  {f.model:<12} (error: {f.error * 100:.01f} %)")
+
+    techo("=====================================================")
+    time_str = f"{estimation.elapsed:.02f}" if estimation.elapsed is not None else "-"
+    mem_str = f"{estimation.memory:.02f}" if estimation.memory is not None else "-"
+    techo(f"predicted for N = {estimation.max_n}: {time_str} ms / {mem_str} MB")
+    if estimation.status is not None:
+        stat = estimation.status.value
+        secho(f"predicted verdict: {stat.name}", fg=stat.color)
@@ -1,17 +1,42 @@
+import contextlib
+import os
+import shutil
 from enum import Enum
 from pathlib import Path
+from typing import IO, Optional, Union
 
+from typer import colors
 from typer import echo as techo
 from typer import secho
 from typer import style as tstyle
 
-from judge.schema import History, JudgeStatus
+from judge.schema import History, JudgeStatus, Mismatch
+from judge.tools import archive
+from judge.tools.diff import bounded_diff, describe
+from judge.tools.excerpt import ExcerptLimits, excerpt, excerpt_file, excerpt_stream
 
+# outputs larger than this are rendered as the diff around the first mismatch
+FULL_OUTPUT_SIZE = 4096  # byte
 
-def file(name: Path) -> str:
-    with name.open("r") as f:
-        data = f.read()
-        return data
+
+def file(name: Path, limits: Optional[ExcerptLimits] = None) -> str:
+    """file reads the head and the tail of the file. the middle of large file is omitted."""
+    if not archive.is_plain(name):
+        with archive.open_testcase(name) as f:
+            return excerpt_stream(f, limits or ExcerptLimits())
+    return excerpt_file(name, limits or ExcerptLimits())
+
+
+def dump_output(history: History, dump_dir: Path) -> Path:
+    """dump_output saves the full actual output instead of rendering it."""
+    os.makedirs(dump_dir, exist_ok=True)
+    path = dump_dir / f"{history.testcase.name}.out"
+    if history.output_path is not None:
+        shutil.copyfile(str(history.output_path), str(path))
+    else:
+        with path.open("wb") as f:
+            f.write(history.output)
+    return path
 
 
 class Verbose(int, Enum):
@@ -34,7 +59,17 @@ class Verbose(int, Enum):
     dd = 0
 
 
-def render_history(history: History, verbose: Verbose) -> None:
+def render_history(
+    history: History,
+    verbose: Verbose,
+    limits: Optional[ExcerptLimits] = None,
+    dump_dir: Optional[Path] = None,
+) -> None:
+    """
+    limits (ExcerptLimits): limits of rendering input, expected output and actual output.
+    dump_dir (Path): if given, actual outputs are saved into it and only paths are rendered.
+    """
+    limits = limits or ExcerptLimits()
 
     stat = history.status.value
     if verbose <= Verbose.error:
@@ -50,7 +85,14 @@ def render_history(history: History, verbose: Verbose) -> None:
                 fg=(stat.color if history.status == JudgeStatus.MLE else None),
             )
 
-            techo(f"[{stat.style()}] {history.testcase.name} / {elapsed} / {memory}")
+            checker = (
+                f" / (Checker) {history.checker_elapsed:.02f} ms"
+                if history.checker_elapsed is not None
+                else ""
+            )
+            techo(
+                f"[{stat.style()}] {history.testcase.name} / {elapsed} / {memory}{checker}"
+            )
 
         if stat not in {JudgeStatus.TLE.value, JudgeStatus.MLE.value}:
             if (
@@ -58,13 +100,73 @@ def render_history(history: History, verbose: Verbose) -> None:
                 and (stat == JudgeStatus.WA.value or stat == JudgeStatus.RE.value)
             ) or verbose <= Verbose.detail:
 
+                if history.checker_message:
+                    techo(f"\nChecker: {history.checker_message.rstrip()}")
+
+                if dump_dir is not None:
+                    render_paths(history, dump_output(history, dump_dir))
+                    return
+
                 techo("\nInput: ")
                 if history.testcase.in_path:
-                    techo(file(history.testcase.in_path))
+                    techo(file(history.testcase.in_path, limits))
+
+                out_path = history.testcase.out_path
+                if history.mismatch is not None and out_path is not None:
+                    if render_mismatch(history, history.mismatch, out_path):
+                        return
 
                 techo("\nExpected output: ")
                 if history.testcase.out_path:
-                    techo(file(history.testcase.out_path))
+                    techo(file(history.testcase.out_path, limits))
 
                 secho("\nOutput: ", fg=stat.color)
-                secho(history.output.decode(), fg=stat.color)
+                if history.output_path is not None:
+                    secho(file(history.output_path, limits), fg=stat.color)
+                else:
+                    secho(excerpt(history.output, limits), fg=stat.color)
+
+
+def render_paths(history: History, output_path: Path) -> None:
+    stat = history.status.value
+    if history.testcase.in_path:
+        techo(f"\nInput: {history.testcase.in_path}")
+    if history.testcase.out_path:
+        techo(f"Expected output: {history.testcase.out_path}")
+    secho(f"Output: {output_path}", fg=stat.color)
+    out_path = history.testcase.out_path
+    if history.mismatch is not None and out_path is not None:
+        render_mismatch(history, history.mismatch, out_path)
+
+
+def render_mismatch(history: History, mismatch: Mismatch, out_path: Path) -> bool:
+    """render_mismatch shows the first mismatch, and the bounded diff if outputs are large.
+
+    :returns: True if the diff is rendered instead of full outputs.
+    """
+    stat = history.status.value
+    expected, actual = describe(mismatch)
+    techo("\nFirst mismatch: ")
+    techo(f"  expected {expected}")
+    secho(f"  but got  {actual}", fg=stat.color)
+
+    if history.output_size <= FULL_OUTPUT_SIZE and not archive.is_larger(
+        out_path, FULL_OUTPUT_SIZE
+    ):
+        return False
+    with contextlib.ExitStack() as stack:
+        # only the lines around the mismatch are read from the files
+        expected_output = stack.enter_context(archive.open_testcase(out_path))
+        actual_output: Union[bytes, IO[bytes]] = history.output
+        if history.output_path is not None:
+            actual_output = stack.enter_context(history.output_path.open("rb"))
+        lines = bounded_diff(actual_output, expected_output, mismatch)
+    techo("\nDiff: ")
+    for line in lines:
+        if line.startswith("+") and not line.startswith("+++"):
+            secho(line, fg=stat.color)
+        elif line.startswith("-") and not line.startswith("---"):
+            secho(line, fg=colors.GREEN)
+        else:
+            techo(line)
+    return True
@@ -0,0 +1,62 @@
+import io
+import linecache
+import os
+import tracemalloc
+
+from typer import colors
+from typer import echo as techo
+from typer import secho
+from typer import style as tstyle
+
+from judge.tools.memprofile import MemProfileResult
+from judge.tools.profile import ProfileResult
+
+MB = 1024 * 1024
+
+
+def render_profile(result: ProfileResult, top: int) -> None:
+    techo("=====================================================")
+    name = tstyle(result.testcase.name, fg=colors.BRIGHT_CYAN)
+    techo(f"Profile for {name}")
+    if result.error is not None or result.stats is None:
+        secho(f"Failed to profile: {result.error}", fg=colors.RED)
+        return
+
+    techo(f"pstats: {result.pstats_path}")
+    if result.collapsed_path is not None:
+        techo(f"collapsed stacks: {result.collapsed_path}")
+
+    stream = io.StringIO()
+    result.stats.stream = stream  # type: ignore
+    result.stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+    techo(stream.getvalue().strip("\n"))
+
+
+def render_memprofile(result: MemProfileResult, top: int) -> None:
+    techo("=====================================================")
+    name = tstyle(result.testcase.name, fg=colors.BRIGHT_CYAN)
+    techo(f"Memory profile for {name}")
+    if result.error is not None or result.snapshot is None:
+        secho(f"Failed to profile memory: {result.error}", fg=colors.RED)
+        return
+
+    techo(f"snapshot: {result.snapshot_path}")
+    stats = result.statistics("lineno")
+    traced = sum(stat.size for stat in stats)
+    peak_str = f"{result.peak / MB:.02f}" if result.peak is not None else "-"
+    techo(f"peak traced: {peak_str} MB / at snapshot: {traced / MB:.02f} MB")
+
+    techo("\nTop allocation sites by size:")
+    for stat in stats[:top]:
+        techo(_format_statistic(stat))
+
+    techo("\nTop allocation sites by count:")
+    for stat in sorted(stats, key=lambda s: s.count, reverse=True)[:top]:
+        techo(_format_statistic(stat))
+
+
+def _format_statistic(stat: tracemalloc.Statistic) -> str:
+    frame = stat.traceback[0]
+    line = linecache.getline(frame.filename, frame.lineno).strip()
+    location = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+    return f"{stat.size / MB:10.02f} MB {stat.count:10d} blocks  {location}  {line}"
@@ -0,0 +1,36 @@
+from typing import List
+
+from typer import echo as techo
+from typer import secho
+from typer import style as tstyle
+
+from judge.schema import JudgeStatus
+from judge.tools.stress import StressCase
+
+
+def render_stress_case(case: StressCase) -> None:
+    if case.status == JudgeStatus.AC:
+        return
+    stat = case.status.value
+    techo("=====================================================")
+    techo(f"[{stat.style()}] seed {case.seed} / (Elapsed) {case.elapsed:.02f} ms")
+    techo("\nInput: ")
+    techo(case.input.decode(errors="replace"))
+    techo("\nExpected output: ")
+    techo(case.expected.decode(errors="replace"))
+    secho("\nOutput: ", fg=stat.color)
+    secho(case.output.decode(errors="replace"), fg=stat.color)
+
+
+def render_stress_summary(cases: List[StressCase], total: float) -> None:
+    """total is the elapsed time in seconds for all iterations"""
+    failures = [case for case in cases if case.status != JudgeStatus.AC]
+    techo("=====================================================")
+    per_minute = len(cases) / total * 60 if total > 0 else 0.0
+    techo(f"{len(cases)} iterations in {total:.02f} s ({per_minute:.0f} / min)")
+    if not failures:
+        tot_result = tstyle("Success:", fg=JudgeStatus.AC.value.color)
+        techo(f"{tot_result} not found failing input")
+    else:
+        tot_result = tstyle("Failure:", fg=JudgeStatus.WA.value.color)
+        techo(f"{tot_result} found {len(failures)} failing input")
@@ -1,13 +1,15 @@
+import zipfile
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional, Tuple, Union
 
-import typer
-from pydantic import DirectoryPath, FilePath, HttpUrl
+from pydantic import DirectoryPath, FilePath, HttpUrl, validator
 from typing_extensions import Literal
 
+from judge.tools.archive import is_zip
 from judge.tools.config import BaseJudgeConfig
+from judge.tools.spill import SpilledOutput
 
 
 @dataclass(frozen=True)
@@ -43,6 +45,8 @@ class BaseJudgeStatus:
     @classmethod
     def style(self) -> str:
         """define output of typer.style"""
+        import typer
+
         return typer.style(self.__str__(), fg=self.color)
 
     @classmethod
@@ -53,27 +57,27 @@ class BaseJudgeStatus:
 
 class AC_(BaseJudgeStatus):
     name = "AC"
-    color = typer.colors.GREEN
+    color = "green"  # typer.colors.GREEN
 
 
 class WA_(BaseJudgeStatus):
     name = "WA"
-    color = typer.colors.RED
+    color = "red"  # typer.colors.RED
 
 
 class RE_(BaseJudgeStatus):
     name = "RE"
-    color = typer.colors.RED
+    color = "red"  # typer.colors.RED
 
 
 class MLE_(BaseJudgeStatus):
     name = "MLE"
-    color = typer.colors.YELLOW
+    color = "yellow"  # typer.colors.YELLOW
 
 
 class TLE_(BaseJudgeStatus):
     name = "TLE"
-    color = typer.colors.YELLOW
+    color = "yellow"  # typer.colors.YELLOW
 
 
 class JudgeStatus(Enum):
@@ -93,13 +97,108 @@ class VerboseStr(str, Enum):
 
 
 @dataclass
+class Mismatch:
+    """the first mismatched token. the token is None if the output ends before it."""
+
+    line: int  # 1-indexed line of the actual output
+    column: int  # 1-indexed column of the actual output
+    expected_line: int
+    expected_column: int
+    actual: Optional[bytes]
+    expected: Optional[bytes]
+
+
 class History:
-    status: JudgeStatus
-    testcase: TestCasePath
-    output: bytes
-    exitcode: int
-    elapsed: float
-    memory: Optional[float] = None
+    """History is the result of a testcase.
+
+    Large outputs can be spilled into a file by `SpilledOutput` to keep memory
+    usage proportional to the number of testcases, not the total output size.
+    """
+
+    __slots__ = (
+        "status",
+        "testcase",
+        "_output",
+        "exitcode",
+        "elapsed",
+        "memory",
+        "mismatch",
+        "checker_elapsed",
+        "checker_message",
+    )
+
+    def __init__(
+        self,
+        status: JudgeStatus,
+        testcase: TestCasePath,
+        output: Union[bytes, "SpilledOutput"],
+        exitcode: Optional[int],
+        elapsed: float,
+        memory: Optional[float] = None,
+        mismatch: Optional[Mismatch] = None,
+        checker_elapsed: Optional[float] = None,
+        checker_message: Optional[str] = None,
+    ) -> None:
+        self.status = status
+        self.testcase = testcase
+        self._output = output
+        self.exitcode = exitcode
+        self.elapsed = elapsed
+        self.memory = memory
+        self.mismatch = mismatch
+        self.checker_elapsed = checker_elapsed  # ms
+        self.checker_message = checker_message
+
+    @property
+    def output(self) -> bytes:
+        """the actual output. the spilled output is read every time."""
+        if isinstance(self._output, SpilledOutput):
+            return self._output.read()
+        return self._output
+
+    @output.setter
+    def output(self, output: Union[bytes, "SpilledOutput"]) -> None:
+        self._output = output
+
+    @property
+    def output_size(self) -> int:
+        if isinstance(self._output, SpilledOutput):
+            return self._output.size
+        return len(self._output)
+
+    @property
+    def output_path(self) -> Optional[Path]:
+        """the path of the spilled output, or None if kept in memory."""
+        if isinstance(self._output, SpilledOutput):
+            return self._output.path
+        return None
+
+    def _fields(self) -> Tuple[Any, ...]:
+        return (
+            self.status,
+            self.testcase,
+            self.output,
+            self.exitcode,
+            self.elapsed,
+            self.memory,
+            self.mismatch,
+            self.checker_elapsed,
+            self.checker_message,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, History):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (
+            f"History(status={self.status!r}, testcase={self.testcase!r}, "
+            f"output_size={self.output_size}, exitcode={self.exitcode!r}, "
+            f"elapsed={self.elapsed!r}, memory={self.memory!r}, mismatch={self.mismatch!r}, "
+            f"checker_elapsed={self.checker_elapsed!r}, "
+            f"checker_message={self.checker_message!r})"
+        )
 
 
 class JudgeConfig(BaseJudgeConfig):
@@ -108,7 +207,7 @@ class JudgeConfig(BaseJudgeConfig):
     file: Optional[FilePath] = None
     contest: Optional[str] = None
     problem: Optional[str] = None
-    testdir: Optional[DirectoryPath] = None
+    testdir: Optional[Union[DirectoryPath, FilePath]] = None  # directory or zip file
     py: bool = True
     pypy: bool = False
     cython: bool = False
@@ -118,3 +217,10 @@ class JudgeConfig(BaseJudgeConfig):
     tolerance: Optional[float] = None
     jobs: Optional[int] = None
     verbose: VerboseStr = VerboseStr.error_detail
+
+    @validator("testdir")
+    def testdir_is_directory_or_zip(cls, v: Optional[Path]) -> Optional[Path]:
+        if v is not None and not v.is_dir():
+            if not (is_zip(v) and zipfile.is_zipfile(str(v))):
+                raise ValueError(f"{v} is neither a directory nor a zip file")
+        return v
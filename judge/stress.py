@@ -0,0 +1,124 @@
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+from pydantic import FilePath, ValidationError
+from pydantic.types import DirectoryPath
+
+from judge.rendering.stress import render_stress_case, render_stress_summary
+from judge.schema import CompareMode, JudgeConfig, JudgeStatus
+from judge.tools.prompt import to_abs
+from judge.tools.stress import StressArgs, StressCase, StressError
+from judge.tools.stress import save_failures as save_tool
+from judge.tools.stress import stress as stress_tool
+
+
+class StressJudgeConfig(JudgeConfig):
+    file: FilePath
+    testdir: DirectoryPath
+
+
+def main(
+    # fmt: off
+    workdir: Path = typer.Argument(".", help="A directory path for working directory"),
+    file: Optional[Path] = typer.Option(None, "-f", help="Solution file path"),
+    gen: Path = typer.Option(..., "--gen", help="Generator file path. It is called as `python3 <gen> <seed>` and prints an input to stdout"),
+    ref: Path = typer.Option(..., "--ref", help="Reference (brute-force) solution file path"),
+    iterations: int = typer.Option(100, "--iterations", help="The number of random inputs"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", help="The number of concurrency"),
+    seed: int = typer.Option(0, "--seed", help="The first seed passed to the generator"),
+    max_failures: int = typer.Option(1, "--max-failures", help="Stop after this number of failing inputs are found"),
+    format: str = typer.Option("sample-stress%i.%e", "--format", help="custom filename format to save failing inputs into test directory"),
+    no_store: bool = typer.Option(False, "--no-store", help="failing inputs are shown but not saved"),
+    tolerance: Optional[float] = typer.Option(None, "--tol", help="Set if problem require correctness within absolute or relative error"),
+    tle: Optional[float] = typer.Option(None, "--tle", help="Time limit (default: 2000 ms)"),
+    mode: Optional[CompareMode] = typer.Option(None, "--mode", help="Compare mode. (exact-match): AC if absolutely same answered. (crlf-insensitive-exact-match): ignore escape format (CR, LF, CRLF). (ignore-spaces): ignore extra spaces. (ignore-spaces-and-newlines): ignore extra spaces and extra new lines."),
+    pypy: bool = typer.Option(False, "--pypy", help="Set if you execute PyPy3 for the solution"),
+    # fmt: on
+) -> None:
+    """
+    Here is randomized differential testing with a generator and a reference solution.
+
+    At first, call `judge conf` for configuration.
+
+    Ex) the following leads to compare `a.py` with `brute.py` for 1000 random inputs:
+    ```stress -f a.py --gen gen.py --ref brute.py --iterations 1000```
+
+    The first failing inputs are saved into test directory.
+    """
+    typer.echo("Load configuration...")
+
+    if not workdir.exists():
+        typer.secho(f"Not exists: {str(workdir.resolve())}", fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    try:
+        config = JudgeConfig.from_toml(workdir)
+    except KeyError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    # fmt: off
+    abspath = to_abs(workdir)
+    _config = config.dict()
+    if file is not None: _config["file"] = abspath(file)  # noqa: E701
+    if tle is not None: _config["tle"] = tle  # noqa: E701
+    if mode is not None: _config["mode"] = mode  # noqa: E701
+    if tolerance is not None: _config["tolerance"] = tolerance  # noqa: E701
+    if jobs is not None: _config["jobs"] = jobs  # noqa: E701
+    # fmt: on
+    try:
+        config = StressJudgeConfig(**_config)
+    except ValidationError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+
+    gen_path = abspath(gen)
+    ref_path = abspath(ref)
+    for path in (gen_path, ref_path):
+        if not path.exists():
+            typer.secho(f"Not exists: {str(path)}", fg=typer.colors.BRIGHT_RED)
+            raise typer.Abort()
+
+    interpreter = "pypy3" if pypy else "python3"
+    colored_file = typer.style(Path(config.file).name, fg=typer.colors.BRIGHT_CYAN)
+    typer.echo(f"\nStress testing {colored_file} for {iterations} iterations...\n")
+
+    cases: List[StressCase] = []
+    begin = time.perf_counter()
+    try:
+        for case in stress_tool(
+            StressArgs(
+                generator=f"python3 {gen_path}",
+                reference=f"python3 {ref_path}",
+                command=f"{interpreter} {config.file}",
+                iterations=iterations,
+                compare_mode=config.mode,
+                jobs=config.jobs,
+                tle=config.tle,
+                error=config.tolerance,
+                max_failures=max_failures,
+                seed=seed,
+            )
+        ):
+            render_stress_case(case)
+            cases.append(case)
+    except StressError as e:
+        typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+    render_stress_summary(cases, time.perf_counter() - begin)
+
+    failures = [case for case in cases if case.status != JudgeStatus.AC]
+    if failures and not no_store:
+        try:
+            saved = save_tool(failures, format, Path(config.testdir))
+        except Exception as e:
+            typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
+            raise typer.Abort()
+        for path in saved:
+            typer.echo(f"Saved: {path}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,17 +1,30 @@
+import functools
+import os
 import subprocess
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Union
 
 import typer
 from pydantic import FilePath, ValidationError
 from pydantic.types import DirectoryPath
 
 from judge.rendering.history import Verbose, render_history
+from judge.rendering.profile import render_memprofile, render_profile
 from judge.rendering.summary import render_summary
 from judge.schema import CompareMode, JudgeConfig, VerboseStr
-from judge.tools import format, testing
+from judge.tools import archive, format, testing
+from judge.tools.discovery import TestCaseIndex
+from judge.tools.excerpt import ExcerptLimits
+from judge.tools.memprofile import MemProfileArgs
+from judge.tools.memprofile import memprofile as memprofile_tool
+from judge.tools.memprofile import select_targets as select_memory_targets
+from judge.tools.profile import PROFILE_TOP, ProfileArgs
+from judge.tools.profile import profile as profile_tool
+from judge.tools.profile import select_targets
 from judge.tools.prompt import to_abs
+from judge.tools.trace import span, tracer
+from judge.tools.utils import interpreter_version
 
 
 class Execution(str, Enum):
@@ -22,9 +35,29 @@ class Execution(str, Enum):
 
 class TestJudgeConfig(JudgeConfig):
     file: FilePath
-    testdir: DirectoryPath
+    testdir: Union[DirectoryPath, FilePath]  # zip files are also accepted
 
 
+def export_trace(command: Callable[..., None]) -> Callable[..., None]:
+    """export_trace records spans of the command if `--trace` is given, and exports them even if aborted."""
+
+    @functools.wraps(command)
+    def wrapper(**kwargs: Any) -> None:
+        trace: Optional[Path] = kwargs.get("trace")
+        if trace is None:
+            return command(**kwargs)
+        tracer.enable()
+        try:
+            return command(**kwargs)
+        finally:
+            tracer.export(trace)
+            tracer.disable()
+            typer.echo(f"Trace is exported: {trace}")
+
+    return wrapper
+
+
+@export_trace
 def main(
     # fmt: off
     workdir: Path = typer.Argument(".", help="A directory path for working directory"),
@@ -35,6 +68,11 @@ def main(
     tolerance: Optional[float] = typer.Option(None, "--tol", help="Set if problem require correctness within absolute or relative error"),
     mle: Optional[float] = typer.Option(None, "--mle", help="Memory limit (default: 1024 MB)"),
     tle: Optional[float] = typer.Option(None, "--tle", help="Time limit (default: 2000 ms)"),
+    judge: Optional[str] = typer.Option(None, "--judge", help="Special judge command for problems with multiple answers. It is called as `<judge> <input> <actual output> <expected output>` and AC if exits with 0."),
+    checker: Optional[str] = typer.Option(None, "--checker", help="Python checker file or module for problems with multiple answers. It exposes `check(input: bytes, actual: bytes, expected: Optional[bytes])` which returns bool or `judge.tools.checker.Verdict`, and is imported only once."),
+    checker_processes: Optional[int] = typer.Option(None, "--checker-processes", help="Run the python checker in a pool of the processes for heavy checkers"),
+    interactor: Optional[str] = typer.Option(None, "--interactor", help="Interactor command for interactive problems. It is called as `<interactor> <input> [<expected output>]` with stdin and stdout connected to the solution, and AC if exits with 0."),
+    transcript: bool = typer.Option(False, "--transcript", help="Record messages of interactive problems and show them as the output instead of stderr of the solution"),
     mode: CompareMode = typer.Option(CompareMode.EXACT_MATCH.value, "--mode", help="Compare mode. (exact-match): AC if absolutely same answered. (crlf-insensitive-exact-match): ignore escape format (CR, LF, CRLF). (ignore-spaces): ignore extra spaces. (ignore-spaces-and-newlines): ignore extra spaces and extra new lines."),
     # additional option
     verbose: VerboseStr = typer.Option(VerboseStr.error_detail, "-v", "--verbose", help="Verbosity. (error): show only wrong answered testcase filename. (error-detail): show only wrong answered outputs. (all): show all sample status and wrong answered outputs. (detail): all answered status and outputs. (dd): only reserved. now same as `detail`"),
@@ -42,6 +80,18 @@ def main(
     pypy: bool = typer.Option(False, "--pypy", help="Set if you execute PyPy3"),
     cython: bool = typer.Option(False, "--cython", help="Set if you execute Cython3"),
     jobs: Optional[int] = typer.Option(None, "--jobs", help="Only reserved for the number of concurrency for testing"),
+    dedupe: bool = typer.Option(False, "--dedupe/--no-dedupe", help="Execute testcases with the identical input only once, and compare the output with each expected output. All inputs are hashed before the first run"),
+    # rendering option
+    head_lines: int = typer.Option(ExcerptLimits.head_lines, "--head-lines", help="The number of first lines shown for input and outputs"),
+    tail_lines: int = typer.Option(ExcerptLimits.tail_lines, "--tail-lines", help="The number of last lines shown for input and outputs"),
+    head_bytes: int = typer.Option(ExcerptLimits.head_bytes, "--head-bytes", help="The number of first bytes shown for input and outputs"),
+    tail_bytes: int = typer.Option(ExcerptLimits.tail_bytes, "--tail-bytes", help="The number of last bytes shown for input and outputs"),
+    dump_dir: Optional[Path] = typer.Option(None, "--dump-dir", help="Save full outputs into the directory instead of showing them"),
+    # profiling option
+    profile: Optional[str] = typer.Option(None, "--profile", help="Re-run testcases under cProfile. (slowest): the slowest testcase. (tle): all TLE testcases. Otherwise, the name of testcase. `.pstats` and collapsed stacks are saved into working directory."),
+    memprofile: bool = typer.Option(False, "--memprofile", help="Re-run MLE testcases (or the max memory testcase if no MLE) with tracemalloc. The snapshot is saved into working directory. Only for Python3."),
+    profile_top: int = typer.Option(PROFILE_TOP, "--profile-top", help="The number of rows shown in the profile and the memory profile"),
+    trace: Optional[Path] = typer.Option(None, "--trace", help="Export the timeline of judge phases (config load, discovery, spawn, run, compare and rendering) per worker thread as Chrome trace-event JSON"),
     # fmt: on
 ) -> None:
     """
@@ -56,6 +106,7 @@ def main(
     If not found test cases, you could let download them.
     """
     typer.echo("Load configuration...")
+    tracer.begin("load config")
 
     if not workdir.exists():
         typer.secho(f"Not exists: {str(workdir.resolve())}", fg=typer.colors.BRIGHT_RED)
@@ -87,6 +138,7 @@ def main(
     except ValidationError as e:
         typer.secho(str(e), fg=typer.colors.BRIGHT_RED)
         raise typer.Abort()
+    tracer.end()
 
     typer.echo("Check for test cases...")
     test_dir = Path(config.testdir)
@@ -122,25 +174,18 @@ def main(
     if py:
         execs.append(f"python3 {file.name}")
         typer.secho("- Python3: ", fg=typer.colors.BRIGHT_CYAN)
-        err = subprocess.run(["python3", "-V"])
-        if err.returncode:
-            typer.secho(err.stderr.decode(), fg=typer.colors.BRIGHT_RED)
-            raise typer.Abort()
+        print_version("python3")
     if pypy:
         execs.append(f"pypy3 {file.name}")
         typer.secho("- PyPy3: ", fg=typer.colors.BRIGHT_CYAN)
-        err = subprocess.run(["pypy3", "-V"])
-        if err.returncode:
-            typer.secho(err.stderr.decode(), fg=typer.colors.BRIGHT_RED)
-            raise typer.Abort()
+        print_version("pypy3")
     # if cython:
     # pass
     if not execs:
         execs.append(f"python3 {file.name}")
 
-    if case is None:
-        tests: List[Path] = []
-    else:
+    tests: List[Path] = []
+    if case is not None and not archive.is_zip(test_dir):
         # collect test cases path manually
         tests = format.glob_with_samplename(test_dir, case)
         if not tests:
@@ -157,6 +202,14 @@ def main(
             ignore_backup=True,
         )
     )
+    if case is not None and isinstance(testcases, TestCaseIndex):
+        # members of the zip file are selected through its index
+        testcases = testcases.select(case)
+        if not testcases:
+            typer.secho(
+                f"Not found test case: {case} in {test_dir}", fg=typer.colors.RED
+            )
+            raise typer.Abort()
     if not testcases:
         typer.secho("Not found test cases", fg=typer.colors.RED)
         raise typer.Abort()
@@ -165,6 +218,12 @@ def main(
     if _verbose is None:
         typer.secho("invalid verbose", fg=typer.colors.RED)
         raise typer.Abort()
+    limits = ExcerptLimits(
+        head_lines=head_lines,
+        tail_lines=tail_lines,
+        head_bytes=head_bytes,
+        tail_bytes=tail_bytes,
+    )
 
     for prog in execs:
         colored_prog = typer.style(prog.split(" ", 1)[0], fg=typer.colors.BRIGHT_CYAN)
@@ -180,16 +239,70 @@ def main(
                 jobs=config.jobs,
                 error=config.tolerance,
                 silent=True,
+                judge=judge,
+                checker=checker,
+                checker_processes=checker_processes,
+                interactor=interactor,
+                transcript=transcript,
+                dedupe=dedupe,
             )
         )
         _histories = []
+        # separate outputs of each executions
+        prog_dump_dir = (
+            dump_dir / os.path.basename(prog.split(" ", 1)[0]) if dump_dir else None
+        )
 
         for history in histories:
-            render_history(history, _verbose)
+            with span("render", case=history.testcase.name):
+                render_history(history, _verbose, limits, prog_dump_dir)
             _histories.append(history)
 
         if _histories:
-            render_summary(_histories)
+            with span("render summary"):
+                render_summary(_histories)
+
+        if profile is not None:
+            targets = select_targets(_histories, profile)
+            if not targets:
+                typer.secho(
+                    f"Not found test case to profile: {profile}", fg=typer.colors.RED
+                )
+            for target in targets:
+                result = profile_tool(
+                    ProfileArgs(
+                        history=target,
+                        command=prog,
+                        directory=Path(config.workdir),
+                        tle=config.tle,
+                    )
+                )
+                render_profile(result, profile_top)
+
+        if memprofile:
+            targets = select_memory_targets(_histories)
+            if not targets:
+                typer.secho(
+                    "Not found test case to profile memory", fg=typer.colors.RED
+                )
+            for target in targets:
+                mem_result = memprofile_tool(
+                    MemProfileArgs(
+                        history=target,
+                        command=prog,
+                        directory=Path(config.workdir),
+                        tle=config.tle,
+                    )
+                )
+                render_memprofile(mem_result, profile_top)
+
+
+def print_version(command: str) -> None:
+    version = interpreter_version(command)
+    if version is None:
+        typer.secho(f"Failed to run: {command}", fg=typer.colors.BRIGHT_RED)
+        raise typer.Abort()
+    typer.echo(version)
 
 
 if __name__ == "__main__":
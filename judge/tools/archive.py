@@ -0,0 +1,200 @@
+import contextlib
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import IO, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1 << 16  # byte
+
+# compressed testcases like `sample-1.in.xz` in plain directories
+DECOMPRESSORS: Dict[str, Callable[[str], IO[bytes]]] = {
+    ".gz": lambda path: gzip.open(path, "rb"),  # type: ignore
+    ".xz": lambda path: lzma.open(path, "rb"),
+}
+
+
+def strip_compression(name: str) -> str:
+    """strip_compression removes the suffix of the compression. e.g. `1.in.xz` -> `1.in`"""
+    base, ext = os.path.splitext(name)
+    return base if ext in DECOMPRESSORS else name
+
+
+def is_zip(path: Path) -> bool:
+    return path.suffix == ".zip" and path.is_file()
+
+
+def _signature(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class ZipArchive:
+    """ZipArchive is the index of members of the zip file.
+
+    The central directory is read only once. Members are opened independently by parallel workers,
+    and only the raw reads from the shared file are serialized; decompression runs in parallel.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.signature = _signature(path)
+        self._zipfile = zipfile.ZipFile(str(path))
+        self.members: Dict[str, zipfile.ZipInfo] = {
+            info.filename: info
+            for info in self._zipfile.infolist()
+            if not info.is_dir()
+        }
+
+    def open(self, member: str) -> IO[bytes]:
+        return self._zipfile.open(self.members[member])
+
+    def close(self) -> None:
+        # members still opened keep the file until they are closed
+        self._zipfile.close()
+
+
+_archives: Dict[Path, ZipArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def open_archive(path: Path) -> ZipArchive:
+    """open_archive returns the shared index of the zip file.
+
+    The index is rebuilt when the zip file is replaced, which is detected by the size and mtime.
+    """
+    signature = _signature(path)
+    with _archives_lock:
+        archive = _archives.get(path)
+        if archive is None or archive.signature != signature:
+            if archive is not None:
+                archive.close()
+            archive = ZipArchive(path)
+            _archives[path] = archive
+    return archive
+
+
+def find_archive(path: Path) -> Optional[Tuple[Path, str]]:
+    """
+    :returns: the zip file and the name of the member if the path is inside the zip file.
+    """
+    for parent in path.parents:
+        if parent in _archives or is_zip(parent):
+            return parent, path.relative_to(parent).as_posix()
+    return None
+
+
+def is_plain(path: Path) -> bool:
+    """is_plain returns True if the testcase is neither compressed nor archived."""
+    return path.suffix not in DECOMPRESSORS and find_archive(path) is None
+
+
+def open_testcase(path: Path) -> IO[bytes]:
+    """open_testcase opens the testcase as the stream of decompressed bytes."""
+    found = find_archive(path)
+    if found is not None:
+        archive, member = found
+        return open_archive(archive).open(member)
+    decompressor = DECOMPRESSORS.get(path.suffix)
+    if decompressor is not None:
+        return decompressor(str(path))
+    return path.open("rb")
+
+
+def is_larger(path: Path, size: int) -> bool:
+    """is_larger returns True if the decompressed testcase is larger than `size` bytes, without reading the rest."""
+    if is_plain(path):
+        return path.stat().st_size > size
+    with open_testcase(path) as f:
+        return len(f.read(size + 1)) > size
+
+
+def read_testcase(path: Path) -> bytes:
+    with open_testcase(path) as f:
+        return f.read()
+
+
+def _pump(source: IO[bytes], fd: int) -> None:
+    try:
+        with source, os.fdopen(fd, "wb") as sink:
+            shutil.copyfileobj(source, sink, CHUNK_SIZE)
+    except BrokenPipeError:
+        # the solution exits without reading all input
+        pass
+
+
+@contextlib.contextmanager
+def stdin_for(path: Path) -> Iterator[BinaryIO]:
+    """stdin_for opens the testcase as stdin of child processes.
+
+    Compressed testcases are decompressed into a pipe by a thread, and never extracted to disk.
+    """
+    if is_plain(path):
+        with path.open("rb") as f:
+            yield f
+        return
+    source = open_testcase(path)
+    read_fd, write_fd = os.pipe()
+    thread = threading.Thread(target=_pump, args=(source, write_fd), daemon=True)
+    thread.start()
+    try:
+        with os.fdopen(read_fd, "rb") as f:
+            yield f
+    finally:
+        thread.join()
+
+
+@contextlib.contextmanager
+def anonymous_file(data: bytes, name: str) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+    """
+    :returns: the path of the file readable by child processes and file descriptors to be inherited
+    """
+    memfd_create = getattr(os, "memfd_create", None)  # Linux and Python 3.8+
+    if memfd_create is not None:
+        fd: int = memfd_create(name)
+        try:
+            with os.fdopen(fd, "wb", closefd=False) as f:
+                f.write(data)
+            yield f"/dev/fd/{fd}", (fd,)
+        finally:
+            os.close(fd)
+    elif os.path.isdir("/dev/fd"):
+        with tempfile.TemporaryFile() as fh:
+            fh.write(data)
+            fh.flush()
+            fh.seek(0)
+            yield f"/dev/fd/{fh.fileno()}", (fh.fileno(),)
+    else:
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / name
+            with path.open("wb") as fh:
+                fh.write(data)
+            yield str(path), ()
+
+
+@contextlib.contextmanager
+def materialize(paths: List[Optional[Path]]) -> Iterator[Tuple[List[str], List[int]]]:
+    """materialize gives paths of testcases to child processes.
+
+    Compressed or archived testcases are decompressed into in-memory files.
+    :returns: the paths ("" for None) and file descriptors to be inherited
+    """
+    with contextlib.ExitStack() as stack:
+        names: List[str] = []
+        fds: List[int] = []
+        for path in paths:
+            if path is None:
+                names.append("")
+            elif is_plain(path):
+                names.append(str(path.resolve()))
+            else:
+                name, pass_fds = stack.enter_context(
+                    anonymous_file(read_testcase(path), strip_compression(path.name))
+                )
+                names.append(name)
+                fds.extend(pass_fds)
+        yield names, fds
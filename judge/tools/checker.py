@@ -0,0 +1,143 @@
+import concurrent.futures
+import importlib
+import importlib.util
+import os
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from judge.tools.archive import read_testcase
+from judge.tools.comparator import Checker
+
+
+@dataclass(frozen=True)
+class Verdict:
+    accepted: bool
+    message: str = ""
+
+
+CheckResult = Union[bool, Verdict]
+CheckFunction = Callable[[bytes, bytes, Optional[bytes]], CheckResult]
+
+
+def load_check(name: str) -> CheckFunction:
+    """load_check imports `check` from the python file or the module.
+
+    The checker module exposes the following function,
+    `check(input: bytes, actual: bytes, expected: Optional[bytes]) -> Union[bool, Verdict]`
+    """
+    if name.endswith(".py") or os.path.sep in name:
+        path = Path(name).resolve()
+        spec = importlib.util.spec_from_file_location(
+            f"_judge_checker_{path.stem}", path
+        )
+        if spec is None or spec.loader is None:
+            raise ImportError(f"cannot load checker: {name}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(name)
+    check = getattr(module, "check", None)
+    if not callable(check):
+        raise TypeError(f"{name} doesn't have the function `check`")
+    return check  # type: ignore
+
+
+def to_verdict(result: CheckResult) -> Verdict:
+    if isinstance(result, Verdict):
+        return result
+    return Verdict(accepted=bool(result))
+
+
+# the checker loaded once per worker process
+_worker_check: Optional[CheckFunction] = None
+
+
+def _init_worker(name: str) -> None:
+    global _worker_check
+    _worker_check = load_check(name)
+
+
+def _check_in_worker(input: bytes, actual: bytes, expected: Optional[bytes]) -> Verdict:
+    assert _worker_check is not None
+    return to_verdict(_worker_check(input, actual, expected))
+
+
+class PythonChecker(Checker):
+    """PythonChecker calls `check` of the checker module in process.
+
+    If `processes` is given, checks are dispatched to the process pool
+    for heavy checkers. The module is imported once per process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        processes: Optional[int] = None,
+        *,
+        check: Optional[CheckFunction] = None,
+        executor: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+        input_path: Optional[Path] = None,
+        expected_output_path: Optional[Path] = None,
+    ) -> None:
+        """
+        name (str): path of the python file or the module name
+        """
+        self.name = name
+        self.processes = processes
+        self.check = check or load_check(name)
+        if executor is None and processes:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes, initializer=_init_worker, initargs=(name,)
+            )
+        self.executor = executor
+        self.input_path = input_path
+        self.expected_output_path = expected_output_path
+        self.message = ""
+        self._input: Optional[bytes] = None  # read once per bound testcase
+
+    def bind(self, input_path: Path, expected_output_path: Optional[Path]) -> Checker:
+        return PythonChecker(
+            self.name,
+            self.processes,
+            check=self.check,
+            executor=self.executor,
+            input_path=input_path,
+            expected_output_path=expected_output_path,
+        )
+
+    def read_input(self) -> bytes:
+        if self._input is None:
+            self._input = b""
+            if self.input_path is not None:
+                self._input = read_testcase(self.input_path)
+        return self._input
+
+    def __call__(self, actual: bytes, expected: bytes) -> bool:
+        """
+        expected (bytes): the expected output already read by the caller. ignored if the testcase has no output.
+        :returns: False with the traceback as the message if `check` raises an exception.
+        """
+        input = self.read_input()
+        expected_output = expected if self.expected_output_path is not None else None
+
+        begin = time.perf_counter()
+        try:
+            if self.executor is not None:
+                verdict = self.executor.submit(
+                    _check_in_worker, input, actual, expected_output
+                ).result()
+            else:
+                verdict = to_verdict(self.check(input, actual, expected_output))
+        except Exception:
+            # the broken checker rejects only this testcase
+            verdict = Verdict(accepted=False, message=traceback.format_exc())
+        self.elapsed = 1000 * (time.perf_counter() - begin)
+        self.message = verdict.message
+        return verdict.accepted
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
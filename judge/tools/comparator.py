@@ -1,7 +1,42 @@
 import abc
+import contextlib
+import math
+import re
+import shlex
+import sys
+from array import array
 from decimal import Decimal, InvalidOperation
+from itertools import zip_longest
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterator, List, Match, Optional, Pattern, Sequence, Set, Tuple
+
+from judge.schema import Mismatch
+from judge.tools import archive
+from judge.tools.utils import exec_command
+
+# numpy is optional, and imported when floating point numbers are compared at first
+np: Any = ...
+
+
+def _numpy() -> Any:
+    global np
+    if np is ...:
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover
+            np = None
+    return np
+
+
+# relative error of float parsing and arithmetic, with some margin
+FLOAT_EPSILON = 8 * sys.float_info.epsilon
+
+# stream comparators canonicalize outputs by chunks of this size
+CHUNK_SIZE = 1 << 20
+
+# the judge command may be slower than the solution, but never hangs
+JUDGE_TIMEOUT_SCALE = 10
+DEFAULT_JUDGE_TIMEOUT = 60 * 1000  # ms. used if no time limit is given
 
 
 class OutputComparator(abc.ABC):
@@ -12,11 +47,20 @@ class OutputComparator(abc.ABC):
         """
         ...  # pragma: no cover
 
+    def locate(self, actual: bytes, expected: bytes) -> Optional[Mismatch]:
+        """
+        :returns: the first mismatched token, or None if matched or not supported.
+        """
+        return None
+
 
 class ExactComparator(OutputComparator):
     def __call__(self, actual: bytes, expected: bytes) -> bool:
         return actual == expected
 
+    def locate(self, actual: bytes, expected: bytes) -> Optional[Mismatch]:
+        return _locate_exact_mismatch(actual, expected)
+
 
 class FloatingPointNumberComparator(OutputComparator):
     def __init__(self, *, rel_tol: float = 1e-09, abs_tol: float = 0.0):
@@ -49,6 +93,167 @@ class FloatingPointNumberComparator(OutputComparator):
         )
 
 
+class BulkFloatingPointNumberComparator(OutputComparator):
+    def __init__(
+        self, *, rel_tol: float = 1e-09, abs_tol: float = 0.0, split_lines: bool = True
+    ):
+        """
+        Fast version of the following comparators for large outputs,
+        - split_lines=True: CRLFInsensitiveComparator(SplitLinesComparator(SplitComparator(FloatingPointNumberComparator)))
+        - split_lines=False: CRLFInsensitiveComparator(SplitComparator(FloatingPointNumberComparator))
+
+        Tokens which differ textually are parsed in bulk into float arrays (NumPy if available)
+        and compared at once. Only the tokens which are not finite floats or are near the tolerance
+        boundary are compared by FloatingPointNumberComparator with `Decimal`, so the result is the same.
+        """
+        self.word_comparator = FloatingPointNumberComparator(
+            rel_tol=rel_tol, abs_tol=abs_tol
+        )
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.split_lines = split_lines
+
+    def __call__(self, actual: bytes, expected: bytes) -> bool:
+        tokens = self.tokenize(actual, expected)
+        if tokens is None:
+            return False
+        actual_words, expected_words = tokens
+        # textually identical tokens are accepted without parsing
+        differ = [i for i, (x, y) in enumerate(zip(*tokens)) if x != y]
+        actual_words = [actual_words[i] for i in differ]
+        expected_words = [expected_words[i] for i in differ]
+        if _numpy() is not None:
+            uncertain = self._compare_numpy(actual_words, expected_words)
+        else:
+            uncertain = self._compare_array(actual_words, expected_words)
+        if uncertain is None:
+            return False
+        for i in uncertain:
+            if not self.word_comparator(actual_words[i], expected_words[i]):
+                return False
+        return True
+
+    def locate(self, actual: bytes, expected: bytes) -> Optional[Mismatch]:
+        if self.split_lines:
+            return _locate_line_mismatch(actual, expected, self.word_comparator)
+        return _locate_word_mismatch(actual, expected, self.word_comparator)
+
+    def tokenize(
+        self, actual: bytes, expected: bytes
+    ) -> Optional[Tuple[List[bytes], List[bytes]]]:
+        """
+        :returns: all tokens of both, or None if the structure (the number of lines and tokens) differs.
+        """
+        if not self.split_lines:
+            # bytes.split() also removes '\r'
+            actual_words = actual.split()
+            expected_words = expected.split()
+            if len(actual_words) != len(expected_words):
+                return None
+            return actual_words, expected_words
+
+        actual_lines = actual.replace(b"\r\n", b"\n").rstrip(b"\n").split(b"\n")
+        expected_lines = expected.replace(b"\r\n", b"\n").rstrip(b"\n").split(b"\n")
+        if len(actual_lines) != len(expected_lines):
+            return None
+        actual_words = []
+        expected_words = []
+        for x, y in zip(actual_lines, expected_lines):
+            xs = x.split()
+            ys = y.split()
+            if len(xs) != len(ys):
+                return None
+            actual_words += xs
+            expected_words += ys
+        return actual_words, expected_words
+
+    def _compare_numpy(
+        self, actual_words: List[bytes], expected_words: List[bytes]
+    ) -> Optional[List[int]]:
+        """
+        :returns: indices of tokens to be compared with `Decimal`, or None if any token is wrong.
+        """
+        if not actual_words:
+            return []
+        np = _numpy()
+        x, x_fallback = _parse_numpy(actual_words)
+        y, y_fallback = _parse_numpy(expected_words)
+        finite = np.isfinite(x) & np.isfinite(y) & ~x_fallback & ~y_fallback
+        x = np.where(finite, x, 0.0)
+        y = np.where(finite, y, 0.0)
+        diff = np.abs(x - y)
+        scale = np.maximum(np.abs(x), np.abs(y))
+        tol = np.maximum(self.rel_tol * scale, self.abs_tol)
+        margin = FLOAT_EPSILON * (scale + tol)
+        if np.any(finite & (diff > tol + margin)):
+            return None
+        uncertain = ~finite | (np.abs(diff - tol) <= margin)
+        return [int(i) for i in np.flatnonzero(uncertain)]
+
+    def _compare_array(
+        self, actual_words: List[bytes], expected_words: List[bytes]
+    ) -> Optional[List[int]]:
+        """
+        :returns: indices of tokens to be compared with `Decimal`, or None if any token is wrong.
+        """
+        xs, x_fallback = _parse_array(actual_words)
+        ys, y_fallback = _parse_array(expected_words)
+        rel_tol = self.rel_tol
+        abs_tol = self.abs_tol
+        uncertain: List[int] = []
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            if i in x_fallback or i in y_fallback:
+                uncertain.append(i)
+                continue
+            if not (math.isfinite(x) and math.isfinite(y)):
+                uncertain.append(i)
+                continue
+            diff = abs(x - y)
+            scale = max(abs(x), abs(y))
+            tol = max(rel_tol * scale, abs_tol)
+            margin = FLOAT_EPSILON * (scale + tol)
+            if diff > tol + margin:
+                return None
+            if abs(diff - tol) <= margin:
+                uncertain.append(i)
+        return uncertain
+
+
+def _parse_numpy(words: Sequence[bytes]) -> Tuple[Any, Any]:
+    """
+    :returns: the float array and the mask of tokens which are not parsed as float
+    """
+    np = _numpy()
+    try:
+        return (
+            np.array(words).astype(np.float64),
+            np.zeros(len(words), dtype=bool),
+        )
+    except ValueError:
+        values, fallback = _parse_array(words)
+        mask = np.zeros(len(words), dtype=bool)
+        mask[list(fallback)] = True
+        return np.frombuffer(values, dtype=np.float64), mask
+
+
+def _parse_array(words: Sequence[bytes]) -> Tuple["array[float]", Set[int]]:
+    """
+    :returns: the float array and indices of tokens which are not parsed as float
+    """
+    try:
+        return array("d", map(float, words)), set()
+    except ValueError:
+        pass
+    values = array("d", bytes(8 * len(words)))
+    fallback: Set[int] = set()
+    for i, word in enumerate(words):
+        try:
+            values[i] = float(word)
+        except ValueError:
+            fallback.add(i)
+    return values, fallback
+
+
 class SplitComparator(OutputComparator):
     def __init__(self, word_comparator: OutputComparator):
         self.word_comparator = word_comparator
@@ -90,54 +295,311 @@ class CRLFInsensitiveComparator(OutputComparator):
         )
 
 
+class StreamComparator(OutputComparator):
+    """StreamComparator compares the canonical forms of outputs chunk by chunk.
+
+    Neither full copies of outputs nor objects for all tokens are allocated at once,
+    and it returns as soon as the two diverge.
+    """
+
+    chunk_size = CHUNK_SIZE
+
+    def __call__(self, actual: bytes, expected: bytes) -> bool:
+        if actual == expected:
+            return True
+        return _equal_streams(self.canonicalize(actual), self.canonicalize(expected))
+
+    @abc.abstractmethod
+    def canonicalize(self, data: bytes) -> Iterator[bytes]:
+        """
+        :returns: chunks of the canonical form. the two outputs are matched iff their canonical forms are equal.
+        """
+
+
+class CRLFInsensitiveStreamComparator(StreamComparator):
+    """same as CRLFInsensitiveComparator(ExactComparator())"""
+
+    def canonicalize(self, data: bytes) -> Iterator[bytes]:
+        for chunk in _split_chunks(data, len(data), _LINE_START, self.chunk_size):
+            yield chunk.replace(b"\r\n", b"\n")
+
+    def locate(self, actual: bytes, expected: bytes) -> Optional[Mismatch]:
+        return _locate_exact_mismatch(
+            actual.replace(b"\r\n", b"\n"), expected.replace(b"\r\n", b"\n")
+        )
+
+
+class IgnoreSpacesComparator(StreamComparator):
+    """same as CRLFInsensitiveComparator(SplitLinesComparator(SplitComparator(ExactComparator())))
+
+    The canonical form is the lines of words joined by a space.
+    """
+
+    def canonicalize(self, data: bytes) -> Iterator[bytes]:
+        end = _strip_trailing_newlines(data)
+        for chunk in _split_chunks(data, end, _LINE_START, self.chunk_size):
+            # str.split() also removes trailing '\r'
+            yield b"\n".join([b" ".join(line.split()) for line in chunk.split(b"\n")])
+
+    def locate(self, actual: bytes, expected: bytes) -> Optional[Mismatch]:
+        return _locate_line_mismatch(actual, expected, ExactComparator())
+
+
+class IgnoreSpacesAndNewlinesComparator(StreamComparator):
+    """same as CRLFInsensitiveComparator(SplitComparator(ExactComparator()))
+
+    The canonical form is the words joined by a space.
+    """
+
+    def canonicalize(self, data: bytes) -> Iterator[bytes]:
+        separator = b""
+        for chunk in _split_chunks(data, len(data), _WORD_START, self.chunk_size):
+            words = chunk.split()
+            if words:
+                yield separator
+                yield b" ".join(words)
+                separator = b" "
+
+    def locate(self, actual: bytes, expected: bytes) -> Optional[Mismatch]:
+        return _locate_word_mismatch(actual, expected, ExactComparator())
+
+
+# chunk boundaries never split lines (and CRLF) or words
+_LINE_START = re.compile(rb"\n")
+_WORD_START = re.compile(rb"[ \t\n\r\x0b\x0c](?=[^ \t\n\r\x0b\x0c])")
+_WORD = re.compile(rb"[^ \t\n\r\x0b\x0c]+")
+_SPACE_CODES = frozenset(b" \t\n\r\x0b\x0c")
+
+
+def _strip_trailing_newlines(data: bytes) -> int:
+    """
+    :returns: the end of data.replace(b"\\r\\n", b"\\n").rstrip(b"\\n") in the original data
+    """
+    end = len(data)
+    while end and data[end - 1] == 0x0A:  # \n
+        end -= 1
+        if end and data[end - 1] == 0x0D:  # \r of CRLF
+            end -= 1
+    return end
+
+
+def _split_chunks(
+    data: bytes, end: int, boundary: Pattern[bytes], size: int
+) -> Iterator[bytes]:
+    """split data[:end] into chunks at the end of the first boundary after each `size` bytes"""
+    pos = 0
+    while pos < end:
+        stop = end
+        if pos + size < end:
+            match = boundary.search(data, pos + size - 1, end)
+            if match is not None:
+                stop = match.end()
+        yield data[pos:stop]
+        pos = stop
+
+
+def _equal_streams(xs: Iterator[bytes], ys: Iterator[bytes]) -> bool:
+    """compare the concatenations of chunks in lockstep"""
+    x: Optional[bytes] = b""
+    y: Optional[bytes] = b""
+    i = j = 0  # offsets of x and y
+    while True:
+        while x is not None and i == len(x):
+            x, i = next(xs, None), 0
+        while y is not None and j == len(y):
+            y, j = next(ys, None), 0
+        if x is None or y is None:
+            return x is None and y is None
+        n = min(len(x) - i, len(y) - j)
+        if x[i : i + n] != y[j : j + n]:
+            return False
+        i += n
+        j += n
+
+
+def _position(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    :returns: 1-indexed line and column of data[pos]
+    """
+    line_start = data.rfind(b"\n", 0, pos) + 1
+    return data.count(b"\n", 0, pos) + 1, pos - line_start + 1
+
+
+def _common_prefix_length(x: bytes, y: bytes) -> int:
+    n = min(len(x), len(y))
+    step = 1 << 16
+    lo = 0
+    while lo < n and x[lo : lo + step] == y[lo : lo + step]:
+        lo += step
+    # binary search in the first mismatched block
+    hi = min(lo + step, n)
+    lo = min(lo, n)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if x[lo:mid] == y[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _word_at(data: bytes, pos: int) -> Optional[bytes]:
+    """
+    :returns: the word at data[pos], or the whitespace if data[pos] is whitespace
+    """
+    if pos >= len(data):
+        return None
+    if data[pos] in _SPACE_CODES:
+        return data[pos : pos + 1]
+    begin = pos
+    while begin > 0 and data[begin - 1] not in _SPACE_CODES:
+        begin -= 1
+    match = _WORD.match(data, pos)
+    return data[begin : match.end() if match else pos + 1]
+
+
+def _locate_exact_mismatch(actual: bytes, expected: bytes) -> Optional[Mismatch]:
+    if actual == expected:
+        return None
+    pos = _common_prefix_length(actual, expected)
+    line, column = _position(actual, pos)
+    expected_line, expected_column = _position(expected, pos)
+    return Mismatch(
+        line=line,
+        column=column,
+        expected_line=expected_line,
+        expected_column=expected_column,
+        actual=_word_at(actual, pos),
+        expected=_word_at(expected, pos),
+    )
+
+
+def _token_mismatch(
+    actual: bytes,
+    expected: bytes,
+    x: Optional["Match[bytes]"],
+    y: Optional["Match[bytes]"],
+    x_end: int,
+    y_end: int,
+) -> Mismatch:
+    """
+    x_end, y_end (int): the position used if the token is missing
+    """
+    line, column = _position(actual, x.start() if x else x_end)
+    expected_line, expected_column = _position(expected, y.start() if y else y_end)
+    return Mismatch(
+        line=line,
+        column=column,
+        expected_line=expected_line,
+        expected_column=expected_column,
+        actual=x.group() if x else None,
+        expected=y.group() if y else None,
+    )
+
+
+def _content_end(data: bytes, end: int) -> int:
+    while end and data[end - 1] in _SPACE_CODES:
+        end -= 1
+    return end
+
+
+def _locate_word_mismatch(
+    actual: bytes, expected: bytes, word_comparator: OutputComparator
+) -> Optional[Mismatch]:
+    """locate the mismatch ignoring spaces and newlines"""
+    words = zip_longest(_WORD.finditer(actual), _WORD.finditer(expected))
+    for x, y in words:
+        if x is None or y is None or not word_comparator(x.group(), y.group()):
+            return _token_mismatch(
+                actual,
+                expected,
+                x,
+                y,
+                _content_end(actual, len(actual)),
+                _content_end(expected, len(expected)),
+            )
+    return None
+
+
+def _locate_line_mismatch(
+    actual: bytes, expected: bytes, word_comparator: OutputComparator
+) -> Optional[Mismatch]:
+    """locate the mismatch of lines ignoring spaces, same as SplitLinesComparator"""
+    x_end = _strip_trailing_newlines(actual)
+    y_end = _strip_trailing_newlines(expected)
+    x_pos = y_pos = 0
+    while True:
+        x_stop = actual.find(b"\n", x_pos, x_end)
+        y_stop = expected.find(b"\n", y_pos, y_end)
+        x_last, y_last = x_stop == -1, y_stop == -1
+        x_stop = x_end if x_last else x_stop
+        y_stop = y_end if y_last else y_stop
+        words = zip_longest(
+            _WORD.finditer(actual, x_pos, x_stop),
+            _WORD.finditer(expected, y_pos, y_stop),
+        )
+        for x, y in words:
+            if x is None or y is None or not word_comparator(x.group(), y.group()):
+                return _token_mismatch(
+                    actual,
+                    expected,
+                    x,
+                    y,
+                    _content_end(actual, x_stop),
+                    _content_end(expected, y_stop),
+                )
+        if x_last or y_last:
+            break
+        x_pos, y_pos = x_stop + 1, y_stop + 1
+    if x_last and y_last:
+        return None
+    # the numbers of lines are different
+    x = None if x_last else _WORD.search(actual, x_stop + 1, x_end)
+    y = None if y_last else _WORD.search(expected, y_stop + 1, y_end)
+    return _token_mismatch(
+        actual,
+        expected,
+        x,
+        y,
+        x_stop if x_last else x_stop + 1,
+        y_stop if y_last else y_stop + 1,
+    )
+
+
 def exact_match(tolerant: Optional[float] = None) -> OutputComparator:
     # if tolerant is None, is_exact=True
     if tolerant is None:
         return ExactComparator()
 
-    return CRLFInsensitiveComparator(
-        SplitLinesComparator(
-            SplitComparator(
-                FloatingPointNumberComparator(rel_tol=tolerant, abs_tol=tolerant)
-            )
-        )
+    return BulkFloatingPointNumberComparator(
+        rel_tol=tolerant, abs_tol=tolerant, split_lines=True
     )
 
 
 def crlf_insensitive_exact_match(tolerant: Optional[float] = None) -> OutputComparator:
     # if tolerant is None, is_exact=True
     if tolerant is None:
-        return CRLFInsensitiveComparator(ExactComparator())
+        return CRLFInsensitiveStreamComparator()
 
-    return CRLFInsensitiveComparator(
-        SplitLinesComparator(
-            SplitComparator(
-                FloatingPointNumberComparator(rel_tol=tolerant, abs_tol=tolerant)
-            )
-        )
+    return BulkFloatingPointNumberComparator(
+        rel_tol=tolerant, abs_tol=tolerant, split_lines=True
     )
 
 
 def ignore_spaces(tolerant: Optional[float] = None) -> OutputComparator:
-    if tolerant is None:
-        word_comparator = ExactComparator()
-    else:
-        word_comparator = FloatingPointNumberComparator(
-            rel_tol=tolerant, abs_tol=tolerant
-        )  # type: ignore
-    return CRLFInsensitiveComparator(
-        SplitLinesComparator(SplitComparator(word_comparator))
-    )
+    if tolerant is not None:
+        return BulkFloatingPointNumberComparator(
+            rel_tol=tolerant, abs_tol=tolerant, split_lines=True
+        )
+    return IgnoreSpacesComparator()
 
 
 def ignore_spaces_and_newlines(tolerant: Optional[float] = None) -> OutputComparator:
-    if tolerant is None:
-        word_comparator = ExactComparator()
-    else:
-        word_comparator = FloatingPointNumberComparator(
-            rel_tol=tolerant, abs_tol=tolerant
-        )  # type: ignore
-    return CRLFInsensitiveComparator(SplitComparator(word_comparator))
+    if tolerant is not None:
+        return BulkFloatingPointNumberComparator(
+            rel_tol=tolerant, abs_tol=tolerant, split_lines=False
+        )
+    return IgnoreSpacesAndNewlinesComparator()
 
 
 def non_strict() -> OutputComparator:
@@ -152,18 +614,50 @@ def non_strict() -> OutputComparator:
     return ignore_spaces_and_newlines(tolerant=None)
 
 
-class SpecialJudge(OutputComparator):
+class Checker(OutputComparator):
+    """Checker judges the actual output with the input and the expected output.
+
+    The shared checker is never mutated. It is bound to each testcase by `bind`,
+    so that checkers run concurrently.
+    """
+
+    elapsed: Optional[float] = None  # ms. the time of the checker itself
+    message: str = ""  # the reason of the verdict reported by the checker
+
+    @abc.abstractmethod
+    def bind(self, input_path: Path, expected_output_path: Optional[Path]) -> "Checker":
+        """
+        :returns: the new checker for the testcase.
+        """
+
+    def close(self) -> None:
+        """close releases resources shared by bound checkers."""
+
+
+class SpecialJudge(Checker):
     def __init__(
         self,
         judge_command: str,
         is_silent: bool,
         test_input_path: Path,
         test_output_path: Optional[Path],
+        tle: Optional[float] = None,
     ):
         self.judge_command = judge_command  # already quoted and joined command
         self.is_silent = is_silent
         self.test_input_path = test_input_path
         self.test_expected_path = test_output_path
+        self.tle = tle
+        self.timeout = tle * JUDGE_TIMEOUT_SCALE if tle else DEFAULT_JUDGE_TIMEOUT
+
+    def bind(self, input_path: Path, expected_output_path: Optional[Path]) -> "Checker":
+        return SpecialJudge(
+            judge_command=self.judge_command,
+            is_silent=self.is_silent,
+            test_input_path=input_path,
+            test_output_path=expected_output_path,
+            tle=self.tle,
+        )
 
     def __call__(self, actual: bytes, expected: bytes) -> bool:
         return self.run(
@@ -177,29 +671,38 @@ class SpecialJudge(OutputComparator):
         *,
         actual_output: bytes,
         input_path: Path,
-        expected_output_path: Optional[Path]
+        expected_output_path: Optional[Path],
     ) -> bool:
-        """
-        with tempfile.TemporaryDirectory() as tempdir:
-            actual_output_path = Path(tempdir) / "actual.out"
-            with open(actual_output_path, "wb") as fh:
-                fh.write(actual_output)
+        """run executes `judge_command <input> <actual output> <expected output>`.
 
-            # if you use shlex.quote, it fails on Windows. why?
+        The actual output is passed as an in-memory file (memfd or /dev/fd) if available.
+        :returns: True if the judge command exits with 0. False if it exceeds `timeout` (ms).
+        """
+        with contextlib.ExitStack() as stack:
+            # compressed or archived testcases are also passed as in-memory files
+            (input, expected), pass_fds = stack.enter_context(
+                archive.materialize([input_path, expected_output_path])
+            )
+            actual, actual_fds = stack.enter_context(
+                archive.anonymous_file(actual_output, "actual.out")
+            )
             command = " ".join(
                 [
                     self.judge_command,  # already quoted and joined command
-                    str(input_path.resolve()),
-                    str(actual_output_path.resolve()),
-                    str(
-                        expected_output_path.resolve()
-                        if expected_output_path is not None
-                        else ""
-                    ),
+                    shlex.quote(input),
+                    shlex.quote(actual),
+                    shlex.quote(expected),
                 ]
             )
-            history = exec_command(command)
+            history = exec_command(
+                command, timeout=self.timeout, pass_fds=[*pass_fds, *actual_fds]
+            )
+        self.elapsed = history.elapsed
+        self.message = (history.answer or b"").decode(errors="replace")
+        if history.proc.returncode is None:
+            self.message += (
+                f"Timeout: the judge command exceeds {self.timeout:.0f} ms\n"
+            )
+        if not self.is_silent and self.message:
+            sys.stderr.write(self.message)
         return history.proc.returncode == 0
-        """
-        # not supported yet
-        return True
@@ -0,0 +1,170 @@
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from judge.schema import JudgeStatus
+from judge.tools import utils
+from judge.tools.stress import helper_timeout, run_command
+from judge.tools.testing import check_gnu_time
+
+MEASURE_TIMEOUT_SCALE = 5  # measure beyond TLE to fit growth models
+
+# growth models in order of simplicity
+MODELS: Dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log N)": lambda n: math.log2(max(n, 2)),
+    "O(N)": lambda n: n,
+    "O(N log N)": lambda n: n * math.log2(max(n, 2)),
+    "O(N^2)": lambda n: n**2,
+    "O(N^3)": lambda n: n**3,
+}
+
+
+@dataclass
+class ComplexityArgs:
+    generator: str
+    command: str
+    sizes: List[int]
+    repeat: int = 3
+    seed: int = 0
+    tle: Optional[float] = None
+    mle: Optional[float] = None
+    gnu_time: Optional[str] = None
+    max_n: Optional[int] = None
+
+
+@dataclass
+class Measurement:
+    size: int
+    elapsed: List[float] = field(default_factory=list)  # ms
+    memory: List[float] = field(default_factory=list)  # MB
+    timeout: bool = False
+
+    @property
+    def best_elapsed(self) -> float:
+        """the minimum is the least noisy estimation of execution time"""
+        return min(self.elapsed)
+
+    @property
+    def max_memory(self) -> Optional[float]:
+        return max(self.memory) if self.memory else None
+
+
+@dataclass
+class Fit:
+    model: str
+    intercept: float
+    slope: float
+    error: float  # root mean squared relative error
+
+    def predict(self, n: float) -> float:
+        return self.intercept + self.slope * MODELS[self.model](n)
+
+
+@dataclass
+class Estimation:
+    measurements: List[Measurement]
+    time_fits: List[Fit]
+    memory_fits: List[Fit]
+    max_n: int
+    elapsed: Optional[float] = None  # ms at max_n
+    memory: Optional[float] = None  # MB at max_n
+    status: Optional[JudgeStatus] = None
+
+
+def fit(model: str, xs: List[float], ys: List[float]) -> Fit:
+    """fit y = intercept + slope * model(x) by least squares with slope >= 0.
+
+    The intercept absorbs the constant cost such as interpreter startup.
+    """
+    fs = [MODELS[model](x) for x in xs]
+    n = len(xs)
+    mean_f = sum(fs) / n
+    mean_y = sum(ys) / n
+    var_f = sum((f - mean_f) ** 2 for f in fs)
+    if var_f == 0:
+        slope = 0.0
+    else:
+        slope = max(
+            sum((f - mean_f) * (y - mean_y) for f, y in zip(fs, ys)) / var_f, 0.0
+        )
+    intercept = mean_y - slope * mean_f
+    if intercept < 0:
+        # the constant cost can't be negative
+        intercept = 0.0
+        slope = sum(f * y for f, y in zip(fs, ys)) / max(sum(f * f for f in fs), 1e-300)
+    errors = [((intercept + slope * f) - y) / max(abs(y), 1e-9) for f, y in zip(fs, ys)]
+    error = math.sqrt(sum(e * e for e in errors) / n)
+    return Fit(model=model, intercept=intercept, slope=slope, error=error)
+
+
+def fit_models(xs: List[float], ys: List[float]) -> List[Fit]:
+    """fit_models returns fits of all models, from the best.
+
+    A simpler model is preferred if its error is close to the best one.
+    """
+    fits = [fit(model, xs, ys) for model in MODELS]
+    order = {model: i for i, model in enumerate(MODELS)}
+    best = min(f.error for f in fits)
+
+    def key(f: Fit) -> Tuple[bool, float, int]:
+        return (f.error > best * 1.1 + 0.01, f.error, order[f.model])
+
+    return sorted(fits, key=key)
+
+
+def measure(args: ComplexityArgs) -> List[Measurement]:
+    if args.gnu_time and not check_gnu_time(args.gnu_time):
+        args.gnu_time = None
+    timeout = args.tle * MEASURE_TIMEOUT_SCALE if args.tle else None
+
+    measurements: List[Measurement] = []
+    for size in args.sizes:
+        data = run_command(
+            f"{args.generator} {args.seed} {size}", None, helper_timeout(args.tle)
+        )
+        measurement = Measurement(size=size)
+        for _ in range(args.repeat):
+            history = utils.exec_command(
+                args.command, input=data, timeout=timeout, gnu_time=args.gnu_time
+            )
+            measurement.elapsed.append(history.elapsed)
+            if history.memory is not None:
+                measurement.memory.append(history.memory)
+            if history.proc.returncode is None:
+                measurement.timeout = True
+                break
+        measurements.append(measurement)
+    return measurements
+
+
+def estimate(measurements: List[Measurement], args: ComplexityArgs) -> Estimation:
+    """estimate fits growth models and extrapolates to the maximum N of the problem."""
+    max_n = args.max_n or max(m.size for m in measurements)
+    xs = [float(m.size) for m in measurements]
+    time_fits = fit_models(xs, [m.best_elapsed for m in measurements])
+
+    memory_fits: List[Fit] = []
+    with_memory = [m for m in measurements if m.max_memory is not None]
+    if len(with_memory) == len(measurements):
+        memory_fits = fit_models(xs, [m.max_memory or 0.0 for m in measurements])
+
+    estimation = Estimation(
+        measurements=measurements,
+        time_fits=time_fits,
+        memory_fits=memory_fits,
+        max_n=max_n,
+        elapsed=time_fits[0].predict(max_n),
+    )
+    if memory_fits:
+        estimation.memory = memory_fits[0].predict(max_n)
+
+    if args.tle is not None and estimation.elapsed is not None:
+        if estimation.elapsed > args.tle:
+            estimation.status = JudgeStatus.TLE
+    if estimation.status is None and args.mle is not None:
+        if estimation.memory is not None and estimation.memory > args.mle:
+            estimation.status = JudgeStatus.MLE
+    if estimation.status is None:
+        estimation.status = JudgeStatus.AC
+    return estimation
@@ -0,0 +1,245 @@
+import concurrent.futures
+import contextlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import onlinejudge.dispatch as dispatch
+import onlinejudge.utils as utils
+import requests
+from onlinejudge.service.atcoder import AtCoderContest
+from onlinejudge.type import Contest, Problem, SampleParseError, TestCase
+from requests.adapters import HTTPAdapter
+from requests.exceptions import InvalidURL
+from urllib3.util.retry import Retry
+
+from judge.schema import JudgeConfig
+from judge.tools.download import (
+    LoginForm,
+    SaveArgs,
+    create_UA_session,
+    download_testcases,
+    save,
+)
+from judge.tools.httpcache import ResponseCache
+from judge.tools.store import TestCaseStore
+
+ATCODER_ORIGIN = "https://atcoder.jp"
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def url_of_contest(contest: str) -> str:
+    return f"{ATCODER_ORIGIN}/contests/{contest}"
+
+
+class OriginAdapter(HTTPAdapter):
+    """OriginAdapter sends requests for the origin to another server, e.g. a local stand-in server."""
+
+    def __init__(self, origin: str, **kwargs) -> None:  # type: ignore
+        super().__init__(**kwargs)
+        self.origin = urlsplit(origin)
+
+    def send(self, request, **kwargs):  # type: ignore
+        url = urlsplit(request.url)
+        request.url = urlunsplit(
+            (self.origin.scheme, self.origin.netloc) + tuple(url[2:])
+        )
+        return super().send(request, **kwargs)
+
+
+def mount_pool(
+    session: requests.Session,
+    *,
+    pool_size: int,
+    retries: int,
+    backoff: float,
+    origin: Optional[str] = None,
+) -> None:
+    """mount_pool shares the connection pool among threads, and retries failed requests with backoff.
+
+    origin (str): the server to send requests for the online judge instead. only for testing.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUS,
+        raise_on_status=False,
+    )
+    for prefix in ("https://", "http://"):
+        session.mount(
+            prefix,
+            HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+            ),
+        )
+    if origin is not None:
+        session.mount(
+            ATCODER_ORIGIN,
+            OriginAdapter(
+                origin,
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                max_retries=retry,
+            ),
+        )
+
+
+@dataclass
+class ContestDownloadArgs:
+    contest: str
+    workdir: Path  # each problem is scaffolded in `workdir / <problem>`
+    cookie: Path = utils.default_cookie_path
+    login_form: Optional[LoginForm] = None
+    jobs: int = 4  # the number of concurrent downloads
+    retries: int = 3
+    backoff: float = 0.5  # sec. the factor of exponential backoff
+    format: str = "sample-%i.%e"
+    store: Optional[TestCaseStore] = None
+    cache: Optional[ResponseCache] = None
+    sync: bool = False  # overwrite testcases changed
+    origin: Optional[str] = None  # only for testing with a local server
+    contest_: Contest = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        contest = dispatch.contest_from_url(url_of_contest(self.contest))
+        if contest is None:
+            raise InvalidURL(f'The contest "{self.contest}" is not supported')
+        self.contest_ = contest
+
+
+@dataclass
+class ProblemWorkdir:
+    name: str  # e.g. a, b, c, ...
+    problem: Problem
+    workdir: Path
+    tle: Optional[float] = None  # ms
+    mle: Optional[float] = None  # MB
+    testcases: List[TestCase] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+    @property
+    def testdir(self) -> Path:
+        return self.workdir / "tests"
+
+
+def list_problems(
+    args: ContestDownloadArgs, session: requests.Session
+) -> List[ProblemWorkdir]:
+    """list_problems lists problems of the contest with their limits if available."""
+    if args.cache is not None:
+        args.cache.mount(session)
+        problems = args.cache.cached(
+            f"{url_of_contest(args.contest)}#problems",
+            session,
+            lambda: _list_problems(args.contest_, session),
+        )
+    else:
+        problems = _list_problems(args.contest_, session)
+    return [
+        ProblemWorkdir(
+            name=name, problem=problem, workdir=args.workdir / name, tle=tle, mle=mle
+        )
+        for name, problem, tle, mle in problems
+    ]
+
+
+def _list_problems(
+    contest: Contest, session: requests.Session
+) -> List[Tuple[str, Problem, Optional[float], Optional[float]]]:
+    if isinstance(contest, AtCoderContest):
+        return [
+            (
+                data.alphabet.lower(),
+                data.problem,
+                data.time_limit_msec,
+                data.memory_limit_byte / 1000 / 1000,
+            )
+            for data in contest.list_problem_data(session=session)
+        ]
+    problems = contest.list_problems(session=session)
+    return [
+        (chr(ord("a") + idx), problem, None, None)
+        for idx, problem in enumerate(problems)
+    ]
+
+
+def scaffold(problem: ProblemWorkdir, contest: str) -> None:
+    """scaffold creates the working directory and `.judgecli` like `judge conf`."""
+    problem.testdir.mkdir(parents=True, exist_ok=True)
+    config = JudgeConfig.from_toml(problem.workdir, auto_error=False)
+    _config = config.dict()
+    _config["workdir"] = problem.workdir.resolve()
+    _config["contest"] = contest
+    _config["problem"] = problem.name
+    _config["URL"] = problem.problem.get_url()
+    _config["testdir"] = problem.testdir.resolve()
+    if problem.tle is not None:
+        _config["tle"] = problem.tle
+    if problem.mle is not None:
+        _config["mle"] = problem.mle
+    JudgeConfig(**_config).save(problem.workdir)
+
+
+def _download_problem(
+    problem: ProblemWorkdir, session: requests.Session, args: ContestDownloadArgs
+) -> ProblemWorkdir:
+    try:
+        scaffold(problem, args.contest)
+        problem.testcases = download_testcases(
+            problem.problem, session, cache=args.cache
+        )
+        if not problem.testcases:
+            raise SampleParseError("Sample not found")
+        save(
+            problem.testcases,
+            SaveArgs(
+                format=args.format,
+                directory=problem.testdir,
+                store=args.store,
+                sync=args.sync,
+            ),
+        )
+    except Exception as e:
+        problem.error = e
+    return problem
+
+
+@contextlib.contextmanager
+def contest_session(args: ContestDownloadArgs) -> Iterator[requests.Session]:
+    """contest_session creates the session shared among all downloads of the contest."""
+    with create_UA_session(path=args.cookie) as session:
+        mount_pool(
+            session,
+            pool_size=args.jobs,
+            retries=args.retries,
+            backoff=args.backoff,
+            origin=args.origin,
+        )
+        service = args.contest_.get_service()
+        offline = args.cache is not None and args.cache.offline
+        if (
+            not offline
+            and args.login_form
+            and not service.is_logged_in(session=session)
+        ):
+            service.login(
+                get_credentials=args.login_form.get_credentials, session=session
+            )
+        yield session
+
+
+def download_contest(args: ContestDownloadArgs) -> Iterator[ProblemWorkdir]:
+    """download_contest scaffolds and downloads all problems of the contest concurrently.
+
+    Problems are yielded in the order of completion. Failures are reported in `ProblemWorkdir.error`.
+    """
+    with contest_session(args) as session:
+        problems = list_problems(args, session)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [
+                executor.submit(_download_problem, problem, session, args)
+                for problem in problems
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
@@ -0,0 +1,268 @@
+import array
+import contextlib
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from judge.tools.store import cache_home
+
+SOCKET_ENV = "JUDGE_SOCKET"
+DISABLE_ENV = "JUDGE_NO_DAEMON"
+FORWARDED_COMMANDS = ("test", "download")
+# loaded by the daemon in advance, so that forwarded commands start warm
+WARM_MODULES = (
+    "judge.testing",
+    "judge.download",
+    "judge.tools.comparator",
+    "judge.tools.contest",
+    "judge.tools.system",
+    "requests",
+    "onlinejudge.dispatch",
+)
+HEADER = struct.Struct("!I")
+STDIO = 3  # stdin, stdout and stderr
+
+
+def default_socket_path() -> Path:
+    """`$JUDGE_SOCKET`, `$XDG_RUNTIME_DIR/judge.sock` or `$XDG_CACHE_HOME/judge/daemon.sock`"""
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "judge.sock"
+    return cache_home() / "daemon.sock"
+
+
+def _send(
+    conn: socket.socket, message: Dict[str, object], fds: Sequence[int] = ()
+) -> None:
+    payload = json.dumps(message).encode()
+    ancillary = []
+    if fds:
+        ancillary = [
+            (socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds).tobytes())
+        ]
+    conn.sendmsg([HEADER.pack(len(payload))], ancillary)
+    conn.sendall(payload)
+
+
+def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return data
+
+
+def _recv(conn: socket.socket) -> Tuple[Dict[str, object], List[int]]:
+    fds = array.array("i")
+    header, ancdata, _, _ = conn.recvmsg(
+        HEADER.size, socket.CMSG_LEN(STDIO * fds.itemsize)
+    )
+    for level, type_, data in ancdata:
+        if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+            fds.frombytes(data[: len(data) - len(data) % fds.itemsize])
+    if len(header) < HEADER.size:
+        header += _recv_exactly(conn, HEADER.size - len(header))
+    (size,) = HEADER.unpack(header)
+    return json.loads(_recv_exactly(conn, size)), list(fds)
+
+
+def forward(argv: List[str], path: Optional[Path] = None) -> Optional[int]:
+    """forward runs the command in the daemon, attached to stdin, stdout and stderr of this process.
+
+    Output is written by the daemon directly, so it is shown incrementally.
+    :returns: the exit code, or None if the daemon is not running
+    """
+    path = path or default_socket_path()
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with conn:
+        try:
+            conn.connect(str(path))
+        except OSError:
+            return None
+        sys.stdout.flush()
+        sys.stderr.flush()
+        message: Dict[str, object] = {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+        _send(conn, message, fds=(0, 1, 2))
+        return _wait(conn)
+
+
+def _kill(pgid: int, signum: int) -> None:
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pgid, signum)
+
+
+def _wait(conn: socket.socket) -> int:
+    """_wait waits for the forwarded command, passing SIGINT and SIGTERM on to its process group.
+
+    The command sends its pid, which is also its process group, at first and then the exit code.
+    The second signal kills the command.
+    """
+    pid: Optional[int] = None
+    received: List[int] = []
+
+    def _pass(signum: int, frame: object) -> None:
+        received.append(signum)
+        if pid is not None:
+            _kill(pid, signal.SIGKILL if len(received) > 1 else signum)
+
+    handlers = {
+        signum: signal.signal(signum, _pass)
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        (pid,) = struct.unpack("!i", _recv_exactly(conn, 4))
+        if received:  # received before the pid
+            _kill(pid, received[-1])
+        (returncode,) = struct.unpack("!i", _recv_exactly(conn, 4))
+    except ConnectionError:
+        return 128 + received[0] if received else 1
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+    return int(returncode)
+
+
+def is_running(path: Optional[Path] = None) -> bool:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with conn:
+        try:
+            conn.connect(str(path or default_socket_path()))
+        except OSError:
+            return False
+    return True
+
+
+def stop(path: Optional[Path] = None) -> bool:
+    """
+    :returns: True if the daemon was running
+    """
+    path = path or default_socket_path()
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with conn:
+        try:
+            conn.connect(str(path))
+        except OSError:
+            return False
+        _send(conn, {"stop": True})
+        with contextlib.suppress(ConnectionError):
+            _recv_exactly(conn, 4)
+    return True
+
+
+def _run_child(
+    conn: socket.socket,
+    message: Dict[str, object],
+    fds: List[int],
+    run: Callable[[List[str]], int],
+) -> None:
+    """_run_child runs the forwarded command in the forked process. never returns.
+
+    The command runs in its own session, so that the client can signal it with its solutions.
+    SIGINT and SIGTERM raise KeyboardInterrupt to kill the solutions running in their process groups.
+    """
+    returncode = 1
+    try:
+        os.setsid()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        conn.sendall(struct.pack("!i", os.getpid()))
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for fd, target in zip(fds, range(STDIO)):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(str(message["cwd"]))
+        os.environ.clear()
+        os.environ.update(message["env"])  # type: ignore
+        returncode = run(list(message["argv"]))  # type: ignore
+    except KeyboardInterrupt:
+        returncode = 128 + signal.SIGINT
+    except BaseException:
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        with contextlib.suppress(BaseException):
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.sendall(struct.pack("!i", returncode))
+        os._exit(returncode)
+
+
+def _reap(*_: object) -> None:
+    with contextlib.suppress(ChildProcessError):
+        while os.waitpid(-1, os.WNOHANG)[0] > 0:
+            pass
+
+
+def serve(
+    run: Callable[[List[str]], int],
+    path: Optional[Path] = None,
+    ready: Optional[Callable[[], None]] = None,
+) -> None:
+    """serve runs forwarded commands until stopped.
+
+    Modules in WARM_MODULES are imported once here. Each command runs in a process forked from
+    this warm process, so commands never interfere with each other or the daemon.
+    """
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+    from judge.schema import TimerMode
+    from judge.tools.testing import check_gnu_time
+
+    check_gnu_time(TimerMode.GNU_TIME.value)
+
+    path = path or default_socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        if is_running(path):
+            raise RuntimeError(f"The daemon is already running: {path}")
+        path.unlink()  # left by the daemon killed
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(path))
+    os.chmod(str(path), 0o600)
+    listener.listen(16)
+    signal.signal(signal.SIGCHLD, _reap)
+    if ready is not None:
+        ready()
+    try:
+        while True:
+            try:
+                readable, _, _ = select.select([listener], [], [])
+            except InterruptedError:  # pragma: no cover
+                continue
+            if not readable:
+                continue
+            conn, _ = listener.accept()
+            with conn:
+                try:
+                    message, fds = _recv(conn)
+                except (OSError, ValueError):
+                    continue
+                if message.get("stop"):
+                    conn.sendall(struct.pack("!i", 0))
+                    return
+                if os.fork() == 0:
+                    listener.close()
+                    _run_child(conn, message, fds, run)
+                for fd in fds:
+                    os.close(fd)
+    finally:
+        listener.close()
+        with contextlib.suppress(OSError):
+            path.unlink()
@@ -0,0 +1,170 @@
+import difflib
+import re
+from typing import IO, List, Tuple, Union
+
+from judge.schema import Mismatch
+
+DIFF_CONTEXT = 3  # lines around the first mismatch
+DIFF_MAX_LINES = 40
+DIFF_MAX_WIDTH = 160  # characters per line
+
+CHUNK_SIZE = 1 << 16  # byte
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@$")
+
+
+def line_offset(data: bytes, line: int) -> int:
+    """
+    :returns: the offset of the 1-indexed line, or len(data) if data has less lines.
+    """
+    pos = 0
+    remaining = line - 1
+    step = 1 << 16
+    # skip blocks by counting newlines in C
+    while remaining > 0 and pos + step < len(data):
+        count = data.count(b"\n", pos, pos + step)
+        if count >= remaining:
+            break
+        remaining -= count
+        pos += step
+    for _ in range(remaining):
+        found = data.find(b"\n", pos)
+        if found == -1:
+            return len(data)
+        pos = found + 1
+    return pos
+
+
+def window(data: bytes, first: int, size: int) -> List[str]:
+    """window returns at most `size` lines from the 1-indexed `first` line.
+
+    Each line is decoded and truncated to DIFF_MAX_WIDTH.
+    """
+    lines: List[str] = []
+    pos = line_offset(data, first)
+    while len(lines) < size and pos < len(data):
+        end = data.find(b"\n", pos)
+        end = len(data) if end == -1 else end
+        line = data[pos : min(end, pos + DIFF_MAX_WIDTH)].rstrip(b"\r")
+        text = line.decode(errors="replace")
+        if end - pos > DIFF_MAX_WIDTH:
+            text += "..."
+        lines.append(text)
+        pos = end + 1
+    return lines
+
+
+def _skip_lines(stream: IO[bytes], lines: int) -> bytes:
+    """_skip_lines reads the stream until `lines` lines are skipped.
+
+    :returns: the bytes read after the skipped lines
+    """
+    while lines > 0:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return b""
+        count = chunk.count(b"\n")
+        if count >= lines:
+            return chunk[line_offset(chunk, lines + 1) :]
+        lines -= count
+    return b""
+
+
+def window_stream(stream: IO[bytes], first: int, size: int) -> List[str]:
+    """window_stream is `window` for the stream. lines before `first` are read but never kept."""
+    lines: List[str] = []
+    buf = _skip_lines(stream, first - 1)
+    while len(lines) < size:
+        while b"\n" not in buf and len(buf) <= DIFF_MAX_WIDTH:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            buf += chunk
+        if not buf:
+            break
+        end = buf.find(b"\n")
+        line = buf if end == -1 else buf[:end]
+        text = line[:DIFF_MAX_WIDTH].rstrip(b"\r").decode(errors="replace")
+        if len(line) > DIFF_MAX_WIDTH:
+            text += "..."
+        lines.append(text)
+        if end != -1:
+            buf = buf[end + 1 :]
+            continue
+        # the rest of the long line is skipped
+        buf = _skip_lines(stream, 1)
+    return lines
+
+
+def _window(source: Union[bytes, IO[bytes]], first: int, size: int) -> List[str]:
+    if isinstance(source, bytes):
+        return window(source, first, size)
+    return window_stream(source, first, size)
+
+
+def bounded_diff(
+    actual: Union[bytes, IO[bytes]],
+    expected: Union[bytes, IO[bytes]],
+    mismatch: Mismatch,
+) -> List[str]:
+    """bounded_diff builds the unified diff of lines around the first mismatch.
+
+    Only a window of lines is compared, so the cost doesn't depend on the size of outputs.
+    Streams are read until the window, and lines before it are not kept.
+    """
+    size = 2 * DIFF_CONTEXT + 1
+    actual_first = max(mismatch.line - DIFF_CONTEXT, 1)
+    expected_first = max(mismatch.expected_line - DIFF_CONTEXT, 1)
+    diff = difflib.unified_diff(
+        _window(expected, expected_first, size),
+        _window(actual, actual_first, size),
+        fromfile="expected",
+        tofile="output",
+        lineterm="",
+        n=DIFF_CONTEXT,
+    )
+    lines: List[str] = []
+    for line in diff:
+        if len(lines) >= DIFF_MAX_LINES:
+            lines.append("...")
+            break
+        lines.append(_shift_hunk_header(line, expected_first - 1, actual_first - 1))
+    return lines
+
+
+def _shift_hunk_header(line: str, expected_shift: int, actual_shift: int) -> str:
+    match = _HUNK_HEADER.match(line)
+    if match is None:
+        return line
+    expected_start, expected_len, actual_start, actual_len = match.groups()
+    return "@@ -{}{} +{}{} @@".format(
+        int(expected_start) + expected_shift,
+        expected_len or "",
+        int(actual_start) + actual_shift,
+        actual_len or "",
+    )
+
+
+def format_token(token: bytes, width: int = 40) -> str:
+    text = repr(token.decode(errors="replace"))
+    if len(text) > width:
+        text = text[:width] + "..."
+    return text
+
+
+def describe(mismatch: Mismatch) -> Tuple[str, str]:
+    """
+    :returns: descriptions of the mismatched tokens of the expected output and the actual output
+    """
+    expected = (
+        "end of output"
+        if mismatch.expected is None
+        else format_token(mismatch.expected)
+    )
+    actual = (
+        "end of output" if mismatch.actual is None else format_token(mismatch.actual)
+    )
+    return (
+        f"{expected} (line {mismatch.expected_line}, column {mismatch.expected_column})",
+        f"{actual} (line {mismatch.line}, column {mismatch.column})",
+    )
@@ -0,0 +1,123 @@
+import contextlib
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from judge.tools import comparator
+from judge.tools.archive import read_testcase
+from judge.tools.store import cache_home, content_hash, write_atomic
+
+DIGEST_INDEX_DIR = "digests"
+DIGEST_INDEX_VERSION = 1
+
+Normalizer = Callable[[bytes], Iterator[bytes]]
+
+
+def build_normalizer(comparater: comparator.OutputComparator) -> Optional[Normalizer]:
+    """build_normalizer returns the function to yield the canonical form of outputs.
+
+    Two outputs are matched iff the digests of their canonical forms are equal.
+    Return None if the comparator has no canonical form (e.g. tolerant or special judge).
+    """
+    if isinstance(comparater, comparator.ExactComparator):
+        return lambda data: iter((data,))
+    if isinstance(comparater, comparator.StreamComparator):
+        return comparater.canonicalize
+    return None
+
+
+def digest(chunks: Iterable[bytes]) -> str:
+    h = hashlib.blake2b(digest_size=32)
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class DigestIndex:
+    """DigestIndex caches the digests of normalized expected outputs.
+
+    The index is saved per test directory under the cache directory, not in the test directory,
+    so that the mtime of the test directory (the key of discovery) is kept.
+    Each entry is invalidated when the size or mtime of the file changes.
+    """
+
+    def __init__(
+        self, normalizer: Normalizer, name: str, root: Optional[Path] = None
+    ) -> None:
+        """
+        name (str): identifies the normalization.
+        root (Path): the directory of indices. `$XDG_CACHE_HOME/judge/digests` by default
+        """
+        self.normalizer = normalizer
+        self.name = name
+        self.root = root or cache_home() / DIGEST_INDEX_DIR
+        self._lock = threading.Lock()
+        self._indices: Dict[Path, Dict[str, Any]] = {}
+        self._dirty: Dict[Path, bool] = {}
+
+    def index_path(self, directory: Path) -> Path:
+        key = str(directory.resolve())
+        return self.root / f"{content_hash(key.encode())}.json"
+
+    def _load(self, directory: Path) -> Dict[str, Any]:
+        if directory in self._indices:
+            return self._indices[directory]
+        index: Dict[str, Any] = {}
+        try:
+            with self.index_path(directory).open() as f:
+                data = json.load(f)
+            if data.get("version") == DIGEST_INDEX_VERSION and data.get(
+                "directory"
+            ) == str(directory.resolve()):
+                index = data.get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        self._indices[directory] = index
+        return index
+
+    def digest(self, data: bytes) -> str:
+        return digest(self.normalizer(data))
+
+    def lookup(self, path: Path) -> str:
+        """lookup returns the digest of the normalized file.
+
+        The file is read only if the digest is not cached or the file is updated.
+        """
+        stat = path.stat()
+        with self._lock:
+            index = self._load(path.parent)
+            entry = index.get(path.name)
+            if (
+                not isinstance(entry, dict)
+                or entry.get("size") != stat.st_size
+                or entry.get("mtime_ns") != stat.st_mtime_ns
+            ):
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                index[path.name] = entry
+            digests = entry.setdefault("digests", {})
+            if self.name in digests:
+                return str(digests[self.name])
+
+        value = self.digest(read_testcase(path))
+        with self._lock:
+            digests[self.name] = value
+            self._dirty[path.parent] = True
+        return value
+
+    def save(self) -> None:
+        """save writes updated indices. skipped if the cache directory is not writable."""
+        with self._lock:
+            for directory, dirty in self._dirty.items():
+                if not dirty:
+                    continue
+                data = {
+                    "version": DIGEST_INDEX_VERSION,
+                    "directory": str(directory.resolve()),
+                    "entries": self._indices[directory],
+                }
+                with contextlib.suppress(OSError):
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    write_atomic(self.index_path(directory), json.dumps(data).encode())
+            self._dirty = {}
@@ -0,0 +1,215 @@
+import contextlib
+import fnmatch
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from judge.schema import TestCasePath
+from judge.tools.archive import is_zip, open_archive, strip_compression
+from judge.tools.format import (
+    construct_relationship_of_files,
+    drop_backup_or_hidden_files,
+    embedd_percentformat,
+    glob_with_format,
+    is_backup_or_hidden_file,
+)
+from judge.tools.store import cache_home, content_hash, write_atomic
+
+DISCOVERY_INDEX_DIR = "discovery"
+DISCOVERY_INDEX_VERSION = 1
+NESTED_DIRS = ("in", "out")  # e.g. system testcases of AtCoder
+
+# (name, input relative to the test directory, expected output or None)
+Entry = Tuple[str, str, Optional[str]]
+
+
+class TestCaseIndex(Sequence[TestCasePath]):
+    """TestCaseIndex is the list of testcases sorted by name.
+
+    Each TestCasePath is built when accessed, so large test directories are not materialized at once.
+    """
+
+    def __init__(self, directory: Path, entries: List[Entry]) -> None:
+        self.directory = directory
+        self.entries = entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return TestCaseIndex(self.directory, self.entries[index])
+        return self._build(self.entries[index])
+
+    def __iter__(self) -> Iterator[TestCasePath]:
+        for entry in self.entries:
+            yield self._build(entry)
+
+    def select(self, name: str) -> "TestCaseIndex":
+        """select returns the testcases named `name`."""
+        return TestCaseIndex(
+            self.directory, [entry for entry in self.entries if entry[0] == name]
+        )
+
+    def _build(self, entry: Entry) -> TestCasePath:
+        name, in_path, out_path = entry
+        return TestCasePath(
+            name=name,
+            in_path=self.directory / in_path,
+            out_path=self.directory / out_path if out_path is not None else None,
+        )
+
+
+def _signature(directory: Path, format: str, ignore_backup: bool) -> Any:
+    """_signature changes when files are added to, removed from or renamed in the test directories."""
+    mtimes: List[Optional[int]] = []
+    for sub in ("",) + NESTED_DIRS:
+        try:
+            mtimes.append(os.stat(os.path.join(directory, sub)).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return [format, ignore_backup, mtimes]
+
+
+def _scan(directory: Path) -> List[str]:
+    try:
+        with os.scandir(directory) as it:
+            return [entry.name for entry in it if entry.is_file()]
+    except OSError:
+        return []
+
+
+def _discover_flat(directory: Path, format: str, ignore_backup: bool) -> List[Entry]:
+    pattern = embedd_percentformat(format).format(
+        s="*", e="*", i="*", n="*", b="*", d="*"
+    )
+    if "/" in pattern or os.path.sep in pattern:
+        paths = glob_with_format(directory, format)
+    else:
+        paths = [Path(name) for name in fnmatch.filter(_scan(directory), pattern)]
+    if ignore_backup:
+        paths = drop_backup_or_hidden_files(paths)
+    return _pair(paths)
+
+
+def _pair(paths: List[Path]) -> List[Entry]:
+    entries: List[Entry] = []
+    for testcase in construct_relationship_of_files(paths, strict=False):
+        if testcase.in_path is None:
+            continue
+        entries.append(
+            (
+                testcase.name,
+                str(testcase.in_path),
+                None if testcase.out_path is None else str(testcase.out_path),
+            )
+        )
+    return entries
+
+
+def _discover_nested(directory: Path, ignore_backup: bool) -> List[Entry]:
+    in_dir, out_dir = NESTED_DIRS
+    outputs = set(_scan(directory / out_dir))
+    entries: List[Entry] = []
+    for filename in _scan(directory / in_dir):
+        if ignore_backup and is_backup_or_hidden_file(Path(filename)):
+            continue
+        name = os.path.splitext(strip_compression(filename))[0]
+        out_path = f"{out_dir}/{filename}" if filename in outputs else None
+        entries.append((name, f"{in_dir}/{filename}", out_path))
+    return entries
+
+
+def _discover_zip(path: Path, format: str, ignore_backup: bool) -> List[Entry]:
+    """_discover_zip finds testcases in the zip file like the directory.
+
+    Nested `in/` and `out/` directories are found at any depth, e.g. `abc001/A/in/X` named `abc001-A-X`.
+    """
+    pattern = embedd_percentformat(format).format(
+        s="*", e="*", i="*", n="*", b="*", d="*"
+    )
+    in_dir, out_dir = NESTED_DIRS
+    members = open_archive(path).members
+    flat: List[Path] = []
+    entries: List[Entry] = []
+    for member in members:
+        parent, _, filename = member.rpartition("/")
+        if ignore_backup and is_backup_or_hidden_file(Path(filename)):
+            continue
+        if not parent and fnmatch.fnmatch(filename, pattern):
+            flat.append(Path(filename))
+            continue
+        prefix, _, sub = parent.rpartition("/")
+        if sub != in_dir:
+            continue
+        prefix = f"{prefix}/" if prefix else ""
+        out_path = f"{prefix}{out_dir}/{filename}"
+        # names are used for file names of artifacts
+        name = (
+            prefix.replace("/", "-") + os.path.splitext(strip_compression(filename))[0]
+        )
+        entries.append((name, member, out_path if out_path in members else None))
+    return entries + _pair(flat)
+
+
+def index_path(directory: Path) -> Path:
+    """the index of the test directory under the cache directory, not to change the directory"""
+    key = str(directory.resolve())
+    return cache_home() / DISCOVERY_INDEX_DIR / f"{content_hash(key.encode())}.json"
+
+
+def _load(directory: Path, signature: Any) -> Optional[List[Entry]]:
+    try:
+        with index_path(directory).open() as f:
+            data = json.load(f)
+        if (
+            data.get("version") != DISCOVERY_INDEX_VERSION
+            or data.get("directory") != str(directory.resolve())
+            or data.get("signature") != signature
+        ):
+            return None
+        return [
+            (name, in_path, out_path) for name, in_path, out_path in data["entries"]
+        ]
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        return None
+
+
+def _save(directory: Path, signature: Any, entries: List[Entry]) -> None:
+    """_save writes the index. skipped if the cache directory is not writable.
+
+    signature (Any): the signature taken before the scan, so files added during the scan invalidate the index
+    """
+    path = index_path(directory)
+    data = {
+        "version": DISCOVERY_INDEX_VERSION,
+        "directory": str(directory.resolve()),
+        "signature": signature,
+        "entries": entries,
+    }
+    with contextlib.suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, json.dumps(data).encode())
+
+
+def discover(directory: Path, format: str, ignore_backup: bool = True) -> TestCaseIndex:
+    """discover finds testcases in the test directory.
+
+    Both flat files matching `format` (e.g. `sample-1.in` and `sample-1.out`) and
+    nested directories (`in/X` and `out/X`) are supported, and other files are skipped.
+    The result is cached until files are added to, removed from or renamed in the directory.
+    The directory may be a zip file, whose members are read without extraction.
+    """
+    if is_zip(directory):
+        members = _discover_zip(directory, format, ignore_backup)
+        members.sort(key=lambda entry: entry[0])
+        return TestCaseIndex(directory, members)
+    signature = _signature(directory, format, ignore_backup)
+    entries = _load(directory, signature)
+    if entries is None:
+        entries = _discover_flat(directory, format, ignore_backup)
+        entries += _discover_nested(directory, ignore_backup)
+        entries.sort(key=lambda entry: entry[0])
+        _save(directory, signature, entries)
+    return TestCaseIndex(directory, entries)
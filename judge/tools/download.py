@@ -1,15 +1,14 @@
+import concurrent.futures
 import contextlib
 import http.cookiejar
 import os
 from abc import ABC
 from dataclasses import dataclass, field
-from functools import partial
 from pathlib import Path
 from typing import Generator, Iterator, List, Optional, Tuple
 
 import onlinejudge.dispatch as dispatch
 import onlinejudge.utils as utils
-import pkg_resources
 import requests
 from onlinejudge.service.yukicoder import YukicoderProblem
 from onlinejudge.type import Problem, SampleParseError, Service, TestCase
@@ -18,6 +17,8 @@ from typing_extensions import Literal
 
 from judge.schema import Sample
 from judge.tools.format import embedd_percentformat
+from judge.tools.httpcache import ResponseCache
+from judge.tools.store import TestCaseStore, write_atomic
 
 
 def url_from_contest(contest: str, problem: str) -> str:
@@ -25,20 +26,28 @@ def url_from_contest(contest: str, problem: str) -> str:
     return url
 
 
+def _version() -> str:
+    # pkg_resources is slow to import, so it is the fallback for Python 3.7
+    try:
+        from importlib.metadata import version
+    except ImportError:  # pragma: no cover
+        import pkg_resources  # type: ignore
+
+        return str(pkg_resources.get_distribution("judge").version)
+    return version("judge")
+
+
 @contextlib.contextmanager
 def create_UA_session(
     *, path: Path, token: Optional[str] = None
 ) -> Iterator[requests.Session]:
     """create new session with our User-Agent"""
     session = requests.Session()
-    pkg = pkg_resources.get_distribution("judge")
     try:
         url = __url__  # type: ignore
     except NameError:
         url = ""
-    session.headers["User-Agent"] = "{}/{} (+{})".format(
-        pkg.project_name, pkg.version, url
-    )
+    session.headers["User-Agent"] = "{}/{} (+{})".format("judge", _version(), url)
     if token:
         session.headers["Authorization"] = f"Bearer {token}"
     try:
@@ -64,6 +73,7 @@ class DownloadArgs:
     service: Service = field(init=False, repr=True)
     login_form: Optional[LoginForm] = None
     token: Optional[str] = None
+    cache: Optional[ResponseCache] = None  # reuse pages and testcases not modified
 
     def __post_init__(self) -> None:
         if self.url:
@@ -89,6 +99,9 @@ class DownloadArgs:
 class SaveArgs:
     format: str
     directory: Path
+    store: Optional[TestCaseStore] = None  # link testcases into the shared store
+    sync: bool = False  # overwrite files changed instead of raising FileExistsError
+    jobs: Optional[int] = None  # the number of concurrent writes
 
 
 def get_extensions() -> Generator[Literal["in", "out"], None, None]:
@@ -119,35 +132,82 @@ def testcases_to_samples(
             )
 
 
-def download(args: DownloadArgs) -> List[TestCase]:
-    # download samples
+def download_testcases(
+    problem: Problem,
+    session: requests.Session,
+    *,
+    system: bool = False,
+    cache: Optional[ResponseCache] = None,
+) -> List[TestCase]:
+    def _download() -> List[TestCase]:
+        if system:
+            return problem.download_system_cases(session=session)
+        return problem.download_sample_cases(session=session)
+
+    if cache is None or system:
+        # system testcases are too large to be cached
+        return _download()
+    cache.mount(session)
+    key = f"{problem.get_url()}#{'system' if system else 'sample'}"
+    return cache.cached(key, session, _download)
+
+
+@contextlib.contextmanager
+def logged_in_session(args: DownloadArgs) -> Iterator[requests.Session]:
+    """logged_in_session creates the session, and logs in if the login form is given."""
     with create_UA_session(path=args.cookie, token=args.token) as sess:
-        if not args.service.is_logged_in(session=sess) and args.login_form:
+        offline = args.cache is not None and args.cache.offline
+        if (
+            not offline
+            and args.login_form
+            and not args.service.is_logged_in(session=sess)
+        ):
             args.service.login(
                 get_credentials=args.login_form.get_credentials, session=sess
             )
-        if args.system:
-            testcases = args.problem.download_system_cases(session=sess)
-        else:
-            testcases = args.problem.download_sample_cases(session=sess)
+        yield sess
+
+
+def download(args: DownloadArgs) -> List[TestCase]:
+    # download samples
+    with logged_in_session(args) as sess:
+        testcases = download_testcases(
+            args.problem, sess, system=args.system, cache=args.cache
+        )
     if not testcases:
         raise SampleParseError("Sample not found")
     return testcases
 
 
-def save(testcases: List[TestCase], args: SaveArgs) -> None:
-    get_samples = partial(testcases_to_samples, testcases, args.format, args.directory)
+def _write(sample: Sample, store: Optional[TestCaseStore]) -> None:
+    if store is not None:
+        store.link(sample.data, sample.path)
+    else:
+        write_atomic(sample.path, sample.data)
+
+
+def save(testcases: List[TestCase], args: SaveArgs) -> List[Path]:
+    """save writes testcases in parallel. each file is replaced atomically, so never half-written.
+
+    :returns: the files written. files not changed are kept as is
+    """
     # TODO: append the history for submit subcommand
 
-    # raise if new sample overwrides existing files
-    for sample in get_samples():
+    # raise if new sample overwrides existing files, before anything is written
+    samples: List[Sample] = []
+    for sample in testcases_to_samples(testcases, args.format, args.directory):
         if sample.path.exists():
-            raise FileExistsError(
-                "Failed to download since file already exists: " + str(sample.path)
-            )
-
-    # save samples
-    for sample in get_samples():
-        sample.path.parent.mkdir(parents=True, exist_ok=True)
-        with sample.path.open("wb") as fh:
-            fh.write(sample.data)
+            if sample.path.read_bytes() == sample.data:
+                continue
+            if not args.sync:
+                raise FileExistsError(
+                    "Failed to download since file already exists: " + str(sample.path)
+                )
+        samples.append(sample)
+
+    for directory in {sample.path.parent for sample in samples}:
+        directory.mkdir(parents=True, exist_ok=True)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        for future in [executor.submit(_write, s, args.store) for s in samples]:
+            future.result()
+    return [sample.path for sample in samples]
@@ -0,0 +1,97 @@
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Deque
+
+CHUNK_SIZE = 1 << 16  # byte
+
+
+@dataclass
+class ExcerptLimits:
+    """the head and the tail of large data are shown, and the middle is omitted"""
+
+    head_lines: int = 50
+    tail_lines: int = 10
+    head_bytes: int = 4096
+    tail_bytes: int = 1024
+
+
+def _head(data: bytes, lines: int) -> bytes:
+    pos = -1
+    for _ in range(lines):
+        pos = data.find(b"\n", pos + 1)
+        if pos == -1:
+            return data
+    return data[: pos + 1]
+
+
+def _tail(data: bytes, lines: int) -> bytes:
+    if lines <= 0:
+        return b""
+    # the trailing newline doesn't start a new line
+    pos = len(data) - 1 if data.endswith(b"\n") else len(data)
+    for _ in range(lines):
+        pos = data.rfind(b"\n", 0, pos)
+        if pos == -1:
+            return data
+    return data[pos + 1 :]
+
+
+def join_excerpt(head: bytes, tail: bytes, size: int, limits: ExcerptLimits) -> str:
+    """join_excerpt builds the excerpt from the head and the tail of data.
+
+    head (bytes): the head of data cut by `limits.head_bytes` and `limits.head_lines`
+    tail (bytes): data[max(size - limits.tail_bytes, len(head)):]
+    """
+    tail = _tail(tail, limits.tail_lines)
+    omitted = size - len(head) - len(tail)
+    if omitted <= 0:
+        return (head + tail).decode(errors="replace")
+    marker = f"... ({omitted} bytes omitted) ...\n"
+    if head and not head.endswith(b"\n"):
+        marker = "\n" + marker
+    return head.decode(errors="replace") + marker + tail.decode(errors="replace")
+
+
+def excerpt(data: bytes, limits: ExcerptLimits) -> str:
+    size = len(data)
+    head = _head(data[: limits.head_bytes], limits.head_lines)
+    tail = data[max(size - limits.tail_bytes, len(head)) :]
+    return join_excerpt(head, tail, size, limits)
+
+
+def excerpt_file(path: Path, limits: ExcerptLimits) -> str:
+    """excerpt_file reads only the head and the tail of the file."""
+    with path.open("rb") as f:
+        size = f.seek(0, 2)
+        f.seek(0)
+        head = _head(f.read(limits.head_bytes), limits.head_lines)
+        f.seek(max(size - limits.tail_bytes, len(head)))
+        tail = f.read()
+    return join_excerpt(head, tail, size, limits)
+
+
+def excerpt_stream(stream: IO[bytes], limits: ExcerptLimits) -> str:
+    """excerpt_stream reads the stream once, and keeps only the head and the tail of it.
+
+    For compressed or archived files, which can't seek to the tail.
+    """
+    data = stream.read(limits.head_bytes)
+    head = _head(data, limits.head_lines)
+    size = len(data)
+    # chunks after the head. only chunks covering the last `tail_bytes` are kept
+    chunks: Deque[bytes] = deque([data[len(head) :]])
+    kept = len(chunks[0])
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        chunks.append(chunk)
+        kept += len(chunk)
+        while kept - len(chunks[0]) >= limits.tail_bytes:
+            kept -= len(chunks.popleft())
+    tail = b"".join(chunks)
+    return join_excerpt(
+        head, tail[max(len(tail) - limits.tail_bytes, 0) :], size, limits
+    )
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Dict, Generator, List
 
 from judge.schema import TestCasePath
+from judge.tools.archive import strip_compression
 
 
 def percentsplit(s: str) -> Generator[str, None, None]:
@@ -69,17 +70,26 @@ def drop_backup_or_hidden_files(paths: List[Path]) -> List[Path]:
     return result
 
 
-def construct_relationship_of_files(paths: List[Path]) -> List[TestCasePath]:
+def construct_relationship_of_files(
+    paths: List[Path], strict: bool = True
+) -> List[TestCasePath]:
+    """construct_relationship_of_files pairs `name.in` and `name.out`.
+
+    Compressed files like `name.in.xz` are also paired.
+    strict (bool): raise on files with other extensions. they are skipped if False.
+    """
     tests: Dict[str, TestCasePath] = {}
     for path in paths:
-        name, ext = os.path.splitext(os.path.basename(path))
+        name, ext = os.path.splitext(strip_compression(os.path.basename(path)))
+        if ext not in (".in", ".out"):
+            if strict:
+                raise FileNotFoundError("unrecognizable file found: %s", path)
+            continue
         if not tests.get(name):
             tests[name] = TestCasePath(name=name)
         if ext == ".in":
             tests[name].in_path = path
-        elif ext == ".out":
-            tests[name].out_path = path
         else:
-            raise FileNotFoundError("unrecognizable file found: %s", path)
+            tests[name].out_path = path
 
     return list(tests.values())
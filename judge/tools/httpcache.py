@@ -0,0 +1,216 @@
+import contextlib
+import hashlib
+import json
+import pickle
+import threading
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from judge.tools.store import cache_home, write_atomic
+
+T = TypeVar("T")
+
+CACHE_STATUS = "X-Judge-Cache"  # miss, modified, not-modified, fresh or offline
+VALIDATORS = ("ETag", "Last-Modified")
+KEPT_HEADERS = VALIDATORS + ("Content-Type",)
+
+_recording = threading.local()
+
+
+def default_cache_directory() -> Path:
+    return cache_home() / "http"
+
+
+def _key(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, data)
+
+
+class ResponseCache:
+    """ResponseCache keeps responses of problem pages and testcases parsed from them.
+
+    Cached responses are revalidated with ETag and If-Modified-Since.
+    Only requests in `ResponseCache.cached` are cached, so pages depending on the login state
+    (e.g. the check of login) are always fetched.
+
+    offline (bool): serve everything from the cache without network. uncached requests fail.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, offline: bool = False) -> None:
+        self.directory = directory or default_cache_directory()
+        self.offline = offline
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = _key(url)
+        base = self.directory / "responses" / key[:2] / key[2:]
+        return base.with_suffix(".json"), base.with_suffix(".body")
+
+    def load(self, url: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """
+        :returns: the headers and the body of the cached response
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return meta["headers"], body
+
+    def store(self, url: str, headers: Dict[str, str], body: Optional[bytes]) -> None:
+        """store saves the response. the body is kept if None, i.e. not modified."""
+        meta_path, body_path = self._paths(url)
+        if body is not None:
+            _write_atomic(body_path, body)
+        meta = {"url": url, "headers": headers}
+        _write_atomic(meta_path, json.dumps(meta).encode())
+
+    def mount(self, session: requests.Session) -> None:
+        """mount makes the session use the cache. adapters mounted already are wrapped."""
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, CachingAdapter):
+                session.mount(prefix, CachingAdapter(adapter, self))
+
+    def cached(self, key: str, session: requests.Session, fn: Callable[[], T]) -> T:
+        """cached returns the result of `fn` computed last time if the pages it fetched are not modified.
+
+        Otherwise, `fn` is called and its responses are cached.
+        """
+        path = self.directory / "parsed" / f"{_key(key)}.pickle"
+        with recording() as record:
+            with contextlib.suppress(OSError, pickle.UnpicklingError, EOFError):
+                with path.open("rb") as f:
+                    urls, last = pickle.load(f)
+                if self.offline or all(
+                    self._not_modified(session, url) for url in urls
+                ):
+                    return cast(T, last)
+            # pages revalidated above are not requested again
+            record.urls.clear()
+            value = fn()
+        _write_atomic(path, pickle.dumps((record.urls, value)))
+        return value
+
+    def _not_modified(self, session: requests.Session, url: str) -> bool:
+        resp = session.get(url)
+        return resp.headers.get(CACHE_STATUS) == "not-modified"
+
+
+class _Record:
+    def __init__(self) -> None:
+        self.urls: List[str] = []  # fetched
+        self.fresh: Set[str] = set()  # validated with the server
+
+
+@contextlib.contextmanager
+def recording() -> Iterator[_Record]:
+    """recording enables the cache in this thread, and records URLs fetched."""
+    record = _Record()
+    outer = getattr(_recording, "record", None)
+    _recording.record = record
+    try:
+        yield record
+    finally:
+        _recording.record = outer
+
+
+def _from_cache(
+    request: requests.PreparedRequest,
+    headers: Dict[str, str],
+    body: bytes,
+    status: str,
+) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.reason = "OK"
+    resp.url = request.url or ""
+    resp.request = request
+    resp.headers = CaseInsensitiveDict(headers)
+    resp.headers[CACHE_STATUS] = status
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp._content = body
+    return resp
+
+
+class CachingAdapter(BaseAdapter):
+    """CachingAdapter sends conditional requests for cached responses through the wrapped adapter."""
+
+    def __init__(self, adapter: BaseAdapter, cache: ResponseCache) -> None:
+        super().__init__()
+        self.adapter = adapter
+        self.cache = cache
+
+    def send(  # type: ignore
+        self, request: requests.PreparedRequest, stream: bool = False, **kwargs: Any
+    ) -> requests.Response:
+        record: Optional[_Record] = getattr(_recording, "record", None)
+        url = request.url or ""
+        if record is None or request.method != "GET" or stream:
+            if self.cache.offline:
+                raise requests.exceptions.ConnectionError(
+                    f"Not available in offline mode: {url}"
+                )
+            return self.adapter.send(request, stream=stream, **kwargs)
+
+        record.urls.append(url)
+        cached = self.cache.load(url)
+        if self.cache.offline:
+            if cached is None:
+                raise requests.exceptions.ConnectionError(f"Not cached: {url}")
+            return _from_cache(request, *cached, status="offline")
+        if cached is not None and url in record.fresh:
+            return _from_cache(request, *cached, status="fresh")
+
+        if cached is not None:
+            headers, _ = cached
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+        resp = self.adapter.send(request, stream=stream, **kwargs)
+
+        if resp.status_code == 304 and cached is not None:
+            headers, body = cached
+            headers.update(
+                {k: resp.headers[k] for k in VALIDATORS if k in resp.headers}
+            )
+            resp.close()
+            self.cache.store(url, headers, None)
+            record.fresh.add(url)
+            return _from_cache(request, headers, body, status="not-modified")
+        if resp.status_code == 200:
+            headers = {k: resp.headers[k] for k in KEPT_HEADERS if k in resp.headers}
+            if cached is None:
+                status = "miss"
+            elif cached[1] == resp.content:
+                # the server does not support conditional requests
+                status = "not-modified"
+            else:
+                status = "modified"
+            self.cache.store(url, headers, resp.content)
+            record.fresh.add(url)
+            resp.headers[CACHE_STATUS] = status
+        return resp
+
+    def close(self) -> None:
+        self.adapter.close()
@@ -0,0 +1,286 @@
+import contextlib
+import os
+import selectors
+import shlex
+import signal
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, List, Optional
+
+from judge.schema import TimerMode
+from judge.tools import archive, utils
+from judge.tools.trace import span
+
+PIPE_BUFFER = 1 << 16  # byte. the size of a single read from pipes
+
+
+@dataclass
+class InteractiveHistory:
+    returncode: Optional[int]  # of the solution. None if TLE
+    interactor_returncode: Optional[int]  # None if TLE
+    elapsed: float = -1  # ms
+    memory: Optional[float] = None  # MB
+    stderr: bytes = b""  # of the solution
+    message: bytes = b""  # stderr of the interactor
+    transcript: Optional[bytes] = None
+
+
+class Transcript:
+    """Transcript records messages between the solution and the interactor line by line.
+
+    Lines sent by the solution are prefixed by "> ", and lines sent by the interactor by "< ".
+    """
+
+    def __init__(self) -> None:
+        self.lines: List[bytes] = []
+        self._partial: Dict[bytes, bytes] = {}
+
+    def write(self, prefix: bytes, data: bytes) -> None:
+        data = self._partial.pop(prefix, b"") + data
+        *lines, rest = data.split(b"\n")
+        self.lines.extend(prefix + line + b"\n" for line in lines)
+        if rest:
+            self._partial[prefix] = rest
+
+    def getvalue(self) -> bytes:
+        for prefix, rest in self._partial.items():
+            self.lines.append(prefix + rest + b"\n")
+        self._partial.clear()
+        return b"".join(self.lines)
+
+
+class _Pump:
+    """_Pump copies data between processes using a single selector.
+
+    Writes are non-blocking and buffered per destination, so a slow reader never blocks the other direction.
+    """
+
+    def __init__(self, transcript: Optional[Transcript]) -> None:
+        self.selector = selectors.DefaultSelector()
+        self.transcript = transcript
+        self.captured: Dict[int, bytearray] = {}
+        self.routes: Dict[int, "_Route"] = {}  # fd of a source -> route
+        self.pending: Dict[int, "_Route"] = {}  # fd of a destination -> route
+
+    def capture(self, source: IO[bytes]) -> bytearray:
+        buffer = bytearray()
+        self.captured[source.fileno()] = buffer
+        self.selector.register(source, selectors.EVENT_READ)
+        return buffer
+
+    def connect(self, source: IO[bytes], destination: IO[bytes], prefix: bytes) -> None:
+        os.set_blocking(destination.fileno(), False)
+        self.routes[source.fileno()] = _Route(source, destination, prefix)
+        self.selector.register(source, selectors.EVENT_READ)
+
+    def run(self, deadline: Optional[float]) -> bool:
+        """
+        :returns: False if the deadline passed before all sources are closed.
+        """
+        while self.selector.get_map():
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    return False
+            for key, events in self.selector.select(timeout):
+                if events & selectors.EVENT_READ:
+                    self._read(key.fileobj)  # type: ignore
+                if events & selectors.EVENT_WRITE:
+                    self._flush(self.pending[key.fd])
+        return True
+
+    def close(self) -> None:
+        for key in list(self.selector.get_map().values()):
+            self.selector.unregister(key.fileobj)
+        self.selector.close()
+
+    def _read(self, source: IO[bytes]) -> None:
+        fd = source.fileno()
+        data = os.read(fd, PIPE_BUFFER)
+        route = self.routes.get(fd)
+        if route is None:
+            if data:
+                self.captured[fd] += data
+            else:
+                self.selector.unregister(source)
+            return
+        if not data:
+            self.selector.unregister(source)
+            route.eof = True
+        elif not route.closed:
+            route.buffer += data
+            if self.transcript is not None:
+                self.transcript.write(route.prefix, data)
+        self._flush(route)
+
+    def _flush(self, route: "_Route") -> None:
+        if route.closed:
+            return
+        fd = route.destination.fileno()
+        try:
+            while route.buffer:
+                written = os.write(fd, route.buffer)
+                del route.buffer[:written]
+        except BlockingIOError:
+            pass
+        except BrokenPipeError:
+            # the destination has exited. drop the rest
+            route.buffer.clear()
+            route.eof = True
+
+        waiting = fd in self.pending
+        if route.buffer and not waiting:
+            self.pending[fd] = route
+            self.selector.register(route.destination, selectors.EVENT_WRITE)
+        elif not route.buffer and waiting:
+            del self.pending[fd]
+            self.selector.unregister(route.destination)
+        if not route.buffer and route.eof:
+            route.closed = True
+            route.destination.close()
+
+
+class _Route:
+    __slots__ = ("source", "destination", "prefix", "buffer", "eof", "closed")
+
+    def __init__(
+        self, source: IO[bytes], destination: IO[bytes], prefix: bytes
+    ) -> None:
+        self.source = source
+        self.destination = destination
+        self.prefix = prefix
+        self.buffer = bytearray()
+        self.eof = False
+        self.closed = False
+
+
+def _kill(proc: "subprocess.Popen[bytes]", group: bool) -> None:
+    try:
+        if group:
+            os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _wait(proc: "subprocess.Popen[bytes]", deadline: Optional[float]) -> bool:
+    timeout = None if deadline is None else max(deadline - time.perf_counter(), 0)
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        return False
+    return True
+
+
+def exec_interactive(
+    command_str: str,
+    interactor_str: str,
+    input_path: Path,
+    output_path: Optional[Path] = None,
+    *,
+    timeout: Optional[float] = None,
+    gnu_time: Optional[str] = None,
+    transcript: bool = False,
+) -> InteractiveHistory:
+    """exec_interactive runs the solution and the interactor with cross-wired stdin and stdout.
+
+    The interactor is called as `<interactor> <input> [<expected output>]`, and AC if exits with 0.
+    Without `transcript`, the pipes are connected directly and messages never pass this process.
+
+    timeout (float): ms. applied to both processes
+    """
+    if gnu_time and gnu_time != TimerMode.GNU_TIME.value:
+        raise ValueError(f"{gnu_time} is expected [None, 'gnu-time']")
+    command = shlex.split(command_str)
+    with contextlib.ExitStack() as stack:
+        # compressed or archived testcases are passed as in-memory files
+        paths, pass_fds = stack.enter_context(
+            archive.materialize([input_path, output_path])
+        )
+        if output_path is None:
+            paths = paths[:1]
+        interactor_command = shlex.split(interactor_str) + paths
+        report = stack.enter_context(tempfile.NamedTemporaryFile(delete=True))
+        group = False
+        if gnu_time:
+            command = utils.gnu_time_command(command, report.name)
+            # see utils._exec_with_gnu_time
+            group = os.name == "posix"
+
+        recorder = Transcript() if transcript else None
+        pipes: List[int] = []
+        if recorder is None:
+            to_interactor, from_solution = os.pipe()
+            to_solution, from_interactor = os.pipe()
+            pipes = [to_interactor, from_solution, to_solution, from_interactor]
+            solution_stdin, solution_stdout = to_solution, from_solution
+            interactor_stdin, interactor_stdout = to_interactor, from_interactor
+        else:
+            solution_stdin = solution_stdout = subprocess.PIPE
+            interactor_stdin = interactor_stdout = subprocess.PIPE
+
+        begin = time.perf_counter()
+        deadline = begin + timeout / 1000 if timeout else None
+        with span("spawn", "exec"):
+            try:
+                interactor = subprocess.Popen(
+                    interactor_command,
+                    stdin=interactor_stdin,
+                    stdout=interactor_stdout,
+                    stderr=subprocess.PIPE,
+                    pass_fds=pass_fds,
+                )
+                proc = subprocess.Popen(
+                    command,
+                    stdin=solution_stdin,
+                    stdout=solution_stdout,
+                    stderr=subprocess.PIPE,
+                    preexec_fn=os.setsid if group else None,
+                )  # pylint: disable=subprocess-popen-preexec-fn
+            finally:
+                # the children have their own copies
+                for fd in pipes:
+                    os.close(fd)
+
+        pump = _Pump(recorder)
+        stderr = pump.capture(proc.stderr)  # type: ignore
+        message = pump.capture(interactor.stderr)  # type: ignore
+        if recorder is not None:
+            pump.connect(proc.stdout, interactor.stdin, b"> ")  # type: ignore
+            pump.connect(interactor.stdout, proc.stdin, b"< ")  # type: ignore
+        finished = False
+        try:
+            with span("run", "exec"):
+                finished = pump.run(deadline)
+                finished = finished and _wait(proc, deadline)
+                finished = finished and _wait(interactor, deadline)
+        finally:
+            pump.close()
+            if not finished:
+                _kill(proc, group)
+                _kill(interactor, False)
+            for p in (proc, interactor):
+                p.wait()
+                for stream in (p.stdin, p.stdout, p.stderr):
+                    if stream is not None:
+                        stream.close()
+        end = time.perf_counter()
+
+        history = InteractiveHistory(
+            returncode=proc.returncode if finished else None,
+            interactor_returncode=interactor.returncode if finished else None,
+            elapsed=1000 * (end - begin),
+            stderr=bytes(stderr),
+            message=bytes(message),
+            transcript=recorder.getvalue() if recorder is not None else None,
+        )
+        if gnu_time:
+            reported = utils.read_gnu_time(report.name)
+            if reported is not None:
+                history.elapsed, history.memory = reported
+    return history
@@ -0,0 +1,149 @@
+import os
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from judge.schema import History, JudgeStatus, TestCasePath
+from judge.tools import archive, utils
+from judge.tools.profile import (
+    PROFILE_TIMEOUT_SCALE,
+    bootstrap_command,
+    split_python_command,
+)
+
+# the bootstrap samples the traced memory and keeps the snapshot near the peak.
+# the snapshot is dumped even if killed by SIGTERM.
+MEMPROFILE_BOOTSTRAP = """\
+import os, runpy, signal, sys, threading, tracemalloc
+out, sys.argv = sys.argv[1], sys.argv[2:]
+sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[0]))
+def _stop(signum, frame):
+    raise SystemExit(128 + signum)
+signal.signal(signal.SIGTERM, _stop)
+best = [0, None]
+lock = threading.Lock()
+done = threading.Event()
+def _take():
+    with lock:
+        current, _ = tracemalloc.get_traced_memory()
+        if best[1] is None or current > best[0] * 1.05:
+            best[1] = tracemalloc.take_snapshot()
+            best[0] = current
+def _sample():
+    while not done.wait(0.01):
+        _take()
+tracemalloc.start(8)
+threading.Thread(target=_sample, daemon=True).start()
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+    _take()
+finally:
+    done.set()
+    with lock:
+        _, peak = tracemalloc.get_traced_memory()
+        if best[1] is None:
+            best[1] = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        best[1].dump(out)
+        with open(out + ".peak", "w") as f:
+            f.write(str(peak))
+"""
+
+# allocations by the bootstrap and the import machinery are not interesting
+IGNORED_TRACES = [
+    tracemalloc.Filter(False, "<string>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, "<frozen *>"),
+    tracemalloc.Filter(False, "*/tracemalloc.py"),
+    tracemalloc.Filter(False, "*/threading.py"),
+    tracemalloc.Filter(False, "*/runpy.py"),
+    tracemalloc.Filter(False, "*/pkgutil.py"),
+    tracemalloc.Filter(False, "*/importlib/*"),
+]
+
+
+def select_targets(histories: List[History]) -> List[History]:
+    """select_targets picks MLE histories, or the max memory history if no MLE."""
+    mle = [hist for hist in histories if hist.status == JudgeStatus.MLE]
+    if mle:
+        return mle
+    max_mem: Optional[History] = None
+    for hist in histories:
+        if hist.memory is None:
+            continue
+        if max_mem is None or max_mem.memory is None or hist.memory >= max_mem.memory:
+            max_mem = hist
+    if max_mem is None:
+        return []
+    return [max_mem]
+
+
+@dataclass
+class MemProfileArgs:
+    history: History
+    command: str
+    directory: Path
+    tle: Optional[float] = None
+
+
+@dataclass
+class MemProfileResult:
+    testcase: TestCasePath
+    command: str
+    snapshot_path: Path
+    snapshot: Optional[tracemalloc.Snapshot] = None
+    peak: Optional[int] = None  # byte
+    error: Optional[str] = None
+
+    def statistics(self, key_type: str = "lineno") -> List[tracemalloc.Statistic]:
+        if self.snapshot is None:
+            return []
+        return self.snapshot.statistics(key_type)
+
+
+def memprofile(args: MemProfileArgs) -> MemProfileResult:
+    """memprofile re-runs a testcase with tracemalloc enabled.
+
+    The snapshot near the peak of traced memory is saved into `args.directory`.
+    NOTE: PyPy3 does not support tracemalloc.
+    """
+    testcase = args.history.testcase
+    interpreter, _ = split_python_command(args.command)
+    stem = f"memprofile-{testcase.name}-{os.path.basename(interpreter)}"
+    snapshot_path = args.directory / f"{stem}.snapshot"
+    peak_path = args.directory / f"{stem}.snapshot.peak"
+    for path in (snapshot_path, peak_path):
+        if path.exists():
+            path.unlink()
+    result = MemProfileResult(
+        testcase=testcase, command=args.command, snapshot_path=snapshot_path
+    )
+    if os.path.basename(interpreter).startswith("pypy"):
+        result.error = "tracemalloc is not supported by PyPy3"
+        return result
+    if testcase.in_path is None:
+        result.error = "input file not found"
+        return result
+
+    command = bootstrap_command(args.command, MEMPROFILE_BOOTSTRAP, snapshot_path)
+    timeout = args.tle * PROFILE_TIMEOUT_SCALE if args.tle else None
+    with archive.stdin_for(testcase.in_path) as inf:
+        history = utils.exec_command(command, stdin=inf, timeout=timeout)
+    # wait for dumping the snapshot after the termination by timeout
+    history.proc.wait()
+
+    if not snapshot_path.exists():
+        result.error = "snapshot was not dumped"
+        return result
+    try:
+        snapshot = tracemalloc.Snapshot.load(str(snapshot_path))
+    except Exception as e:
+        result.error = f"failed to load snapshot: {e}"
+        return result
+    result.snapshot = snapshot.filter_traces(IGNORED_TRACES)
+    if peak_path.exists():
+        with peak_path.open() as f:
+            result.peak = int(f.read())
+        peak_path.unlink()
+    return result
@@ -0,0 +1,179 @@
+import abc
+import concurrent.futures
+import importlib
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from judge.schema import CompareMode, JudgeStatus
+from judge.tools import utils
+from judge.tools.stress import helper_timeout
+from judge.tools.testing import build_comparater, judge
+
+
+class Reducer(abc.ABC):
+    """Reducer splits an input into parts which are removed one by one.
+
+    Structure-aware reducers can fix up the joined input in `join`,
+    e.g. rewrite the header line which holds the number of lines.
+    """
+
+    @abc.abstractmethod
+    def split(self, data: bytes) -> List[bytes]:
+        """
+        :returns: parts of the input. each part is a candidate for removal.
+        """
+
+    @abc.abstractmethod
+    def join(self, parts: Sequence[bytes]) -> bytes:
+        """
+        :returns: the input built from remaining parts.
+        """
+
+
+class LineReducer(Reducer):
+    def split(self, data: bytes) -> List[bytes]:
+        return data.splitlines(keepends=True)
+
+    def join(self, parts: Sequence[bytes]) -> bytes:
+        return b"".join(parts)
+
+
+class TokenReducer(Reducer):
+    _token = re.compile(rb"\s*\S+")
+
+    def split(self, data: bytes) -> List[bytes]:
+        parts: List[bytes] = self._token.findall(data)
+        # keep trailing spaces and newlines at the last part
+        rest = data[sum(len(p) for p in parts) :]
+        if parts:
+            parts[-1] += rest
+        return parts
+
+    def join(self, parts: Sequence[bytes]) -> bytes:
+        return b"".join(parts)
+
+
+REDUCERS = {"line": LineReducer, "token": TokenReducer}
+
+
+def load_reducer(name: str) -> Reducer:
+    """load_reducer returns the builtin reducer or imports `module:Class`."""
+    if name in REDUCERS:
+        return REDUCERS[name]()
+    if ":" not in name:
+        raise ValueError(f"unknown reducer: {name}. use line, token or module:Class")
+    module_name, class_name = name.split(":", 1)
+    module = importlib.import_module(module_name)
+    reducer = getattr(module, class_name)()
+    if not isinstance(reducer, Reducer):
+        raise TypeError(f"{name} is not a subclass of Reducer")
+    return reducer
+
+
+@dataclass
+class MinimizeArgs:
+    command: str
+    status: JudgeStatus
+    compare_mode: CompareMode
+    reference: Optional[str] = None
+    jobs: Optional[int] = None
+    tle: Optional[float] = None
+    error: Optional[float] = None
+
+
+def run_reference(data: bytes, args: MinimizeArgs) -> Optional[bytes]:
+    """run_reference returns the expected output for the input.
+
+    :returns: None if the reference solution fails or exceeds the timeout, i.e. the input is invalid
+    """
+    assert args.reference is not None
+    ref = utils.exec_command(
+        args.reference, input=data, timeout=helper_timeout(args.tle)
+    )
+    if ref.proc.returncode != 0:
+        return None
+    return ref.answer or b""
+
+
+def build_verdict(args: MinimizeArgs) -> Callable[[bytes], Optional[JudgeStatus]]:
+    """build_verdict builds the function to judge the solution for an input.
+
+    The expected output is computed by the reference solution if given.
+    Otherwise, the output is not checked, so only RE and TLE can be preserved.
+    Return None if the reference solution rejects the input or exceeds the timeout.
+    """
+    comparater = build_comparater(
+        compare_mode=args.compare_mode,
+        error=args.error,
+        judge_command=None,
+        silent=True,
+    )
+
+    def verdict(data: bytes) -> Optional[JudgeStatus]:
+        expected: Optional[bytes] = None
+        if args.reference is not None:
+            expected = run_reference(data, args)
+            if expected is None:
+                # the reduced input is invalid for the problem
+                return None
+        history = utils.exec_command(args.command, input=data, timeout=args.tle)
+        is_correct = (
+            None if expected is None else comparater(history.answer or b"", expected)
+        )
+        return judge(
+            proc_returncode=history.proc.returncode,
+            memory=None,
+            mle=None,
+            is_correct=is_correct,
+        )
+
+    return verdict
+
+
+def ddmin(
+    parts: List[bytes],
+    is_failing: Callable[[List[bytes]], bool],
+    executor: concurrent.futures.Executor,
+) -> List[bytes]:
+    """ddmin removes parts as long as `is_failing` holds (delta debugging).
+
+    Candidates of each round are evaluated in parallel by `executor`.
+    """
+    n = 2
+    while len(parts) >= 2:
+        size = len(parts)
+        bounds = [size * i // n for i in range(n + 1)]
+        chunks = [parts[bounds[i] : bounds[i + 1]] for i in range(n)]
+        complements = [parts[: bounds[i]] + parts[bounds[i + 1] :] for i in range(n)]
+        candidates = chunks + (complements if n > 2 else [])
+        results = list(executor.map(is_failing, candidates))
+        for idx, failing in enumerate(results):
+            if not failing:
+                continue
+            parts = candidates[idx]
+            n = 2 if idx < len(chunks) else max(n - 1, 2)
+            break
+        else:
+            if n >= size:
+                break
+            n = min(2 * n, size)
+    return parts
+
+
+def minimize(
+    data: bytes,
+    reducers: List[Reducer],
+    args: MinimizeArgs,
+) -> bytes:
+    """minimize shrinks the input while the verdict `args.status` is preserved."""
+    verdict = build_verdict(args)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs or 1) as executor:
+        for reducer in reducers:
+
+            def is_failing(parts: List[bytes], reducer: Reducer = reducer) -> bool:
+                return verdict(reducer.join(parts)) == args.status
+
+            parts = ddmin(reducer.split(data), is_failing, executor)
+            data = reducer.join(parts)
+    return data
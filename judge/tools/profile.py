@@ -0,0 +1,194 @@
+import os
+import pstats
+import shlex
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from judge.schema import History, JudgeStatus, TestCasePath
+from judge.tools import archive, utils
+
+PROFILE_TOP = 20
+PROFILE_TIMEOUT_SCALE = 10  # profiled runs are slow, so TLE is relaxed
+
+# the bootstrap wraps the solution in cProfile and dumps stats even if killed by SIGTERM
+PROFILE_BOOTSTRAP = """\
+import cProfile, os, runpy, signal, sys
+out, sys.argv = sys.argv[1], sys.argv[2:]
+sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[0]))
+def _stop(signum, frame):
+    raise SystemExit(128 + signum)
+signal.signal(signal.SIGTERM, _stop)
+prof = cProfile.Profile()
+try:
+    prof.runcall(runpy.run_path, sys.argv[0], run_name="__main__")
+finally:
+    prof.dump_stats(out)
+"""
+
+Func = Tuple[str, int, str]
+
+
+def split_python_command(command: str) -> Tuple[str, List[str]]:
+    """split_python_command splits `python3 a.py ...` into the interpreter and the rest.
+
+    Raise ValueError if the command is not executed by python3 or pypy3.
+    """
+    tokens = shlex.split(command)
+    if not tokens:
+        raise ValueError("empty command")
+    interpreter = os.path.basename(tokens[0])
+    if not interpreter.startswith(("python", "pypy")):
+        raise ValueError(f"only python3 and pypy3 are supported: {command}")
+    return tokens[0], tokens[1:]
+
+
+def bootstrap_command(command: str, bootstrap: str, output: Path) -> str:
+    """bootstrap_command embeds `bootstrap` between the interpreter and the solution file.
+
+    The bootstrap receives the path of `output` as the first argument.
+    """
+    interpreter, rest = split_python_command(command)
+    tokens = [interpreter, "-c", bootstrap, str(output)] + rest
+    return " ".join(shlex.quote(token) for token in tokens)
+
+
+def select_targets(histories: List[History], target: str) -> List[History]:
+    """select_targets picks histories to be profiled.
+
+    target is one of "slowest", "tle" or the name of testcase.
+    """
+    if not histories:
+        return []
+    if target == "slowest":
+        slowest = histories[0]
+        for hist in histories:
+            if hist.elapsed >= slowest.elapsed:
+                slowest = hist
+        return [slowest]
+    if target == "tle":
+        return [hist for hist in histories if hist.status == JudgeStatus.TLE]
+    return [hist for hist in histories if hist.testcase.name == target]
+
+
+def func_label(func: Func) -> str:
+    filename, line, name = func
+    if filename == "~" and line == 0:
+        # built-in functions
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapse_stacks(stats: pstats.Stats, max_depth: int = 64) -> Dict[str, int]:
+    """collapse_stacks converts cProfile stats into flamegraph-compatible collapsed stacks.
+
+    cProfile only records caller/callee pairs, so the time of a callee is shared with
+    its call paths in proportion to the cumulative time of each call edge.
+    The weight of each stack is in microseconds.
+    """
+    raw: Dict[
+        Func, Tuple[int, int, float, float, Dict[Func, Tuple[int, int, float, float]]]
+    ]
+    raw = stats.stats  # type: ignore
+    callees: Dict[Func, List[Tuple[Func, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks: Dict[str, int] = {}
+
+    def walk(func: Func, path: List[Func], fraction: float) -> None:
+        _, _, tt, ct, _ = raw[func]
+        path = path + [func]
+        weight = int(tt * fraction * 1e6)
+        if weight > 0:
+            key = ";".join(func_label(f) for f in path)
+            stacks[key] = stacks.get(key, 0) + weight
+        if len(path) >= max_depth:
+            return
+        for callee, edge_ct in callees.get(func, []):
+            if callee in path:
+                # recursive calls are already counted in the cumulative time
+                continue
+            callee_ct = raw[callee][3]
+            if callee_ct <= 0:
+                continue
+            child = fraction * edge_ct / callee_ct
+            if child * callee_ct * 1e6 < 1:
+                continue
+            walk(callee, path, child)
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(func, [], 1.0)
+    return stacks
+
+
+def iter_collapsed(stacks: Dict[str, int]) -> Iterator[str]:
+    for key, weight in sorted(stacks.items()):
+        yield f"{key} {weight}\n"
+
+
+@dataclass
+class ProfileArgs:
+    history: History
+    command: str
+    directory: Path
+    tle: Optional[float] = None
+
+
+@dataclass
+class ProfileResult:
+    testcase: TestCasePath
+    command: str
+    pstats_path: Path
+    collapsed_path: Optional[Path] = None
+    stats: Optional[pstats.Stats] = None
+    error: Optional[str] = None
+
+
+def artifact_stem(testcase: TestCasePath, command: str) -> str:
+    interpreter, _ = split_python_command(command)
+    return f"profile-{testcase.name}-{os.path.basename(interpreter)}"
+
+
+def profile(args: ProfileArgs) -> ProfileResult:
+    """profile re-runs a testcase under cProfile with the same stdin.
+
+    Save `.pstats` and collapsed stacks (`.collapsed`) into `args.directory`.
+    """
+    testcase = args.history.testcase
+    stem = artifact_stem(testcase, args.command)
+    pstats_path = args.directory / f"{stem}.pstats"
+    collapsed_path = args.directory / f"{stem}.collapsed"
+    if pstats_path.exists():
+        pstats_path.unlink()
+    result = ProfileResult(
+        testcase=testcase, command=args.command, pstats_path=pstats_path
+    )
+    if testcase.in_path is None:
+        result.error = "input file not found"
+        return result
+
+    command = bootstrap_command(args.command, PROFILE_BOOTSTRAP, pstats_path)
+    timeout = args.tle * PROFILE_TIMEOUT_SCALE if args.tle else None
+    with archive.stdin_for(testcase.in_path) as inf:
+        history = utils.exec_command(command, stdin=inf, timeout=timeout)
+    # wait for dumping stats after the termination by timeout
+    history.proc.wait()
+
+    if not pstats_path.exists():
+        result.error = "profile was not dumped"
+        return result
+    try:
+        stats = pstats.Stats(str(pstats_path))
+    except Exception as e:
+        # e.g. the marshal format of PyPy3 is not always readable from CPython
+        result.error = f"failed to load profile: {e}"
+        return result
+    result.stats = stats
+
+    with collapsed_path.open("w") as f:
+        f.writelines(iter_collapsed(collapse_stacks(stats)))
+    result.collapsed_path = collapsed_path
+    return result
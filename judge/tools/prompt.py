@@ -1,14 +1,15 @@
 from enum import Enum
 from pathlib import Path
-from typing import Callable, Optional, Union
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
-import typer
-from prompt_toolkit import prompt as prompt_toolkit
-from prompt_toolkit.completion import Completer, PathCompleter, WordCompleter
 from pydantic import BaseSettings, DirectoryPath, FilePath
 from pydantic.error_wrappers import ValidationError
 from pydantic.fields import ModelField
 
+if TYPE_CHECKING:
+    # prompt_toolkit is slow to import, and only needed for interactive configuration
+    from prompt_toolkit.completion import Completer
+
 
 def to_abs(base: Union[Path, str]) -> Callable[[Path], Path]:
     base = Path(base)
@@ -21,7 +22,9 @@ def to_abs(base: Union[Path, str]) -> Callable[[Path], Path]:
     return _to_abs
 
 
-def type_to_completer(field: ModelField) -> Optional[Completer]:
+def type_to_completer(field: ModelField) -> Optional["Completer"]:
+    from prompt_toolkit.completion import PathCompleter, WordCompleter
+
     type_ = field.type_
     try:
         if issubclass(type_, Enum):
@@ -56,6 +59,7 @@ def pydantic_prompt(
 
     def _pydantic_prompt() -> str:
         """infer type information into prompt for autocompletion"""
+        from prompt_toolkit import prompt as prompt_toolkit
 
         item = prompt_toolkit(
             msg,
@@ -119,6 +123,8 @@ class BasePrompt(BaseSettings):
                     raise err
                 except ValidationError as e:
                     if e:
+                        import typer
+
                         typer.secho(
                             "\n".join([f.get("msg", "") for f in e.errors()]),
                             fg=typer.colors.RED,
@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Optional, Union
+
+SPILL_THRESHOLD = 1 << 16  # byte
+
+
+class SpillStore:
+    """SpillStore keeps large outputs in a temporary directory.
+
+    The directory is removed when the store and all spilled outputs are garbage collected.
+    """
+
+    def __init__(
+        self, threshold: int = SPILL_THRESHOLD, directory: Optional[Path] = None
+    ) -> None:
+        """
+        threshold (int): outputs larger than this are spilled
+        directory (Path): parent of the temporary directory. system default if None.
+        """
+        self.threshold = threshold
+        self.directory = Path(
+            tempfile.mkdtemp(prefix="judge-", dir=str(directory) if directory else None)
+        )
+        self._finalizer = weakref.finalize(
+            self, shutil.rmtree, str(self.directory), ignore_errors=True
+        )
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def put(self, data: bytes) -> Union[bytes, "SpilledOutput"]:
+        """put returns data itself if small, otherwise the reference of the spilled file."""
+        if len(data) <= self.threshold:
+            return data
+        with self._lock:
+            self._count += 1
+            path = self.directory / f"{self._count}.out"
+        with path.open("wb") as f:
+            f.write(data)
+        return SpilledOutput(self, path, len(data))
+
+    def cleanup(self) -> None:
+        self._finalizer()
+
+
+class SpilledOutput:
+    __slots__ = ("store", "path", "size")
+
+    def __init__(self, store: SpillStore, path: Path, size: int) -> None:
+        self.store = store  # keep the directory alive
+        self.path = path
+        self.size = size
+
+    def read(self) -> bytes:
+        with self.path.open("rb") as f:
+            return f.read()
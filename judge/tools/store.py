@@ -0,0 +1,135 @@
+import contextlib
+import hashlib
+import os
+import stat
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STORE_ENV = "JUDGE_STORE"
+CHUNK_SIZE = 1 << 20  # byte
+
+
+def cache_home() -> Path:
+    """`$XDG_CACHE_HOME/judge` or `~/.cache/judge`"""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(cache) / "judge"
+
+
+def default_store_directory() -> Path:
+    """the directory of the shared store. `$JUDGE_STORE` or `$XDG_CACHE_HOME/judge/store`"""
+    if os.environ.get(STORE_ENV):
+        return Path(os.environ[STORE_ENV])
+    return cache_home() / "store"
+
+
+def temporary_path(path: Path) -> Path:
+    """the hidden path in the same directory to be renamed to `path` atomically"""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """write_atomic writes data via the temporary file, so `path` is never half-written."""
+    tmp = temporary_path(path)
+    try:
+        with tmp.open("wb") as f:
+            f.write(data)
+        os.replace(str(tmp), str(path))
+    except BaseException:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+        raise
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=32)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class TestCaseStore:
+    """TestCaseStore keeps testcases by the hash of the content.
+
+    Test directories link into the store, so identical testcases are stored only once.
+    Objects are read-only not to be changed through the links.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = directory or default_store_directory()
+
+    def object_path(self, key: str) -> Path:
+        return self.directory / key[:2] / key[2:]
+
+    def put(self, data: bytes) -> Path:
+        """put saves data unless already stored.
+
+        :returns: the path of the object
+        """
+        path = self.object_path(content_hash(data))
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temporary_path(path)
+        with tmp.open("wb") as f:
+            f.write(data)
+        os.chmod(str(tmp), stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(str(tmp), str(path))
+        return path
+
+    def link(self, data: bytes, path: Path) -> None:
+        """link creates the file linked to the stored object. an existing file is replaced atomically.
+
+        A hard link is used if possible, otherwise a symbolic link. The file is copied as the last resort.
+        """
+        target = self.put(data)
+        tmp = temporary_path(path)
+        try:
+            os.link(str(target), str(tmp))
+        except OSError:
+            # e.g. across file systems
+            try:
+                os.symlink(str(target.resolve()), str(tmp))
+            except OSError:
+                write_atomic(path, data)
+                return
+        os.replace(str(tmp), str(path))
+
+
+def find_duplicates(paths: Iterable[Path]) -> Dict[Path, Path]:
+    """find_duplicates finds files with the identical content.
+
+    Only files of the same size are compared, by inode (for links into the store) and then by hash.
+    :returns: the map from each duplicated file to the first file with the same content
+    """
+    by_size: Dict[int, List[Tuple[Path, os.stat_result]]] = defaultdict(list)
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        by_size[st.st_size].append((path, st))
+
+    duplicates: Dict[Path, Path] = {}
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        by_inode: Dict[Tuple[int, int], Path] = {}
+        by_hash: Dict[str, Path] = {}
+        for path, st in same_size:
+            inode = (st.st_dev, st.st_ino)
+            original = by_inode.get(inode)
+            if original is None:
+                original = by_hash.setdefault(file_hash(path), path)
+                by_inode[inode] = original
+            if original != path:
+                duplicates[path] = original
+    return duplicates
@@ -0,0 +1,175 @@
+import concurrent.futures
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generator, List, Optional, Set
+
+from judge.schema import CompareMode, JudgeStatus, Sample
+from judge.tools import comparator, utils
+from judge.tools.format import embedd_percentformat
+from judge.tools.testing import build_comparater, judge
+
+MAX_STRESS_SAMPLE_NUM = 1000
+# the generator and the reference may be slower than the candidate, but never hang
+HELPER_TIMEOUT_SCALE = 10
+DEFAULT_HELPER_TIMEOUT = 60 * 1000  # ms. used if no time limit is given
+
+
+@dataclass
+class StressArgs:
+    generator: str
+    reference: str
+    command: str
+    iterations: int
+    compare_mode: CompareMode
+    jobs: Optional[int] = None
+    tle: Optional[float] = None
+    error: Optional[float] = None
+    max_failures: int = 1
+    seed: int = 0
+
+
+@dataclass
+class StressCase:
+    seed: int
+    input: bytes
+    expected: bytes
+    output: bytes
+    status: JudgeStatus
+    exitcode: Optional[int]
+    elapsed: float  # ms
+
+
+class StressError(RuntimeError):
+    """the generator or the reference solution failed"""
+
+
+def helper_timeout(tle: Optional[float]) -> float:
+    """helper_timeout returns the timeout (ms) of the generator and the reference solution."""
+    return tle * HELPER_TIMEOUT_SCALE if tle else DEFAULT_HELPER_TIMEOUT
+
+
+def run_command(command: str, input: Optional[bytes], tle: Optional[float]) -> bytes:
+    """
+    input (bytes): stdin of the command. if None, the command reads nothing instead of the terminal.
+    :raises StressError: if the command fails or exceeds `tle` (ms)
+    """
+    if input is None:
+        history = utils.exec_command(
+            command, stdin=subprocess.DEVNULL, timeout=tle  # type: ignore
+        )
+    else:
+        history = utils.exec_command(command, input=input, timeout=tle)
+    if history.proc.returncode is None:
+        raise StressError(f"Timeout: {command} ({tle} ms)")
+    if history.proc.returncode != 0:
+        raise StressError(
+            f"Failed: {command} (exit code: {history.proc.returncode})\n"
+            + (history.answer or b"").decode(errors="replace")
+        )
+    return history.answer or b""
+
+
+def stress_single_case(
+    seed: int, comparater: comparator.OutputComparator, args: StressArgs
+) -> StressCase:
+    """stress_single_case runs generator -> reference -> candidate for the seed.
+
+    The input is passed through pipes and never written to disk.
+    """
+    timeout = helper_timeout(args.tle)
+    data = run_command(f"{args.generator} {seed}", None, timeout)
+    expected = run_command(args.reference, data, timeout)
+    history = utils.exec_command(args.command, input=data, timeout=args.tle)
+    output = history.answer or b""
+    is_correct = comparater(output, expected)
+    status = judge(
+        proc_returncode=history.proc.returncode,
+        memory=None,
+        mle=None,
+        is_correct=is_correct,
+    )
+    return StressCase(
+        seed=seed,
+        input=data,
+        expected=expected,
+        output=output,
+        status=status,
+        exitcode=history.proc.returncode,
+        elapsed=history.elapsed,
+    )
+
+
+def stress(args: StressArgs) -> Generator[StressCase, None, None]:
+    """stress yields the results of randomized differential testing in completion order.
+
+    Stop after `args.max_failures` failing cases are found.
+    """
+    comparater = build_comparater(
+        compare_mode=args.compare_mode,
+        error=args.error,
+        judge_command=None,
+        silent=True,
+    )
+    jobs = args.jobs or 1
+    seeds = iter(range(args.seed, args.seed + args.iterations))
+    failures = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        # bound the number of pending cases to keep memory flat for many iterations
+        pending: Set["concurrent.futures.Future[StressCase]"] = set()
+
+        def submit() -> None:
+            seed = next(seeds, None)
+            if seed is not None:
+                pending.add(executor.submit(stress_single_case, seed, comparater, args))
+
+        for _ in range(2 * jobs):
+            submit()
+        try:
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    pending.remove(future)
+                    case = future.result()
+                    if case.status != JudgeStatus.AC:
+                        failures += 1
+                    yield case
+                    if failures >= args.max_failures:
+                        return
+                    submit()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def failures_to_samples(
+    cases: List[StressCase], format: str, directory: Path
+) -> Generator[Sample, None, None]:
+    """failures_to_samples names failing cases with unused indices of `format`."""
+    _filename = embedd_percentformat(format)
+    idx = 0
+    for case in cases:
+        for idx in range(idx + 1, MAX_STRESS_SAMPLE_NUM + 1):
+            paths = [
+                directory / _filename.format(i=idx, e=ext, n=case.seed, b="", d="")
+                for ext in ("in", "out")
+            ]
+            if not any(path.exists() for path in paths):
+                break
+        else:
+            raise FileExistsError("Can't create new sample in " + str(directory))
+        yield Sample(ext="in", path=paths[0], data=case.input)
+        yield Sample(ext="out", path=paths[1], data=case.expected)
+
+
+def save_failures(cases: List[StressCase], format: str, directory: Path) -> List[Path]:
+    saved: List[Path] = []
+    for sample in failures_to_samples(cases, format, directory):
+        os.makedirs(sample.path.parent, exist_ok=True)
+        with sample.path.open("wb") as fh:
+            fh.write(sample.data)
+        saved.append(sample.path)
+    return saved
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from onlinejudge.service.atcoder import AtCoderProblem
+from onlinejudge.service.yukicoder import YukicoderProblem
+from onlinejudge.type import NotLoggedInError, Problem, SampleParseError
+
+from judge.tools.discovery import NESTED_DIRS
+from judge.tools.download import DownloadArgs, logged_in_session
+
+CHUNK_SIZE = 1 << 16  # byte
+DROPBOX_BLOCK_SIZE = 4 << 20  # byte
+DROPBOX_SHARED_LINK = (
+    "https://www.dropbox.com/sh/nx3tnilzqz7df8a/AAAYlTq2tiEHl5hsESw6-yfLa"
+)
+DROPBOX_FILE_URL = "https://content.dropboxapi.com/2/sharing/get_shared_link_file"
+YUKICODER_ARCHIVE = ".system.zip"
+YUKICODER_DIRS = {"test_in": "in", "test_out": "out"}
+
+
+class VerificationError(Exception):
+    pass
+
+
+@dataclass
+class RemoteFile:
+    path: str  # relative to the test directory. e.g. in/01.txt
+    url: str
+    method: str = "GET"
+    headers: Dict[str, str] = field(default_factory=dict)
+    size: Optional[int] = None  # byte
+    content_hash: Optional[str] = None  # the content hash of Dropbox
+
+
+def dropbox_content_hash(path: Path) -> str:
+    """the hash of Dropbox: sha256 of the concatenated sha256 of each 4 MB block.
+
+    https://www.dropbox.com/developers/reference/content-hash
+    """
+    digests = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(DROPBOX_BLOCK_SIZE), b""):
+            digests.update(hashlib.sha256(block).digest())
+    return digests.hexdigest()
+
+
+def _partial_path(path: Path) -> Path:
+    # hidden not to be found as testcases
+    return path.with_name(f".{path.name}.part")
+
+
+def _total_size(resp: requests.Response, offset: int) -> Optional[int]:
+    content_range = resp.headers.get("Content-Range")  # e.g. bytes 100-199/200
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    if "Content-Length" in resp.headers:
+        return offset + int(resp.headers["Content-Length"])
+    return None
+
+
+def _verify(path: Path, remote: RemoteFile, size: Optional[int]) -> None:
+    actual = path.stat().st_size
+    for expected in (remote.size, size):
+        if expected is not None and actual != expected:
+            raise VerificationError(
+                f"{remote.path}: expected {expected} bytes, but got {actual} bytes"
+            )
+    if remote.content_hash is not None:
+        actual_hash = dropbox_content_hash(path)
+        if actual_hash != remote.content_hash:
+            raise VerificationError(
+                f"{remote.path}: expected hash {remote.content_hash}, but got {actual_hash}"
+            )
+
+
+def fetch(session: requests.Session, remote: RemoteFile, directory: Path) -> Path:
+    """fetch streams the file to disk with bounded memory.
+
+    The file is written to a hidden partial file first, and renamed after verification of its size and hash.
+    Download is resumed from the partial file left by interrupted downloads.
+    Files already downloaded are skipped.
+    """
+    path = directory / remote.path
+    if path.exists() and (remote.size is None or path.stat().st_size == remote.size):
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = _partial_path(path)
+    offset = partial.stat().st_size if partial.exists() else 0
+
+    headers = dict(remote.headers)
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    with session.request(
+        remote.method, remote.url, headers=headers, stream=True
+    ) as resp:
+        if resp.status_code == 416:
+            # the partial file is already complete
+            size = None
+        else:
+            resp.raise_for_status()
+            if resp.status_code != 206:
+                # the server does not support resume
+                offset = 0
+            size = _total_size(resp, offset)
+            with partial.open("ab" if offset else "wb") as f:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+    try:
+        _verify(partial, remote, size)
+    except VerificationError:
+        partial.unlink()
+        raise
+    os.replace(str(partial), str(path))
+    return path
+
+
+def _dropbox_file(path: str, entry: Dict[str, str]) -> RemoteFile:
+    return RemoteFile(
+        path="/".join(path.split("/")[-2:]),  # in/01.txt
+        url=DROPBOX_FILE_URL,
+        method="POST",
+        headers={
+            "Dropbox-API-Arg": json.dumps({"path": path, "url": DROPBOX_SHARED_LINK})
+        },
+        size=int(entry["size"]) if "size" in entry else None,
+        content_hash=entry.get("content_hash"),
+    )
+
+
+def _find_folder(entries: List[Dict[str, str]], match, what: str) -> Dict[str, str]:  # type: ignore
+    found = [entry for entry in entries if match(entry["name"])]
+    if len(found) != 1:
+        raise SampleParseError(f"{len(found)} folders match the {what}")
+    return found[0]
+
+
+def list_atcoder_files(
+    problem: AtCoderProblem, session: requests.Session
+) -> List[RemoteFile]:
+    """list_atcoder_files lists system testcases of AtCoder shared via Dropbox."""
+
+    def ls(path: str) -> List[Dict[str, str]]:
+        return problem._list_dropbox_folder(
+            path=path, shared_link_url=DROPBOX_SHARED_LINK, session=session
+        )
+
+    contest = _find_folder(
+        ls(""),
+        lambda name: problem._match_system_cases_contest_folder(
+            contest_folder_name=name
+        ),
+        "contest",
+    )
+    folder = _find_folder(
+        ls(f"/{contest['name']}"),
+        lambda name: problem._match_system_cases_problem_folder(
+            contest_folder_name=contest["name"], problem_folder_name=name
+        ),
+        "problem",
+    )
+    files: List[RemoteFile] = []
+    for sub in NESTED_DIRS:
+        path = f"/{contest['name']}/{folder['name']}/{sub}"
+        files.extend(
+            _dropbox_file(f"{path}/{entry['name']}", entry)
+            for entry in ls(path)
+            if entry.get(".tag", "file") == "file"
+        )
+    return files
+
+
+def extract_yukicoder_archive(path: Path, directory: Path) -> List[Path]:
+    """extract_yukicoder_archive extracts `test_in/*` and `test_out/*` into `in/` and `out/` one by one."""
+    paths: List[Path] = []
+    with zipfile.ZipFile(str(path)) as zf:
+        for info in zf.infolist():
+            parts = info.filename.split("/")
+            if info.is_dir() or len(parts) != 2 or parts[0] not in YUKICODER_DIRS:
+                continue
+            dest = directory / YUKICODER_DIRS[parts[0]] / parts[1]
+            paths.append(dest)
+            if dest.exists() and dest.stat().st_size == info.file_size:
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            partial = _partial_path(dest)
+            # the CRC is verified by zipfile
+            with zf.open(info) as src, partial.open("wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            os.replace(str(partial), str(dest))
+    return paths
+
+
+def download_system_cases(
+    problem: Problem,
+    session: requests.Session,
+    directory: Path,
+    *,
+    interval: float = 0.5,
+) -> Optional[List[Path]]:
+    """download_system_cases streams system testcases into `directory/in` and `directory/out`.
+
+    interval (float): sec. the interval between requests to Dropbox
+    :returns: the downloaded files, or None if streaming is not supported for the service
+    """
+    if isinstance(problem, AtCoderProblem):
+        paths: List[Path] = []
+        for remote in list_atcoder_files(problem, session):
+            path = directory / remote.path
+            if not path.exists():
+                time.sleep(interval)  # at most two requests per a second
+            paths.append(fetch(session, remote, directory))
+        return paths
+    if isinstance(problem, YukicoderProblem):
+        if not problem.get_service().is_logged_in(session=session):
+            raise NotLoggedInError
+        remote = RemoteFile(
+            path=YUKICODER_ARCHIVE, url=f"{problem.get_url()}/testcase.zip"
+        )
+        archive = fetch(session, remote, directory)
+        paths = extract_yukicoder_archive(archive, directory)
+        archive.unlink()
+        return paths
+    return None
+
+
+def download_system(args: DownloadArgs, directory: Path) -> Optional[List[Path]]:
+    with logged_in_session(args) as sess:
+        return download_system_cases(args.problem, sess, directory)
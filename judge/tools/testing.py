@@ -1,20 +1,36 @@
 import concurrent.futures
 import contextlib
+import functools
 import os
 import subprocess
 import tempfile
 import threading
+from collections import Counter
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Generator, List, Optional
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Sequence
 
-from judge.schema import CompareMode, History, JudgeStatus, TestCasePath, TimerMode
-from judge.tools import comparator, utils
+from judge.schema import (
+    CompareMode,
+    History,
+    JudgeStatus,
+    Mismatch,
+    TestCasePath,
+    TimerMode,
+)
+from judge.tools import archive, comparator, utils
+from judge.tools.checker import PythonChecker
+from judge.tools.digest import DigestIndex, build_normalizer
+from judge.tools.discovery import TestCaseIndex, discover
 from judge.tools.format import (
     construct_relationship_of_files,
     drop_backup_or_hidden_files,
-    glob_with_format,
 )
+from judge.tools.interactive import exec_interactive
+from judge.tools.spill import SPILL_THRESHOLD, SpillStore
+from judge.tools.store import find_duplicates
+from judge.tools.trace import span
 
 MEMORY_WARNING = 500  # megabyte
 MEMORY_PRINT = 100  # megabyte
@@ -25,18 +41,24 @@ def build_comparater(
     error: Optional[float],
     judge_command: Optional[str],
     silent: bool,
+    checker: Optional[str] = None,
+    checker_processes: Optional[int] = None,
+    tle: Optional[float] = None,
 ) -> comparator.OutputComparator:
     """build_match_function builds the function to compare actual outputs and expected outputs.
 
-    This function doesn't any I/O.
+    This function doesn't any I/O except for importing the python checker.
     """
 
-    if judge_command is not None:
+    if checker is not None:
+        return PythonChecker(checker, checker_processes)
+    elif judge_command is not None:
         return comparator.SpecialJudge(
             judge_command=judge_command,
             is_silent=silent,
             test_input_path=Path(),
             test_output_path=None,
+            tle=tle,
         )
     elif compare_mode == CompareMode.EXACT_MATCH:
         return comparator.exact_match(error)
@@ -60,9 +82,8 @@ def build_match_call(
     This function doesn't any I/O.
     """
 
-    if isinstance(comparater, comparator.SpecialJudge):
-        comparater.test_input_path = test_input_path
-        comparater.test_expected_path = test_output_path
+    if isinstance(comparater, comparator.Checker):
+        return comparater.bind(test_input_path, test_output_path)
     return comparater
 
 
@@ -70,23 +91,43 @@ def run_checking_output(
     answer: bytes,
     test_output_path: Optional[Path],
     match_fn: comparator.OutputComparator,
+    digests: Optional[DigestIndex] = None,
 ) -> Optional[bool]:
     """run_checking_output executes matching of the actual output and the expected output.
 
     This function has file I/O including the execution of the judge command.
+    If `digests` is given, the expected output is not read unless its digest is not cached.
     """
-    is_special_judge = isinstance(match_fn, comparator.SpecialJudge)
+    is_special_judge = isinstance(match_fn, comparator.Checker)
     if test_output_path is None and not is_special_judge:
         return None
+    if (
+        digests is not None
+        and test_output_path is not None
+        # digests are cached per directory, and not for members of zip files
+        and archive.find_archive(test_output_path) is None
+    ):
+        return digests.digest(answer) == digests.lookup(test_output_path)
     if test_output_path is not None:
-        with test_output_path.open("rb") as outf:
-            expected = outf.read()
+        expected = archive.read_testcase(test_output_path)
     else:
         # only if --judge option
         expected = b""
     return match_fn(answer, expected)
 
 
+def locate_mismatch(
+    answer: bytes,
+    test_output_path: Optional[Path],
+    match_fn: comparator.OutputComparator,
+) -> Optional[Mismatch]:
+    """locate_mismatch finds the first mismatched token of the wrong answer."""
+    if test_output_path is None:
+        return None
+    expected = archive.read_testcase(test_output_path)
+    return match_fn.locate(answer, expected)
+
+
 def judge(
     proc_returncode: Optional[int],
     memory: Optional[float],
@@ -110,7 +151,7 @@ def judge(
 
 @dataclass
 class TestingArgs:
-    testcases: List[TestCasePath]
+    testcases: Sequence[TestCasePath]
     command: str
     gnu_time: Optional[str]
     mle: Optional[float]
@@ -120,6 +161,60 @@ class TestingArgs:
     error: Optional[float] = None
     silent: bool = True
     judge: Optional[str] = None
+    digest: bool = True  # cache digests of expected outputs in the test directory
+    spill_threshold: Optional[int] = (
+        SPILL_THRESHOLD  # byte. None to keep all outputs in memory
+    )
+    checker: Optional[str] = None  # python file or module exposing `check`
+    checker_processes: Optional[int] = None  # dispatch checks to the process pool
+    interactor: Optional[str] = None  # interactor command for interactive problems
+    transcript: bool = False  # record messages of interactive problems as the output
+    dedupe: bool = False  # run identical inputs only once. all inputs are hashed first
+
+
+class Executions:
+    """Executions shares the execution among testcases with the identical input.
+
+    The result is kept until all testcases with the input use it.
+    """
+
+    def __init__(self, duplicates: Dict[Path, Path]) -> None:
+        """
+        duplicates (Dict[Path, Path]): the map from duplicated inputs to the original input
+        """
+        self.duplicates = duplicates
+        # the number of testcases to use the result
+        self._remaining = {
+            original: count + 1
+            for original, count in Counter(duplicates.values()).items()
+        }
+        self._futures: Dict[Path, concurrent.futures.Future[utils.History]] = {}
+        self._lock = threading.Lock()
+
+    def run(
+        self, path: Path, execute: Callable[[Path], utils.History]
+    ) -> utils.History:
+        original = self.duplicates.get(path, path)
+        if original not in self._remaining:
+            return execute(path)
+        with self._lock:
+            future = self._futures.get(original)
+            is_owner = future is None
+            if future is None:
+                future = concurrent.futures.Future()
+                self._futures[original] = future
+        if is_owner:
+            try:
+                future.set_result(execute(original))
+            except BaseException as e:
+                future.set_exception(e)
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self._remaining[original] -= 1
+                if self._remaining[original] == 0:
+                    del self._futures[original]
 
 
 def test_single_case(
@@ -129,50 +224,135 @@ def test_single_case(
     comparater: comparator.OutputComparator,
     *,
     lock: Optional[threading.Lock] = None,
+    digests: Optional[DigestIndex] = None,
+    store: Optional[SpillStore] = None,
+    executions: Optional[Executions] = None,
     args: TestingArgs,
 ) -> History:
-    # run the binary
-    with test_input_path.open("rb") as inf:
-        history = utils.exec_command(
-            args.command, stdin=inf, timeout=args.tle, gnu_time=args.gnu_time
+    if args.interactor is not None:
+        return test_interactive_case(
+            test_name, test_input_path, test_output_path, store=store, args=args
         )
-        # TODO: the `answer` should be bytes, not str
-        answer: str = (history.answer or b"").decode(errors="replace")
-
-    # lock is require to avoid mixing logs if in parallel
-    nullcontext = (
-        contextlib.ExitStack()
-    )  # TODO: use contextlib.nullcontext() after updating Python to 3.7
-    with lock or nullcontext:
-        match_fn = build_match_call(
-            comparater=comparater,
-            test_input_path=test_input_path,
-            test_output_path=test_output_path,
+    with span("case", "case", case=test_name):
+        # run the binary
+        if executions is not None:
+            history = executions.run(test_input_path, partial(execute, args=args))
+        else:
+            history = execute(test_input_path, args)
+        answer = history.answer or b""
+
+        # lock is require to avoid mixing logs of the judge command if in parallel
+        nullcontext = (
+            contextlib.ExitStack()
+        )  # TODO: use contextlib.nullcontext() after updating Python to 3.7
+        # the gap between "compare" and "locked" spans is the time waiting for the lock
+        with span("compare", "compare", case=test_name), lock or nullcontext:
+            with span("locked", "compare", case=test_name):
+                match_fn = build_match_call(
+                    comparater=comparater,
+                    test_input_path=test_input_path,
+                    test_output_path=test_output_path,
+                )
+                is_correct = run_checking_output(
+                    answer=answer,
+                    test_output_path=test_output_path,
+                    match_fn=match_fn,
+                    digests=digests,
+                )
+                status = judge(
+                    proc_returncode=history.proc.returncode,
+                    memory=history.memory,
+                    mle=args.mle,
+                    is_correct=is_correct,
+                )
+        mismatch = None
+        if status == JudgeStatus.WA:
+            with span("locate", "compare", case=test_name):
+                mismatch = locate_mismatch(
+                    answer=answer,
+                    test_output_path=test_output_path,
+                    match_fn=match_fn,
+                )
+
+        return History(
+            status=status,
+            testcase=TestCasePath(
+                name=test_name, in_path=test_input_path, out_path=test_output_path
+            ),
+            output=store.put(answer) if store is not None else answer,
+            exitcode=history.proc.returncode,
+            elapsed=history.elapsed,
+            memory=history.memory,
+            mismatch=mismatch,
+            checker_elapsed=(
+                match_fn.elapsed if isinstance(match_fn, comparator.Checker) else None
+            ),
+            checker_message=(
+                match_fn.message if isinstance(match_fn, comparator.Checker) else None
+            ),
         )
-        is_correct = run_checking_output(
-            answer=answer.encode(),
-            test_output_path=test_output_path,
-            match_fn=match_fn,
+
+
+def execute(test_input_path: Path, args: TestingArgs) -> utils.History:
+    with archive.stdin_for(test_input_path) as inf:
+        return utils.exec_command(
+            args.command, stdin=inf, timeout=args.tle, gnu_time=args.gnu_time
+        )
+
+
+def test_interactive_case(
+    test_name: str,
+    test_input_path: Path,
+    test_output_path: Optional[Path],
+    *,
+    store: Optional[SpillStore] = None,
+    args: TestingArgs,
+) -> History:
+    """test_interactive_case runs the solution with the interactor.
+
+    The output is the transcript if `args.transcript`, otherwise stderr of the solution.
+    """
+    assert args.interactor is not None
+    with span("case", "case", case=test_name):
+        history = exec_interactive(
+            args.command,
+            args.interactor,
+            test_input_path,
+            test_output_path,
+            timeout=args.tle,
+            gnu_time=args.gnu_time,
+            transcript=args.transcript,
         )
         status = judge(
-            proc_returncode=history.proc.returncode,
+            proc_returncode=history.returncode,
             memory=history.memory,
             mle=args.mle,
-            is_correct=is_correct,
+            is_correct=(
+                None
+                if history.interactor_returncode is None
+                else history.interactor_returncode == 0
+            ),
+        )
+        # the solution often fails reading after the interactor rejects it
+        if status == JudgeStatus.RE and history.interactor_returncode not in (None, 0):
+            status = JudgeStatus.WA
+        output = (
+            history.transcript if history.transcript is not None else history.stderr
+        )
+        return History(
+            status=status,
+            testcase=TestCasePath(
+                name=test_name, in_path=test_input_path, out_path=test_output_path
+            ),
+            output=store.put(output) if store is not None else output,
+            exitcode=history.returncode,
+            elapsed=history.elapsed,
+            memory=history.memory,
+            checker_message=history.message.decode(errors="replace"),
         )
-
-    return History(
-        status=status,
-        testcase=TestCasePath(
-            name=test_name, in_path=test_input_path, out_path=test_output_path
-        ),
-        output=answer.encode(),
-        exitcode=history.proc.returncode,
-        elapsed=history.elapsed,
-        memory=history.memory,
-    )
 
 
+@functools.lru_cache(maxsize=None)
 def check_gnu_time(gnu_time: str) -> bool:
     if gnu_time != TimerMode.GNU_TIME.value:
         # Only support GNU time
@@ -204,21 +384,30 @@ class GetTestCasesArgs:
     ignore_backup: bool = True
 
 
-def get_testcases(args: GetTestCasesArgs) -> List[TestCasePath]:
-    # list tests
-    if not args.test:
-        args.test = glob_with_format(args.directory, args.format)  # by default
-    if args.ignore_backup:
-        args.test = drop_backup_or_hidden_files(args.test)
-    tests = construct_relationship_of_files(args.test)
+def get_testcases(args: GetTestCasesArgs) -> Sequence[TestCasePath]:
+    with span("discover", directory=args.directory):
+        if not args.test:
+            # by default. nested `in/` and `out/` directories are also found
+            return discover(args.directory, args.format, args.ignore_backup)
+        if args.ignore_backup:
+            args.test = drop_backup_or_hidden_files(args.test)
+        tests = construct_relationship_of_files(args.test)
     return tests
 
 
+def _ordered(testcases: Sequence[TestCasePath]) -> Iterable[TestCasePath]:
+    if isinstance(testcases, TestCaseIndex):
+        # already sorted, and built lazily
+        return testcases
+    return sorted(testcases, key=lambda f: f.name)
+
+
 def test(args: TestingArgs) -> Generator[History, None, None]:
     # check wheather GNU time is available
-    if args.gnu_time and not check_gnu_time(args.gnu_time):
-        # print("GNU time is not available: %s", args.gnu_time)
-        args.gnu_time = None
+    with span("check gnu time"):
+        if args.gnu_time and not check_gnu_time(args.gnu_time):
+            # print("GNU time is not available: %s", args.gnu_time)
+            args.gnu_time = None
     if args.mle is not None and args.gnu_time is None:
         raise RuntimeError("--mle is used but GNU time does not exist")
 
@@ -228,11 +417,41 @@ def test(args: TestingArgs) -> Generator[History, None, None]:
         error=args.error,
         judge_command=args.judge,
         silent=args.silent,
+        checker=args.checker,
+        checker_processes=args.checker_processes,
+        tle=args.tle,
+    )
+    normalizer = build_normalizer(comparater) if args.digest else None
+    digests = DigestIndex(normalizer, type(comparater).__name__) if normalizer else None
+    store = (
+        SpillStore(args.spill_threshold) if args.spill_threshold is not None else None
     )
+    executions = None
+    if args.dedupe and args.interactor is None:
+        with span("dedupe"):
+            duplicates = find_duplicates(
+                testcase.in_path for testcase in args.testcases if testcase.in_path
+            )
+        executions = Executions(duplicates) if duplicates else None
+    try:
+        yield from _test(comparater, digests, store, executions, args)
+    finally:
+        if digests is not None:
+            digests.save()
+        if isinstance(comparater, comparator.Checker):
+            comparater.close()
+
 
+def _test(
+    comparater: comparator.OutputComparator,
+    digests: Optional[DigestIndex],
+    store: Optional[SpillStore],
+    executions: Optional[Executions],
+    args: TestingArgs,
+) -> Generator[History, None, None]:
     # run tests
     if args.jobs is None:
-        for testcase in sorted(args.testcases, key=lambda f: f.name):
+        for testcase in _ordered(args.testcases):
             if not testcase.in_path:
                 continue
             yield test_single_case(
@@ -240,6 +459,9 @@ def test(args: TestingArgs) -> Generator[History, None, None]:
                 testcase.in_path,
                 testcase.out_path,
                 comparater,
+                digests=digests,
+                store=store,
+                executions=executions,
                 args=args,
             )
     else:
@@ -247,9 +469,14 @@ def test(args: TestingArgs) -> Generator[History, None, None]:
             # logger.warning("-j/--jobs opiton is unstable on Windows environmet")
             pass
         with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
-            lock = threading.Lock()
+            # checkers are bound to each testcase, so the lock is only for logs
+            lock = (
+                threading.Lock()
+                if args.judge and not args.checker and not args.silent
+                else None
+            )
             futures: List[concurrent.futures.Future[History]] = []
-            for testcase in sorted(args.testcases, key=lambda f: f.name):
+            for testcase in _ordered(args.testcases):
                 if not testcase.in_path:
                     continue
                 futures += [
@@ -260,8 +487,16 @@ def test(args: TestingArgs) -> Generator[History, None, None]:
                         testcase.out_path,
                         comparater,
                         lock=lock,
+                        digests=digests,
+                        store=store,
+                        executions=executions,
                         args=args,
                     )
                 ]
-            for future in futures:
-                yield future.result()
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                # testcases not started yet are skipped if the generator is closed
+                for future in futures:
+                    future.cancel()
@@ -0,0 +1,100 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+
+class Tracer:
+    """Tracer records spans of the judge phases as Chrome trace events.
+
+    The exported JSON is viewable with chrome://tracing or https://ui.perfetto.dev.
+    Spans are not recorded unless enabled, then tracing costs nearly nothing.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._nullcontext = contextlib.ExitStack()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._events = []
+        self._threads = {}
+        self._origin = time.perf_counter()
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, cat: str = "judge", **args: Any) -> ContextManager[Any]:
+        if not self.enabled:
+            return self._nullcontext
+        return self._span(name, cat, args)
+
+    @contextlib.contextmanager
+    def _span(self, name: str, cat: str, args: Dict[str, Any]) -> Iterator[None]:
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            event: Dict[str, Any] = {"name": name, "cat": cat, "ph": "X", "args": args}
+            event["dur"] = (end - begin) * 1e6
+            self._record(event, begin)
+
+    def begin(self, name: str, cat: str = "judge", **args: Any) -> None:
+        """begin starts the span in the current thread, ended by `end`.
+
+        The span is kept open until the end of the trace if `end` is never called, e.g. aborted.
+        """
+        if self.enabled:
+            self._record({"name": name, "cat": cat, "ph": "B", "args": args})
+
+    def end(self) -> None:
+        """end ends the last span started by `begin` in the current thread."""
+        if self.enabled:
+            self._record({"ph": "E"})
+
+    def _record(self, event: Dict[str, Any], at: Optional[float] = None) -> None:
+        thread = threading.current_thread()
+        event["ts"] = ((at or time.perf_counter()) - self._origin) * 1e6
+        event["pid"] = os.getpid()
+        event["tid"] = thread.ident
+        if "args" in event:
+            event["args"] = {k: str(v) for k, v in event["args"].items()}
+        with self._lock:
+            self._events.append(event)
+            if thread.ident is not None:
+                self._threads[thread.ident] = thread.name
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            return metadata + list(self._events)
+
+    def export(self, path: Path) -> None:
+        """export saves recorded spans as Chrome trace-event JSON."""
+        with path.open("w") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
+
+
+def span(name: str, cat: str = "judge", **args: Any) -> ContextManager[Any]:
+    """span records the interval of the block into the global tracer if enabled."""
+    return tracer.span(name, cat, **args)
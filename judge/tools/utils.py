@@ -1,15 +1,28 @@
 import contextlib
+import json
 import os
 import shlex
+import shutil
 import signal
 import subprocess
-import sys
 import tempfile
 import time
 from dataclasses import dataclass
-from typing import BinaryIO, Callable, List, Optional
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Sequence, Tuple
 
 from judge.schema import TimerMode
+from judge.tools.store import cache_home, write_atomic
+from judge.tools.trace import span
+
+VERSIONS_FILE = "versions.json"
+# version managers like pyenv and asdf select the interpreter behind the shim by these
+VERSION_ENVS = ("PYENV_VERSION", "ASDF_PYTHON_VERSION")
+VERSION_FILES = (".python-version", ".tool-versions")
+
+
+class CommandNotFoundError(OSError):
+    """the command is not found or not executable"""
 
 
 @dataclass
@@ -19,6 +32,7 @@ class ExecArgs:
     input: Optional[bytes]
     preexec_fn: Optional[Callable[[], None]] = None
     timeout: Optional[float] = None  # sec
+    pass_fds: Sequence[int] = ()
 
 
 @dataclass
@@ -32,21 +46,24 @@ class History:
 def _exec(args: ExecArgs) -> History:
     begin = time.perf_counter()
     try:
-        proc = subprocess.Popen(
-            args.command,
-            stdin=args.stdin,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            preexec_fn=args.preexec_fn,
-        )  # pylint: disable=subprocess-popen-preexec-fn
-    except FileNotFoundError:
-        sys.exit(1)
-    except PermissionError:
-        sys.exit(1)
+        with span("spawn", "exec"):
+            proc = subprocess.Popen(
+                args.command,
+                stdin=args.stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                preexec_fn=args.preexec_fn,
+                pass_fds=args.pass_fds,
+            )  # pylint: disable=subprocess-popen-preexec-fn
+    except (FileNotFoundError, PermissionError) as e:
+        raise CommandNotFoundError(
+            e.errno, f"{e.strerror}: {' '.join(map(shlex.quote, args.command))}"
+        ) from e
 
     answer: Optional[bytes] = None
     try:
-        answer, _ = proc.communicate(input=args.input, timeout=args.timeout)
+        with span("run", "exec"):
+            answer, _ = proc.communicate(input=args.input, timeout=args.timeout)
     except subprocess.TimeoutExpired:
         pass
     finally:
@@ -68,16 +85,26 @@ def _exec_no_time(args: ExecArgs) -> History:
     return history
 
 
+def gnu_time_command(command: List[str], report: str) -> List[str]:
+    """gnu_time_command wraps the command to report the elapsed time and the max memory."""
+    return ["/usr/bin/time", "-f", "%e\n%M", "-o", report, "--"] + command
+
+
+def read_gnu_time(report: str) -> Optional[Tuple[float, float]]:
+    """
+    :returns: the elapsed time (ms) and the max memory (MB) if reported.
+    """
+    with open(report) as fh:
+        reported = fh.read()
+    if not reported.strip():
+        return None
+    ela, mem = reported.splitlines()[-2:]
+    return float(ela) * 1000, int(mem) / 1000
+
+
 def _exec_with_gnu_time(args: ExecArgs) -> History:
     with tempfile.NamedTemporaryFile(delete=True) as fh:
-        args.command = [
-            "/usr/bin/time",
-            "-f",
-            "%e\n%M",
-            "-o",
-            fh.name,
-            "--",
-        ] + args.command
+        args.command = gnu_time_command(args.command, fh.name)
 
         # if os.name == "nt":
         #     # HACK: without this encoding and decoding, something randomly fails with multithreading; see https://github.com/kmyk/online-judge-tools/issues/468
@@ -91,12 +118,9 @@ def _exec_with_gnu_time(args: ExecArgs) -> History:
         history = _exec(args)
 
         # mesurement memory
-        with open(fh.name) as fh1:
-            reported = fh1.read()
-        if reported.strip():
-            ela, mem = reported.splitlines()[-2:]
-            history.memory = int(mem) / 1000
-            history.elapsed = float(ela) * 1000
+        reported = read_gnu_time(fh.name)
+        if reported is not None:
+            history.elapsed, history.memory = reported
     return history
 
 
@@ -107,6 +131,7 @@ def exec_command(
     input: Optional[bytes] = None,
     timeout: Optional[float] = None,
     gnu_time: Optional[str] = None,
+    pass_fds: Sequence[int] = (),
 ) -> History:
     if input is not None:
         assert stdin is None
@@ -116,7 +141,8 @@ def exec_command(
         command=shlex.split(command_str),
         stdin=stdin,
         input=input,
-        timeout=timeout / 1000 if timeout else -1,
+        timeout=timeout / 1000 if timeout else None,
+        pass_fds=pass_fds,
     )
     if not gnu_time:
         history = _exec_no_time(args)
@@ -126,3 +152,73 @@ def exec_command(
         raise ValueError(f"{gnu_time} is expected [None, 'gnu-time']")
 
     return history
+
+
+def _read_version_file(path: Path) -> Optional[str]:
+    try:
+        return path.read_text()
+    except OSError:
+        return None
+
+
+def shim_selectors() -> List[Optional[str]]:
+    """shim_selectors returns what version managers select the interpreter by.
+
+    i.e. the environment variables, the nearest version files from the working directory and the global ones.
+    """
+    selectors = [os.environ.get(name) for name in VERSION_ENVS]
+    for name in VERSION_FILES:
+        for directory in [Path.cwd(), *Path.cwd().parents]:
+            if (directory / name).is_file():
+                selectors.append(_read_version_file(directory / name))
+                break
+        else:
+            selectors.append(None)
+    pyenv_root = Path(os.environ.get("PYENV_ROOT", Path.home() / ".pyenv"))
+    selectors.append(_read_version_file(pyenv_root / "version"))
+    selectors.append(_read_version_file(Path.home() / ".tool-versions"))
+    return selectors
+
+
+def _is_script(executable: str) -> bool:
+    with contextlib.suppress(OSError), open(executable, "rb") as fh:
+        return fh.read(2) == b"#!"
+    return False
+
+
+def interpreter_version(command: str, cache: Optional[Path] = None) -> Optional[str]:
+    """interpreter_version returns the version of the interpreter, e.g. `Python 3.8.5`.
+
+    The version is cached with the size and mtime of the executable, so `-V` runs only once until updated.
+    If the executable is a script like shims of pyenv, what selects the interpreter is also compared.
+    :returns: None if the command is not found or fails
+    """
+    executable = shutil.which(command)
+    if executable is None:
+        return None
+    executable = os.path.realpath(executable)
+    st = os.stat(executable)
+    signature: List[object] = [st.st_size, st.st_mtime_ns]
+    if _is_script(executable):
+        signature += shim_selectors()
+
+    cache = cache or cache_home() / VERSIONS_FILE
+    try:
+        versions = json.loads(cache.read_text())
+    except (OSError, ValueError):
+        versions = {}
+    entry = versions.get(executable)
+    if entry is not None and entry["signature"] == signature:
+        return str(entry["version"])
+
+    proc = subprocess.run(
+        [executable, "-V"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    if proc.returncode:
+        return None
+    version = proc.stdout.decode().strip()
+    versions[executable] = {"signature": signature, "version": version}
+    with contextlib.suppress(OSError):
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(cache, json.dumps(versions).encode())
+    return version
@@ -0,0 +1,106 @@
+"""Benchmark of the startup of the CLI.
+
+Measures wall time of `judge --help`, `judge test --help` and `judge test` until the first testcase is shown.
+
+Usage: python scripts/bench_startup.py [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+JUDGE = [sys.executable, "-m", "judge"]
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def time_to_exit(args: List[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(JUDGE + args, stdout=subprocess.DEVNULL, env=_env(), check=True)
+    return time.perf_counter() - start
+
+
+def time_to_first_case(workdir: Path, marker: str) -> Optional[float]:
+    """
+    :returns: sec until the line containing `marker` is printed, or None if not printed
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        JUDGE + ["test", str(workdir), "--py", "--verbose", "all"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=_env(),
+    )
+    assert proc.stdout is not None
+    elapsed: Optional[float] = None
+    for line in proc.stdout:
+        if marker.encode() in line:
+            elapsed = time.perf_counter() - start
+            break
+    proc.kill()
+    proc.wait()
+    return elapsed
+
+
+def setup(workdir: Path) -> None:
+    tests = workdir / "tests"
+    tests.mkdir()
+    (workdir / "main.py").write_text("print(input())\n")
+    for i in range(1, 4):
+        (tests / f"sample-{i}.in").write_text(f"{i}\n")
+        (tests / f"sample-{i}.out").write_text(f"{i}\n")
+    (workdir / ".judgecli").write_text(
+        "[judgecli]\n"
+        f'workdir = "{workdir}"\n'
+        f'file = "{workdir / "main.py"}"\n'
+        f'testdir = "{tests}"\n'
+    )
+
+
+def report(name: str, samples: List[float]) -> None:
+    if not samples:
+        print(f"{name:<24} failed")
+        return
+    print(
+        f"{name:<24} median {statistics.median(samples) * 1000:8.1f} ms"
+        f"  min {min(samples) * 1000:8.1f} ms  (n={len(samples)})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        workdir = Path(tempdir)
+        setup(workdir)
+        # warm up the page cache and the cache of interpreter versions
+        time_to_first_case(workdir, "sample-1")
+
+        report("judge --help", [time_to_exit(["--help"]) for _ in range(args.repeat)])
+        report(
+            "judge test --help",
+            [time_to_exit(["test", "--help"]) for _ in range(args.repeat)],
+        )
+        first_cases = [
+            time_to_first_case(workdir, "sample-1") for _ in range(args.repeat)
+        ]
+        report("judge test (first case)", [t for t in first_cases if t is not None])
+
+
+if __name__ == "__main__":
+    main()
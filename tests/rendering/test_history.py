@@ -3,7 +3,7 @@ from pathlib import Path
 
 from judge.rendering.history import Verbose
 from judge.rendering.history import render_history as rh
-from judge.schema import History, JudgeStatus, TestCasePath
+from judge.schema import History, JudgeStatus, Mismatch, TestCasePath
 
 
 class Hist:
@@ -145,3 +145,58 @@ def test_rendering_history_error(capsys):
         hist.render_history(JudgeStatus.MLE, verb)
         cap = capsys.readouterr()
         assert cap.out.endswith(res_only)
+
+
+def test_rendering_history_mismatch(capsys):
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        temp_in = tempdir / "temp.in"
+        temp_out = tempdir / "temp.out"
+        expected = b"".join(b"%d\n" % i for i in range(10000))
+        output = expected.replace(b"\n5000\n", b"\n-1\n")
+        with temp_in.open("wb") as f:
+            f.write(b"10000\n")
+        with temp_out.open("wb") as f:
+            f.write(expected)
+        history = History(
+            JudgeStatus.WA,
+            TestCasePath("case 1", temp_in, temp_out),
+            output=output,
+            exitcode=0,
+            elapsed=10,
+            memory=15,
+            mismatch=Mismatch(
+                line=5001,
+                column=1,
+                expected_line=5001,
+                expected_column=1,
+                actual=b"-1",
+                expected=b"5000",
+            ),
+        )
+        rh(history, Verbose.error_detail)
+        cap = capsys.readouterr()
+        assert "expected '5000' (line 5001, column 1)" in cap.out
+        assert "but got  '-1' (line 5001, column 1)" in cap.out
+        assert cap.out.endswith("-5000\n+-1\n 5001\n 5002\n 5003\n")
+        # the full outputs are not rendered
+        assert "\n4000\n" not in cap.out
+
+
+def test_rendering_history_dump_dir(capsys):
+    with tempfile.TemporaryDirectory() as _tempdir:
+        hist = Hist(_tempdir)
+        history = History(
+            JudgeStatus.WA,
+            TestCasePath("case 1", hist.temp_in, hist.temp_out),
+            output=b"123\n456\n",
+            exitcode=0,
+            elapsed=10,
+            memory=15,
+        )
+        dump_dir = Path(_tempdir) / "dump"
+        rh(history, Verbose.error_detail, dump_dir=dump_dir)
+        cap = capsys.readouterr()
+        assert (dump_dir / "case 1.out").read_bytes() == b"123\n456\n"
+        assert f"Output: {dump_dir / 'case 1.out'}" in cap.out
+        assert "123\n456" not in cap.out
@@ -0,0 +1,95 @@
+import asyncio
+import dataclasses
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from judge import api
+from judge.schema import JudgeStatus
+
+
+def _setup(tmp_path, n=3):
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    for i in range(1, n + 1):
+        (tests / f"sample-{i}.in").write_text(f"{i}\n")
+        (tests / f"sample-{i}.out").write_text(f"{i}\n" if i != 2 else "0\n")
+    solution = tmp_path / "main.py"
+    solution.write_text("print(input())\n")
+    return api.TestConfig(
+        command=f"{sys.executable} {solution}", testdir=tests, format="sample-%s.%e"
+    )
+
+
+@pytest.mark.offline
+def test_import_without_cli():
+    code = "import sys, judge.api; assert 'typer' not in sys.modules; assert 'click' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.offline
+def test_compare():
+    assert api.compare(b"1 2\n", b"1 2\n")
+    assert not api.compare(b"1 2\n", b"1  2\n")
+    assert api.compare(b"1.0000001\n", b"1\n", tolerance=1e-6)
+    assert api.compare(b"1\n2\n", b"1 2", api.CompareMode.IGNORE_SPACES_AND_NEWLINES)
+
+
+@pytest.mark.offline
+def test_run_tests(tmp_path):
+    config = _setup(tmp_path)
+    assert [t.name for t in api.get_testcases(config.testdir, config.format)] == [
+        "sample-1",
+        "sample-2",
+        "sample-3",
+    ]
+    histories = list(api.run_tests(config))
+    assert [h.status for h in histories] == [
+        JudgeStatus.AC,
+        JudgeStatus.WA,
+        JudgeStatus.AC,
+    ]
+
+
+@pytest.mark.offline
+def test_run_tests_cancel(tmp_path):
+    config = _setup(tmp_path)
+    cancel = threading.Event()
+    histories = []
+    for history in api.run_tests(config, cancel=cancel):
+        histories.append(history)
+        cancel.set()
+    assert len(histories) == 1
+
+
+@pytest.mark.offline
+def test_run_tests_async(tmp_path):
+    config = _setup(tmp_path)
+
+    async def collect(limit):
+        histories = []
+        iterator = api.run_tests_async(config)
+        async for history in iterator:
+            histories.append(history)
+            if len(histories) == limit:
+                break
+        await iterator.aclose()
+        return histories
+
+    assert len(asyncio.run(collect(None))) == 3
+    assert len(asyncio.run(collect(1))) == 1
+
+
+@pytest.mark.offline
+def test_run_tests_command_not_found(tmp_path):
+    config = dataclasses.replace(_setup(tmp_path), command="nonexistent-cmd-xyz")
+    with pytest.raises(api.CommandNotFoundError, match="nonexistent-cmd-xyz"):
+        list(api.run_tests(config))
+
+    async def collect():
+        return [history async for history in api.run_tests_async(config)]
+
+    with pytest.raises(api.CommandNotFoundError):
+        asyncio.run(collect())
@@ -23,3 +23,12 @@ def test_app():
 
     result = runner.invoke(app, ["test", "--help"])
     assert result.exit_code == 0, result.stdout
+
+    result = runner.invoke(app, ["stress", "--help"])
+    assert result.exit_code == 0, result.stdout
+
+    result = runner.invoke(app, ["minimize", "--help"])
+    assert result.exit_code == 0, result.stdout
+
+    result = runner.invoke(app, ["complexity", "--help"])
+    assert result.exit_code == 0, result.stdout
@@ -0,0 +1,69 @@
+import http.server
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pytest
+
+from judge.schema import History, JudgeStatus, TestCasePath
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+@pytest.fixture
+def make_history():
+    """make_history builds the history of the testcase without the expected output."""
+
+    def make(
+        name: str,
+        status: JudgeStatus,
+        *,
+        elapsed: float = 10,
+        memory: Optional[float] = None,
+        in_path: Optional[Path] = None,
+    ) -> History:
+        return History(
+            status,
+            TestCasePath(name, in_path, None),
+            output=b"",
+            exitcode=0,
+            elapsed=elapsed,
+            memory=memory,
+        )
+
+    return make
+
+
+@pytest.fixture
+def local_server():
+    """local_server starts local HTTP servers for the test.
+
+    Each server responds to GET requests by `respond(request)`, which returns the status, headers and body.
+    """
+    servers = []
+
+    def start(respond: Callable[[http.server.BaseHTTPRequestHandler], Response]) -> str:
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, headers, body = respond(self)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,158 @@
+import gzip
+import lzma
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from judge.schema import CompareMode, JudgeConfig, JudgeStatus
+from judge.tools import archive, testing
+
+
+def _test(directory: Path, command: str, job, **kwargs):
+    testcases = testing.get_testcases(
+        testing.GetTestCasesArgs(test=None, directory=directory, format="sample%s.%e")
+    )
+    args = testing.TestingArgs(
+        testcases=testcases,
+        command=command,
+        gnu_time=None,
+        mle=None,
+        tle=None,
+        compare_mode=CompareMode.EXACT_MATCH,
+        jobs=job,
+        **kwargs,
+    )
+    return {h.testcase.name: h.status for h in testing.test(args)}
+
+
+@pytest.mark.offline
+def test_strip_compression():
+    assert archive.strip_compression("sample-1.in.xz") == "sample-1.in"
+    assert archive.strip_compression("sample-1.out.gz") == "sample-1.out"
+    assert archive.strip_compression("sample-1.in") == "sample-1.in"
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_compressed_files(tmp_path, job):
+    with lzma.open(str(tmp_path / "sample-1.in.xz"), "wb") as f:
+        f.write(b"1\n")
+    with gzip.open(str(tmp_path / "sample-1.out.gz"), "wb") as f:
+        f.write(b"1\n")
+    with gzip.open(str(tmp_path / "sample-2.in.gz"), "wb") as f:
+        f.write(b"2\n")
+    (tmp_path / "sample-2.out").write_bytes(b"3\n")
+
+    for _ in range(2):
+        statuses = _test(tmp_path, "python3 -c 'print(input())'", job)
+        assert statuses == {"sample-1": JudgeStatus.AC, "sample-2": JudgeStatus.WA}
+    assert not (tmp_path / "sample-1.in").exists()
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_zip(tmp_path, job):
+    path = tmp_path / "tests.zip"
+    with zipfile.ZipFile(str(path), "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("sample-1.in", b"1\n")
+        zf.writestr("sample-1.out", b"1\n")
+        zf.writestr("README.md", b"unknown\n")
+        zf.writestr("A/in/random_01.txt", b"2\n")
+        zf.writestr("A/out/random_01.txt", b"2\n")
+        zf.writestr("A/in/random_02.txt", b"3\n")
+        zf.writestr("A/out/random_02.txt", b"4\n")
+
+    testcases = testing.get_testcases(
+        testing.GetTestCasesArgs(test=None, directory=path, format="sample%s.%e")
+    )
+    assert [t.name for t in testcases] == ["A-random_01", "A-random_02", "sample-1"]
+    assert archive.read_testcase(testcases[0].in_path) == b"2\n"
+
+    statuses = _test(path, "python3 -c 'print(input())'", job)
+    assert statuses == {
+        "A-random_01": JudgeStatus.AC,
+        "A-random_02": JudgeStatus.WA,
+        "sample-1": JudgeStatus.AC,
+    }
+
+    # the special judge reads decompressed testcases from in-memory files
+    checker = tmp_path / "checker.py"
+    checker.write_text(
+        "import sys\n"
+        "n = int(open(sys.argv[1]).read())\n"
+        "sys.exit(0 if int(open(sys.argv[2]).read()) == n + 1 else 1)\n"
+    )
+    statuses = _test(
+        path, "python3 -c 'print(int(input()) + 1)'", job, judge=f"python3 {checker}"
+    )
+    assert set(statuses.values()) == {JudgeStatus.AC}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["checker.py", "tests.zip"]
+
+
+@pytest.mark.offline
+def test_stdin_for_unread_input(tmp_path):
+    path = tmp_path / "sample-1.in.xz"
+    with lzma.open(str(path), "wb") as f:
+        f.write(b"0" * (1 << 22))
+    statuses = _test(tmp_path, "true", None)
+    assert statuses == {"sample-1": JudgeStatus.AC}
+
+
+@pytest.mark.offline
+def test_zip_testdir(tmp_path):
+    path = tmp_path / "tests.zip"
+    with zipfile.ZipFile(str(path), "w") as zf:
+        zf.writestr("sample-1.in", b"1\n")
+        zf.writestr("sample-2.in", b"2\n")
+    testcases = testing.get_testcases(
+        testing.GetTestCasesArgs(test=[], directory=path, format="sample%s.%e")
+    )
+    assert [t.name for t in testcases.select("sample-2")] == ["sample-2"]
+    assert not testcases.select("sample-3")
+
+    assert JudgeConfig(workdir=tmp_path, testdir=path).testdir == path
+    assert JudgeConfig(workdir=tmp_path, testdir=tmp_path).testdir == tmp_path
+    not_zip = tmp_path / "tests.txt"
+    not_zip.write_text("1\n")
+    broken = tmp_path / "broken.zip"
+    broken.write_text("1\n")
+    for testdir in [not_zip, broken]:
+        with pytest.raises(ValidationError):
+            JudgeConfig(workdir=tmp_path, testdir=testdir)
+
+
+@pytest.mark.offline
+def test_is_larger(tmp_path):
+    plain = tmp_path / "sample-1.out"
+    plain.write_bytes(b"x" * 10)
+    compressed = tmp_path / "sample-2.out.xz"
+    with lzma.open(str(compressed), "wb") as f:
+        f.write(b"x" * 10)
+    for path in [plain, compressed]:
+        assert archive.is_larger(path, 9)
+        assert not archive.is_larger(path, 10)
+
+
+@pytest.mark.offline
+def test_replaced_zip(tmp_path):
+    path = tmp_path / "tests.zip"
+    with zipfile.ZipFile(str(path), "w") as zf:
+        zf.writestr("sample-1.in", b"1\n")
+    assert archive.read_testcase(path / "sample-1.in") == b"1\n"
+    stale = archive.open_archive(path)
+    stream = archive.open_testcase(path / "sample-1.in")
+
+    replaced = tmp_path / "replaced.zip"
+    with zipfile.ZipFile(str(replaced), "w") as zf:
+        zf.writestr("sample-1.in", b"replaced\n")
+        zf.writestr("sample-2.in", b"2\n")
+    os.replace(str(replaced), str(path))
+    assert archive.open_archive(path) is not stale
+    assert archive.read_testcase(path / "sample-1.in") == b"replaced\n"
+    assert archive.read_testcase(path / "sample-2.in") == b"2\n"
+    # members opened before the replacement are still readable
+    with stream:
+        assert stream.read() == b"1\n"
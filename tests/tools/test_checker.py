@@ -0,0 +1,120 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import CompareMode, JudgeStatus
+from judge.tools import checker as checker_module
+from judge.tools import testing
+from judge.tools.checker import PythonChecker, Verdict, load_check
+
+CHECKER = """\
+from judge.tools.checker import Verdict
+
+
+def check(input, actual, expected):
+    # any pair (a, b) such that a + b = n is accepted
+    n = int(input)
+    a, b = map(int, actual.split())
+    if a + b != n:
+        return Verdict(False, f"{a} + {b} != {n}")
+    return True
+"""
+
+
+@pytest.fixture
+def checker_path():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        path = Path(_tempdir) / "checker.py"
+        path.write_text(CHECKER)
+        yield path
+
+
+@pytest.mark.offline
+def test_load_check(checker_path):
+    check = load_check(str(checker_path))
+    assert check(b"3\n", b"1 2\n", None) is True
+    assert check(b"3\n", b"1 1\n", None) == Verdict(False, "1 + 1 != 3")
+
+    no_check = checker_path.parent / "no_check.py"
+    no_check.write_text("x = 1\n")
+    with pytest.raises(TypeError):
+        load_check(str(no_check))
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("processes", [None, 2])
+def test_python_checker(checker_path, processes):
+    input_path = checker_path.parent / "sample-1.in"
+    input_path.write_bytes(b"3\n")
+    checker = PythonChecker(str(checker_path), processes)
+    try:
+        bound = checker.bind(input_path, None)
+        assert bound is not checker
+        assert bound.check is checker.check
+        assert bound(actual=b"1 2\n", expected=b"")
+        assert bound.elapsed is not None
+        assert not bound(actual=b"2 2\n", expected=b"")
+        assert bound.message == "2 + 2 != 3"
+        # an exception in `check` rejects only the output
+        assert not bound(actual=b"1.5 1.5\n", expected=b"")
+        assert "ValueError" in bound.message
+        assert bound(actual=b"1 2\n", expected=b"")
+        # the original checker isn't changed by bound ones
+        assert checker.message == ""
+        assert checker.input_path is None
+    finally:
+        checker.close()
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_testing_with_python_checker(checker_path, job):
+    tempdir = checker_path.parent
+    for i, n in enumerate([3, 4, 5]):
+        (tempdir / f"sample-{i}.in").write_bytes(b"%d\n" % n)
+    testcases = testing.get_testcases(
+        testing.GetTestCasesArgs(test=None, directory=tempdir, format="sample%s.%e")
+    )
+    args = testing.TestingArgs(
+        testcases=testcases,
+        command="python3 -c 'n = int(input()); print(n // 2, n - n // 2 - (n == 5))'",
+        gnu_time=None,
+        mle=None,
+        tle=None,
+        compare_mode=CompareMode.EXACT_MATCH,
+        jobs=job,
+        checker=str(checker_path),
+    )
+    histories = {h.testcase.name: h for h in testing.test(args)}
+    assert histories["sample-0"].status == JudgeStatus.AC
+    assert histories["sample-1"].status == JudgeStatus.AC
+    assert histories["sample-2"].status == JudgeStatus.WA
+    assert histories["sample-2"].checker_message == "2 + 2 != 5"
+    assert all(h.checker_elapsed is not None for h in histories.values())
+
+
+@pytest.mark.offline
+def test_python_checker_reads_once(tmp_path, monkeypatch):
+    input_path, output_path = tmp_path / "sample-1.in", tmp_path / "sample-1.out"
+    input_path.write_bytes(b"3\n")
+    output_path.write_bytes(b"on disk\n")
+    reads = []
+    read_testcase = checker_module.read_testcase
+    monkeypatch.setattr(
+        checker_module,
+        "read_testcase",
+        lambda path: reads.append(path) or read_testcase(path),
+    )
+    calls = []
+    checker = PythonChecker("unused", check=lambda *args: calls.append(args) or True)
+    bound = checker.bind(input_path, output_path)
+    assert bound(actual=b"1 2\n", expected=b"1 2\n")
+    assert bound(actual=b"2 1\n", expected=b"1 2\n")
+    # the expected output given by the caller is passed, and the input is read once
+    assert calls == [(b"3\n", b"1 2\n", b"1 2\n"), (b"3\n", b"2 1\n", b"1 2\n")]
+    assert reads == [input_path]
+
+    # the expected output is None if the testcase has no output
+    assert checker.bind(input_path, None)(actual=b"1 2\n", expected=b"")
+    assert calls[-1] == (b"3\n", b"1 2\n", None)
@@ -163,3 +163,199 @@ def test_non_strict():
     comp = comparator.non_strict()
     assert not comp(actual=b"1.0 2.0\r\n3.0 4.0\r\n", expected=b"1.02.0\r\n1.1 2.1")
     assert comp(actual=b"1.0 1.0\n2.0\n", expected=b"1.0   1.0\r\n2.0")
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("split_lines", [True, False])
+def test_bulk_fp_num(mocker, use_numpy: bool, split_lines: bool):
+    """check bulk float point comparator is same as the chain of comparators"""
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        mocker.patch.object(comparator, "np", None)
+    import random
+
+    rng = random.Random(0)
+    words = [b"abc", b"1_0", b"_1", b"-0", b"1e-300", b"1e300", b"0.3", b"1.0000001"]
+    for tolerance in (0.0, 1e-6, 1e-1):
+        bulk = comparator.BulkFloatingPointNumberComparator(
+            rel_tol=tolerance, abs_tol=tolerance, split_lines=split_lines
+        )
+        word_comparator = comparator.FloatingPointNumberComparator(
+            rel_tol=tolerance, abs_tol=tolerance
+        )
+        if split_lines:
+            chain = comparator.CRLFInsensitiveComparator(
+                comparator.SplitLinesComparator(
+                    comparator.SplitComparator(word_comparator)
+                )
+            )
+        else:
+            chain = comparator.CRLFInsensitiveComparator(
+                comparator.SplitComparator(word_comparator)
+            )
+        for _ in range(300):
+            expected = [
+                rng.choice(words + [str(rng.uniform(-2, 2)).encode()])
+                for _ in range(rng.randint(1, 5))
+            ]
+            actual = []
+            for word in expected:
+                if rng.random() < 0.5:
+                    actual.append(word)
+                elif rng.random() < 0.5 and word[0:1] != b"_":
+                    value = float(word.replace(b"abc", b"1"))
+                    eps = rng.choice([0.0, 1e-7, 1e-6, 1e-5, 1e-1, 2e-1])
+                    actual.append(repr(value * (1 + eps) + eps).encode())
+                else:
+                    actual.append(rng.choice(words))
+            sep = rng.choice([b" ", b"\n", b"\r\n"])
+            x = sep.join(actual) + rng.choice([b"", b"\n"])
+            y = sep.join(expected)
+            assert bulk(actual=x, expected=y) == chain(actual=x, expected=y), (x, y)
+
+    comp = comparator.BulkFloatingPointNumberComparator(
+        rel_tol=0.0, abs_tol=1e-1, split_lines=split_lines
+    )
+    assert comp(actual=b"1.0 2.0\r\n3.0 abc\r\n", expected=b"1.1 2.1\n3.1 abc\n")
+    assert not comp(actual=b"1.0 2.0\n3.0 abc\n", expected=b"1.1 2.1\n3.1 abd\n")
+    assert not comp(actual=b"1.0 2.0\n3.0\n", expected=b"1.0 2.0\n")
+    assert comp(actual=b"1.0 2.0\n3.0\n", expected=b"1.0\n2.0 3.0\n") == (
+        not split_lines
+    )
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1 << 20])
+def test_stream_comparators(chunk_size: int):
+    """check stream comparators are same as the chain of comparators"""
+    import random
+
+    rng = random.Random(0)
+    pairs = [
+        (
+            comparator.CRLFInsensitiveComparator(comparator.ExactComparator()),
+            comparator.CRLFInsensitiveStreamComparator(),
+        ),
+        (
+            comparator.CRLFInsensitiveComparator(
+                comparator.SplitLinesComparator(
+                    comparator.SplitComparator(comparator.ExactComparator())
+                )
+            ),
+            comparator.IgnoreSpacesComparator(),
+        ),
+        (
+            comparator.CRLFInsensitiveComparator(
+                comparator.SplitComparator(comparator.ExactComparator())
+            ),
+            comparator.IgnoreSpacesAndNewlinesComparator(),
+        ),
+    ]
+    alphabet = [b"a", b"b", b" ", b"\n", b"\r", b"\t", b"\r\n", b"\x0b", b"\x0c"]
+    for _ in range(3000):
+        x = b"".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+        y = bytearray(x)
+        for _ in range(rng.randint(0, 3)):
+            k = rng.randint(0, len(y))
+            y[k : k + rng.randint(0, 2)] = rng.choice(alphabet)
+        for chain, stream in pairs:
+            stream.chunk_size = chunk_size
+            assert stream(actual=x, expected=bytes(y)) == chain(
+                actual=x, expected=bytes(y)
+            ), (stream, x, bytes(y))
+
+
+@pytest.mark.offline
+def test_locate():
+    def locate(comp, actual, expected):
+        mismatch = comp.locate(actual, expected)
+        if mismatch is None:
+            return None
+        return (
+            mismatch.line,
+            mismatch.column,
+            mismatch.expected_line,
+            mismatch.expected_column,
+            mismatch.actual,
+            mismatch.expected,
+        )
+
+    comp = comparator.exact_match()
+    assert locate(comp, b"1 2\n3 4\n", b"1 2\n3 4\n") is None
+    assert locate(comp, b"1 2\n3 45\n", b"1 2\n3 46\n") == (2, 4, 2, 4, b"45", b"46")
+    assert locate(comp, b"1 2\n3 4\n", b"1 2\n3 4") == (2, 4, 2, 4, b"\n", None)
+
+    comp = comparator.crlf_insensitive_exact_match()
+    assert locate(comp, b"1 2\r\n3 4\r\n", b"1 2\n3 4\n") is None
+    assert locate(comp, b"1\r\n2\r\n", b"1\n3\n") == (2, 1, 2, 1, b"2", b"3")
+
+    comp = comparator.ignore_spaces()
+    assert locate(comp, b"1  2\n3 4\r\n\n", b"1 2\n3 4") is None
+    assert locate(comp, b"1  2\n3 4\n", b"1 2\n3  4 5\n") == (2, 4, 2, 6, None, b"5")
+    assert locate(comp, b"1\n2\n", b"1\n") == (2, 1, 1, 2, b"2", None)
+
+    comp = comparator.ignore_spaces_and_newlines()
+    assert locate(comp, b"1\n2\n3", b"1 2 3\n") is None
+    assert locate(comp, b"1\n2\n3", b"1 2 4") == (3, 1, 1, 5, b"3", b"4")
+
+    comp = comparator.exact_match(1e-1)
+    assert locate(comp, b"1.0 2.0\n3.0\n", b"1.05 2.0\n3.05\n") is None
+    assert locate(comp, b"1.0 2.0\n3.0\n", b"1.05 2.0\n3.5\n") == (
+        2,
+        1,
+        2,
+        1,
+        b"3.0",
+        b"3.5",
+    )
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("memfd", [True, False])
+def test_special_judge(monkeypatch, tmp_path, memfd: bool):
+    import os
+
+    if not memfd:
+        monkeypatch.delattr(os, "memfd_create", raising=False)
+    checker = tmp_path / "checker.py"
+    checker.write_text(
+        "import sys\n"
+        "expected = open(sys.argv[3]).read().split()\n"
+        "sys.exit(sorted(open(sys.argv[2]).read().split()) != sorted(expected))\n"
+    )
+    (tmp_path / "1.in").write_bytes(b"")
+    (tmp_path / "1.out").write_bytes(b"1 2 3\n")
+    comp = comparator.SpecialJudge(
+        judge_command=f"python3 {checker}",
+        is_silent=True,
+        test_input_path=tmp_path,
+        test_output_path=None,
+    )
+    bound = comp.bind(tmp_path / "1.in", tmp_path / "1.out")
+    assert bound is not comp
+    assert comp.test_expected_path is None
+    assert bound(b"3 1 2\n", b"")
+    assert not bound(b"3 1 1\n", b"")
+    assert bound.elapsed is not None
+
+
+@pytest.mark.offline
+def test_special_judge_timeout(tmp_path):
+    checker = tmp_path / "checker.py"
+    checker.write_text("import time\ntime.sleep(10)\n")
+    (tmp_path / "1.in").write_bytes(b"")
+    (tmp_path / "1.out").write_bytes(b"1\n")
+    comp = comparator.SpecialJudge(
+        judge_command=f"python3 {checker}",
+        is_silent=True,
+        test_input_path=tmp_path,
+        test_output_path=None,
+        tle=10,
+    )
+    bound = comp.bind(tmp_path / "1.in", tmp_path / "1.out")
+    assert bound.timeout == 10 * comparator.JUDGE_TIMEOUT_SCALE
+    assert not bound(b"1\n", b"")
+    assert "Timeout" in bound.message
+    assert bound.elapsed < 5000
@@ -0,0 +1,75 @@
+import math
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import JudgeStatus
+from judge.tools import complexity
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize(
+    "model, func",
+    [
+        ("O(N)", lambda n: 30 + 1e-3 * n),
+        ("O(N log N)", lambda n: 30 + 1e-4 * n * math.log2(n)),
+        ("O(N^2)", lambda n: 30 + 1e-6 * n * n),
+    ],
+)
+def test_fit_models(model, func):
+    xs = [1e3, 1e4, 1e5, 2e5, 4e5]
+    fits = complexity.fit_models(xs, [func(x) for x in xs])
+    assert fits[0].model == model
+    assert fits[0].error < 1e-6
+    assert fits[0].predict(1e6) == pytest.approx(func(1e6))
+
+
+@pytest.mark.offline
+def test_fit_constant():
+    xs = [1e3, 1e4, 1e5]
+    fits = complexity.fit_models(xs, [30.0, 30.0, 30.0])
+    assert fits[0].model == "O(1)"
+
+
+@pytest.mark.offline
+def test_estimate():
+    measurements = [
+        complexity.Measurement(size=n, elapsed=[10 + 1e-6 * n * n])
+        for n in [1000, 2000, 4000]
+    ]
+    args = complexity.ComplexityArgs(
+        generator="", command="", sizes=[1000, 2000, 4000], tle=2000, max_n=200000
+    )
+    estimation = complexity.estimate(measurements, args)
+    assert estimation.time_fits[0].model == "O(N^2)"
+    assert estimation.status == JudgeStatus.TLE
+    assert not estimation.memory_fits
+
+    args.max_n = 10000
+    assert complexity.estimate(measurements, args).status == JudgeStatus.AC
+
+
+@pytest.mark.offline
+def test_measure():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        gen = tempdir / "gen.py"
+        with gen.open("w") as f:
+            f.write("import sys\nn = int(sys.argv[2])\nprint(n)\nprint(*range(n))\n")
+        sol = tempdir / "sol.py"
+        with sol.open("w") as f:
+            f.write("input()\nprint(sum(map(int, input().split())))\n")
+        args = complexity.ComplexityArgs(
+            generator=f"python3 {gen}",
+            command=f"python3 {sol}",
+            sizes=[10, 100],
+            repeat=2,
+            tle=1e5,
+        )
+        measurements = complexity.measure(args)
+        assert [m.size for m in measurements] == [10, 100]
+        assert all(len(m.elapsed) == 2 for m in measurements)
+        assert not any(m.timeout for m in measurements)
+        estimation = complexity.estimate(measurements, args)
+        assert estimation.status == JudgeStatus.AC
@@ -0,0 +1,96 @@
+from collections import Counter
+
+import pytest
+
+from judge.schema import JudgeConfig
+from judge.tools.contest import ContestDownloadArgs, download_contest
+from judge.tools.httpcache import ResponseCache
+
+TASKS = """<html><body><table><tbody>
+<tr><td>A</td><td><a href="/contests/abc999/tasks/abc999_a">Add</a></td><td>2 sec</td><td>1024 MB</td></tr>
+<tr><td>B</td><td><a href="/contests/abc999/tasks/abc999_b">Sub</a></td><td>3 sec</td><td>256 MB</td></tr>
+</tbody></table></body></html>
+"""
+
+TASK = """<html><body><div id="task-statement"><span class="lang"><span class="lang-en">
+<div class="part"><section><h3>Sample Input 1</h3><pre>{0}
+</pre></section></div>
+<div class="part"><section><h3>Sample Output 1</h3><pre>{1}
+</pre></section></div>
+</span></span></div></body></html>
+"""
+
+PAGES = {
+    "/contests/abc999/tasks": TASKS,
+    "/contests/abc999/tasks/abc999_a": TASK.format("1 2", "3"),
+    "/contests/abc999/tasks/abc999_b": TASK.format("5 2", "3"),
+}
+
+
+@pytest.fixture
+def server(local_server):
+    requests = Counter()
+
+    def respond(request):
+        path = request.path.split("?")[0]
+        requests[path] += 1
+        # the first request for each page fails temporarily
+        if requests[path] == 1:
+            status, body = 503, b""
+        elif path in PAGES:
+            status, body = 200, PAGES[path].encode()
+        else:
+            status, body = 404, b""
+        return status, {"Content-Type": "text/html; charset=utf-8"}, body
+
+    yield local_server(respond), requests
+
+
+@pytest.mark.offline
+def test_download_contest(tmp_path, server):
+    origin, requests = server
+    args = ContestDownloadArgs(
+        contest="abc999",
+        workdir=tmp_path,
+        cookie=tmp_path / "cookie.jar",
+        jobs=2,
+        backoff=0,
+        origin=origin,
+    )
+    problems = {p.name: p for p in download_contest(args)}
+    assert sorted(problems) == ["a", "b"]
+    assert all(p.error is None for p in problems.values())
+    assert requests == {path: 2 for path in PAGES}
+
+    assert (tmp_path / "a" / "tests" / "sample-1.in").read_text() == "1 2\n"
+    assert (tmp_path / "b" / "tests" / "sample-1.out").read_text() == "3\n"
+    config = JudgeConfig.from_toml(tmp_path / "b")
+    assert config.contest == "abc999"
+    assert config.problem == "b"
+    assert config.URL == "https://atcoder.jp/contests/abc999/tasks/abc999_b"
+    assert config.testdir == (tmp_path / "b" / "tests").resolve()
+    assert config.tle == 3000
+    assert config.mle == 256
+
+
+@pytest.mark.offline
+def test_download_contest_offline(tmp_path, server):
+    origin, requests = server
+    cache = ResponseCache(tmp_path / "cache")
+    args = ContestDownloadArgs(
+        contest="abc999",
+        workdir=tmp_path / "online",
+        cookie=tmp_path / "cookie.jar",
+        backoff=0,
+        origin=origin,
+        cache=cache,
+    )
+    assert all(p.error is None for p in download_contest(args))
+    requests.clear()
+
+    args.workdir = tmp_path / "offline"
+    args.cache = ResponseCache(tmp_path / "cache", offline=True)
+    problems = {p.name: p for p in download_contest(args)}
+    assert all(p.error is None for p in problems.values())
+    assert not requests
+    assert (tmp_path / "offline" / "b" / "tests" / "sample-1.in").read_text() == "5 2\n"
@@ -0,0 +1,113 @@
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from judge.tools.daemon import forward, is_running, stop
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = tmp_path / "judge.sock"
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from pathlib import Path; from judge.daemon import run; "
+            "from judge.tools.daemon import serve; serve(run, Path(sys.argv[1]))",
+            str(path),
+        ]
+    )
+    for _ in range(200):
+        if is_running(path):
+            break
+        time.sleep(0.05)
+    yield path
+    stop(path)
+    proc.wait(timeout=10)
+
+
+@pytest.mark.offline
+def test_forward(tmp_path, daemon, capfd, monkeypatch):
+    assert forward(["test", "--help"], daemon) == 0
+    assert "Usage: judge test" in capfd.readouterr().out
+
+    # the working directory of the client is used
+    monkeypatch.chdir(tmp_path)
+    assert forward(["test", "not-exist"], daemon) == 1
+    assert f"Not exists: {tmp_path.resolve() / 'not-exist'}" in capfd.readouterr().out
+
+
+@pytest.mark.offline
+def test_not_running(tmp_path):
+    assert forward(["test", "--help"], tmp_path / "judge.sock") is None
+    assert not stop(tmp_path / "judge.sock")
+
+
+STUB = """
+import subprocess, sys, time
+from pathlib import Path
+from judge.tools.daemon import serve
+
+def run(argv):
+    mark = Path(argv[0])
+    sleep = subprocess.Popen(["sleep", "60"])
+    Path(argv[1]).write_text(str(sleep.pid))
+    for i in range(100):
+        mark.write_text(str(i))
+        time.sleep(0.1)
+    return 0
+
+serve(run, Path(sys.argv[1]))
+"""
+
+
+def _alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            return fh.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("signum", [signal.SIGINT, signal.SIGTERM])
+def test_forward_signal(tmp_path, signum):
+    path = tmp_path / "judge.sock"
+    mark, sleep = tmp_path / "mark", tmp_path / "sleep"
+    daemon = subprocess.Popen([sys.executable, "-c", STUB, str(path)])
+    try:
+        for _ in range(200):
+            if is_running(path):
+                break
+            time.sleep(0.05)
+        client = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from pathlib import Path; from judge.tools.daemon import forward; "
+                "sys.exit(forward(sys.argv[2:], Path(sys.argv[1])))",
+                str(path),
+                str(mark),
+                str(sleep),
+            ]
+        )
+        for _ in range(200):
+            if mark.exists() and sleep.exists() and sleep.read_text():
+                break
+            time.sleep(0.05)
+        client.send_signal(signum)
+        assert client.wait(timeout=10) != 0
+
+        # the command and its subprocesses are stopped with the client
+        time.sleep(0.5)
+        stopped = mark.read_text()
+        time.sleep(0.5)
+        assert mark.read_text() == stopped
+        assert int(stopped) < 99
+        assert not _alive(int(sleep.read_text()))
+    finally:
+        stop(path)
+        daemon.wait(timeout=10)
@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from judge.schema import Mismatch
+from judge.tools import comparator, diff
+
+
+@pytest.mark.offline
+def test_line_offset():
+    data = b"a\nbb\n\nccc"
+    assert diff.line_offset(data, 1) == 0
+    assert diff.line_offset(data, 2) == 2
+    assert diff.line_offset(data, 4) == 6
+    assert diff.line_offset(data, 5) == len(data)
+
+    data = b"x\n" * 100000
+    assert diff.line_offset(data, 77777) == 2 * 77776
+
+
+@pytest.mark.offline
+def test_window():
+    data = b"1\r\n2\n" + b"x" * 1000 + b"\n4"
+    assert diff.window(data, 2, 2) == ["2", "x" * diff.DIFF_MAX_WIDTH + "..."]
+    assert diff.window(data, 4, 10) == ["4"]
+    assert diff.window(data, 5, 10) == []
+
+
+@pytest.mark.offline
+def test_window_stream(monkeypatch):
+    # chunks split lines at any position
+    monkeypatch.setattr(diff, "CHUNK_SIZE", 3)
+    data = b"1\r\n2\n" + b"x" * 1000 + b"\n4\n\n" + b"y" * 1000
+    for first in range(1, 8):
+        for size in range(1, 8):
+            expected = diff.window(data, first, size)
+            assert diff.window_stream(io.BytesIO(data), first, size) == expected
+
+
+@pytest.mark.offline
+def test_bounded_diff():
+    expected = b"".join(b"%d\n" % i for i in range(100000))
+    actual = expected.replace(b"\n50000\n", b"\n-1\n")
+    mismatch = comparator.exact_match().locate(actual, expected)
+    assert mismatch == Mismatch(
+        line=50001,
+        column=1,
+        expected_line=50001,
+        expected_column=1,
+        actual=b"-1",
+        expected=b"50000",
+    )
+    lines = diff.bounded_diff(actual, expected, mismatch)
+    assert lines == [
+        "--- expected",
+        "+++ output",
+        "@@ -49998,7 +49998,7 @@",
+        " 49997",
+        " 49998",
+        " 49999",
+        "-50000",
+        "+-1",
+        " 50001",
+        " 50002",
+        " 50003",
+    ]
+
+    lines = diff.bounded_diff(io.BytesIO(actual), io.BytesIO(expected), mismatch)
+    assert lines == diff.bounded_diff(actual, expected, mismatch)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import CompareMode, JudgeStatus
+from judge.tools import comparator, digest, testing
+
+
+@pytest.mark.offline
+def test_build_normalizer():
+    assert digest.build_normalizer(comparator.exact_match()) is not None
+    assert digest.build_normalizer(comparator.ignore_spaces()) is not None
+    assert digest.build_normalizer(comparator.exact_match(1e-6)) is None
+
+    normalizer = digest.build_normalizer(comparator.crlf_insensitive_exact_match())
+    assert normalizer is not None
+    assert digest.digest(normalizer(b"1\r\n2\r\n")) == digest.digest(
+        normalizer(b"1\n2\n")
+    )
+    assert digest.digest(normalizer(b"1\r\n2\r\n")) != digest.digest(
+        normalizer(b"1\n2")
+    )
+
+
+@pytest.mark.offline
+def test_digest_index(mocker, tmp_path):
+    root = tmp_path / "digests"
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        out = tempdir / "sample-1.out"
+        out.write_bytes(b"1 2\n")
+        comp = comparator.ignore_spaces()
+        normalizer = digest.build_normalizer(comp)
+
+        index = digest.DigestIndex(normalizer, type(comp).__name__, root)
+        assert index.lookup(out) == index.digest(b"1  2\r\n")
+        index.save()
+        assert index.index_path(tempdir).parent == root
+        assert index.index_path(tempdir).exists()
+        assert [p.name for p in tempdir.iterdir()] == ["sample-1.out"]
+
+        # the cached digest is used without reading the file
+        index = digest.DigestIndex(normalizer, type(comp).__name__, root)
+        spy = mocker.spy(index, "digest")
+        assert index.lookup(out) == index.digest(b"1 2")
+        assert spy.call_count == 1
+
+        # invalidated by mtime
+        out.write_bytes(b"3 4\n")
+        stat = out.stat()
+        os.utime(str(out), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        index = digest.DigestIndex(normalizer, type(comp).__name__, root)
+        assert index.lookup(out) == index.digest(b"3 4")
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_testing_with_digest(job, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        (tempdir / "sample-1.in").write_bytes(b"1\n")
+        (tempdir / "sample-1.out").write_bytes(b"1\r\n")
+        (tempdir / "sample-2.in").write_bytes(b"2\n")
+        (tempdir / "sample-2.out").write_bytes(b"3\n")
+        testcases = testing.get_testcases(
+            testing.GetTestCasesArgs(test=None, directory=tempdir, format="sample%s.%e")
+        )
+        args = testing.TestingArgs(
+            testcases=testcases,
+            command="python3 -c 'print(input())'",
+            gnu_time=None,
+            mle=None,
+            tle=None,
+            compare_mode=CompareMode.CRLF_INSENSITIVE_EXACT_MATCH,
+            jobs=job,
+        )
+        mtime = tempdir.stat().st_mtime_ns
+        for _ in range(2):
+            statuses = {h.testcase.name: h.status for h in testing.test(args)}
+            assert statuses == {"sample-1": JudgeStatus.AC, "sample-2": JudgeStatus.WA}
+            assert (
+                len(list((tmp_path / "judge" / digest.DIGEST_INDEX_DIR).iterdir())) == 1
+            )
+        # the discovery cache keyed on the mtime of the test directory is kept
+        assert tempdir.stat().st_mtime_ns == mtime
+        # the index is never discovered as a testcase
+        discover = testing.GetTestCasesArgs(
+            test=None, directory=tempdir, format="sample%s.%e"
+        )
+        assert len(testing.get_testcases(discover)) == 2
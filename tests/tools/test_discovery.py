@@ -0,0 +1,56 @@
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from judge.tools import discovery
+
+
+@pytest.mark.offline
+def test_discover(mocker, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        (tempdir / "sample-1.in").write_bytes(b"1\n")
+        (tempdir / "sample-1.out").write_bytes(b"1\n")
+        (tempdir / "sample-2.in").write_bytes(b"2\n")
+        (tempdir / "sample-2.in~").write_bytes(b"2\n")
+        (tempdir / "sample-3.txt").write_bytes(b"unknown\n")
+        (tempdir / "in").mkdir()
+        (tempdir / "out").mkdir()
+        (tempdir / "in" / "random_01.txt").write_bytes(b"3\n")
+        (tempdir / "out" / "random_01.txt").write_bytes(b"3\n")
+        (tempdir / "in" / "random_02.txt").write_bytes(b"4\n")
+
+        mtime = tempdir.stat().st_mtime_ns
+        testcases = discovery.discover(tempdir, "sample%s.%e")
+        assert [(t.name, t.in_path, t.out_path) for t in testcases] == [
+            (
+                "random_01",
+                tempdir / "in" / "random_01.txt",
+                tempdir / "out" / "random_01.txt",
+            ),
+            ("random_02", tempdir / "in" / "random_02.txt", None),
+            ("sample-1", tempdir / "sample-1.in", tempdir / "sample-1.out"),
+            ("sample-2", tempdir / "sample-2.in", None),
+        ]
+        # the index is saved out of the test directory
+        assert discovery.index_path(tempdir).exists()
+        assert discovery.index_path(tempdir).parent == tmp_path / "judge" / "discovery"
+        assert not any(p.name.startswith(".") for p in tempdir.iterdir())
+        assert tempdir.stat().st_mtime_ns == mtime
+
+        # the cached index is used without scanning
+        spy = mocker.spy(discovery, "_scan")
+        cached = discovery.discover(tempdir, "sample%s.%e")
+        assert list(cached) == list(testcases)
+        assert spy.call_count == 0
+
+        # invalidated by adding files. wait for the coarse timestamp of the filesystem
+        time.sleep(0.05)
+        (tempdir / "in" / "random_03.txt").write_bytes(b"5\n")
+        testcases = discovery.discover(tempdir, "sample%s.%e")
+        assert len(testcases) == 5
+        assert spy.call_count > 0
+        assert testcases[2].name == "random_03"
@@ -0,0 +1,36 @@
+import pytest
+from onlinejudge.type import TestCase as OJTestCase
+
+from judge.tools.download import SaveArgs, save
+
+
+def _testcases(*outputs: bytes):
+    return [
+        OJTestCase(f"sample-{i}", f"{i}.in", b"1\n", f"{i}.out", output)
+        for i, output in enumerate(outputs, 1)
+    ]
+
+
+@pytest.mark.offline
+def test_save_unchanged(tmp_path):
+    args = SaveArgs(format="sample-%i.%e", directory=tmp_path / "tests")
+    assert len(save(_testcases(b"1\n", b"2\n"), args)) == 4
+    mtime = (tmp_path / "tests" / "sample-1.in").stat().st_mtime_ns
+    assert save(_testcases(b"1\n", b"2\n"), args) == []
+    assert (tmp_path / "tests" / "sample-1.in").stat().st_mtime_ns == mtime
+
+    # nothing is written if any file conflicts
+    with pytest.raises(FileExistsError):
+        save(_testcases(b"1\n", b"3\n", b"4\n"), args)
+    assert not (tmp_path / "tests" / "sample-3.in").exists()
+
+
+@pytest.mark.offline
+def test_save_sync(tmp_path):
+    args = SaveArgs(format="sample-%i.%e", directory=tmp_path, sync=True)
+    save(_testcases(b"1\n", b"2\n"), args)
+    saved = save(_testcases(b"1\n", b"3\n"), args)
+    assert saved == [tmp_path / "sample-2.out"]
+    assert (tmp_path / "sample-2.out").read_bytes() == b"3\n"
+    # no temporary files are left
+    assert len(list(tmp_path.iterdir())) == 4
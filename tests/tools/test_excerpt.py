@@ -0,0 +1,41 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from judge.tools import excerpt
+
+LIMITS = excerpt.ExcerptLimits(
+    head_lines=3, tail_lines=2, head_bytes=100, tail_bytes=50
+)
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"", ""),
+        (b"123\n456\n", "123\n456\n"),
+        (b"0\n1\n2\n3\n4\n", "0\n1\n2\n3\n4\n"),
+        (
+            b"".join(b"%d\n" % i for i in range(10)),
+            "0\n1\n2\n... (10 bytes omitted) ...\n8\n9\n",
+        ),
+        (
+            b"".join(b"%d\n" % i for i in range(1000)),
+            "0\n1\n2\n... (3876 bytes omitted) ...\n998\n999\n",
+        ),
+        (b"x" * 300, "x" * 100 + "\n... (150 bytes omitted) ...\n" + "x" * 50),
+    ],
+)
+def test_excerpt(data: bytes, expected: str):
+    assert excerpt.excerpt(data, LIMITS) == expected
+    with tempfile.TemporaryDirectory() as _tempdir:
+        path = Path(_tempdir) / "data"
+        path.write_bytes(data)
+        assert excerpt.excerpt_file(path, LIMITS) == expected
+    # read by small chunks not to keep the whole data
+    with mock.patch.object(excerpt, "CHUNK_SIZE", 7):
+        assert excerpt.excerpt_stream(io.BytesIO(data), LIMITS) == expected
@@ -67,3 +67,13 @@ def test_collect_testcase():
                     tempdir / "dummy.txt",
                 ]
             )
+
+        rels = format.construct_relationship_of_files(
+            [
+                tempdir / "sample-1.in",
+                tempdir / "sample-1.out",
+                tempdir / "dummy.txt",
+            ],
+            strict=False,
+        )
+        assert [rel.name for rel in rels] == ["sample-1"]
@@ -0,0 +1,67 @@
+from collections import Counter
+
+import pytest
+import requests
+
+from judge.tools.httpcache import CACHE_STATUS, ResponseCache
+
+
+@pytest.fixture
+def server(local_server):
+    pages = {"/problem": (b"v1", '"1"')}
+    statuses = Counter()
+
+    def respond(request):
+        body, etag = pages[request.path]
+        if request.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        else:
+            status = 200
+        statuses[status] += 1
+        return status, {"ETag": etag}, body
+
+    yield f"{local_server(respond)}/problem", pages, statuses
+
+
+@pytest.mark.offline
+def test_cached(tmp_path, server):
+    url, pages, statuses = server
+    parsed = []
+
+    def parse(session):
+        resp = session.get(url)
+        parsed.append(resp.headers[CACHE_STATUS])
+        return resp.content.decode()
+
+    def download(offline=False):
+        cache = ResponseCache(tmp_path, offline=offline)
+        with requests.Session() as session:
+            cache.mount(session)
+            return cache.cached(url, session, lambda: parse(session))
+
+    assert download() == "v1"
+    assert download() == "v1"
+    # revalidated without parsing
+    assert parsed == ["miss"]
+    assert statuses == {200: 1, 304: 1}
+
+    pages["/problem"] = (b"v2", '"2"')
+    assert download() == "v2"
+    assert parsed == ["miss", "fresh"]
+    assert statuses == {200: 2, 304: 1}
+
+    # no requests in offline mode
+    statuses.clear()
+    assert download(offline=True) == "v2"
+    assert not statuses
+
+
+@pytest.mark.offline
+def test_offline_not_cached(tmp_path, server):
+    url, _, statuses = server
+    cache = ResponseCache(tmp_path, offline=True)
+    with requests.Session() as session:
+        cache.mount(session)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            cache.cached(url, session, lambda: session.get(url))
+    assert not statuses
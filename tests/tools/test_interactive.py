@@ -0,0 +1,122 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import CompareMode, JudgeStatus
+from judge.tools import testing
+from judge.tools.interactive import Transcript, exec_interactive
+
+# the solution answers the double of each query until -1
+INTERACTOR = """\
+import sys
+q = int(open(sys.argv[1]).read())
+for i in range(q):
+    print(i, flush=True)
+    x = int(input())
+    if x != 2 * i:
+        print(f"wrong answer for {i}: {x}", file=sys.stderr)
+        sys.exit(1)
+print(-1, flush=True)
+"""
+
+SOLUTION = """\
+import sys
+while True:
+    x = int(sys.stdin.readline())
+    if x < 0:
+        break
+    print({}, flush=True)
+print("done", file=sys.stderr)
+"""
+
+
+@pytest.fixture
+def tempdir():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        (tempdir / "interactor.py").write_text(INTERACTOR)
+        (tempdir / "ac.py").write_text(SOLUTION.format("2 * x"))
+        (tempdir / "wa.py").write_text(SOLUTION.format("2 * x + (x == 3)"))
+        yield tempdir
+
+
+@pytest.mark.offline
+def test_transcript():
+    transcript = Transcript()
+    transcript.write(b"< ", b"1\n2")
+    transcript.write(b"> ", b"3\n")
+    transcript.write(b"< ", b"\n4")
+    assert transcript.getvalue() == b"< 1\n> 3\n< 2\n< 4\n"
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("transcript", [False, True])
+def test_exec_interactive(tempdir, transcript):
+    input_path = tempdir / "sample-1.in"
+    input_path.write_text("10000\n")
+    interactor = f"python3 {tempdir / 'interactor.py'}"
+
+    history = exec_interactive(
+        f"python3 {tempdir / 'ac.py'}",
+        interactor,
+        input_path,
+        timeout=10000,
+        transcript=transcript,
+    )
+    assert history.returncode == 0
+    assert history.interactor_returncode == 0
+    assert history.stderr == b"done\n"
+    if transcript:
+        assert history.transcript is not None
+        assert history.transcript.startswith(b"< 0\n> 0\n< 1\n> 2\n")
+        assert history.transcript.endswith(b"< 9999\n> 19998\n< -1\n")
+    else:
+        assert history.transcript is None
+
+    history = exec_interactive(
+        f"python3 {tempdir / 'wa.py'}",
+        interactor,
+        input_path,
+        timeout=10000,
+        transcript=transcript,
+    )
+    assert history.interactor_returncode == 1
+    assert history.message == b"wrong answer for 3: 7\n"
+
+    history = exec_interactive(
+        "python3 -c 'import time; time.sleep(10)'",
+        interactor,
+        input_path,
+        timeout=200,
+        transcript=transcript,
+    )
+    assert history.returncode is None
+    assert history.elapsed < 5000
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_testing_interactive(tempdir, job):
+    (tempdir / "sample-1.in").write_text("5\n")
+    (tempdir / "sample-2.in").write_text("2\n")
+    testcases = testing.get_testcases(
+        testing.GetTestCasesArgs(test=None, directory=tempdir, format="sample%s.%e")
+    )
+    args = testing.TestingArgs(
+        testcases=testcases,
+        command=f"python3 {tempdir / 'wa.py'}",
+        gnu_time=None,
+        mle=None,
+        tle=None,
+        compare_mode=CompareMode.EXACT_MATCH,
+        jobs=job,
+        interactor=f"python3 {tempdir / 'interactor.py'}",
+        transcript=True,
+    )
+    histories = {h.testcase.name: h for h in testing.test(args)}
+    assert histories["sample-1"].status == JudgeStatus.WA
+    assert histories["sample-1"].checker_message == "wrong answer for 3: 7\n"
+    assert histories["sample-1"].output.endswith(b"< 3\n> 7\n")
+    assert histories["sample-2"].status == JudgeStatus.AC
+    assert histories["sample-2"].output == b"< 0\n> 0\n< 1\n> 2\n< -1\n"
@@ -0,0 +1,75 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import JudgeStatus
+from judge.tools import memprofile
+
+
+@pytest.mark.offline
+def test_select_targets(make_history):
+    histories = [
+        make_history("sample-1", JudgeStatus.AC, memory=10),
+        make_history("sample-2", JudgeStatus.AC, memory=30),
+        make_history("sample-3", JudgeStatus.AC, memory=None),
+    ]
+    assert [h.testcase.name for h in memprofile.select_targets(histories)] == [
+        "sample-2"
+    ]
+
+    histories.append(make_history("sample-4", JudgeStatus.MLE, memory=20))
+    assert [h.testcase.name for h in memprofile.select_targets(histories)] == [
+        "sample-4"
+    ]
+
+    assert not memprofile.select_targets(
+        [make_history("a", JudgeStatus.AC, memory=None)]
+    )
+
+
+@pytest.mark.offline
+def test_memprofile(make_history):
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        solution = tempdir / "solve.py"
+        with solution.open("w") as f:
+            f.write(
+                "n = int(input())\n"
+                "dp = [[0] * n for _ in range(n)]\n"
+                "print(len(dp))\n"
+            )
+        in_path = tempdir / "sample-1.in"
+        with in_path.open("wb") as f:
+            f.write(b"1000\n")
+
+        result = memprofile.memprofile(
+            memprofile.MemProfileArgs(
+                history=make_history(
+                    "sample-1", JudgeStatus.MLE, memory=10, in_path=in_path
+                ),
+                command=f"python3 {solution}",
+                directory=tempdir,
+                tle=1e5,
+            )
+        )
+        assert result.error is None
+        assert result.snapshot_path.exists()
+        assert result.peak is not None and result.peak > 8 * 1000 * 1000
+        stats = result.statistics()
+        assert stats
+        top = stats[0].traceback[0]
+        assert top.filename == str(solution)
+        assert top.lineno == 2
+
+        # PyPy3 is not supported
+        result = memprofile.memprofile(
+            memprofile.MemProfileArgs(
+                history=make_history(
+                    "sample-1", JudgeStatus.MLE, memory=10, in_path=in_path
+                ),
+                command=f"pypy3 {solution}",
+                directory=tempdir,
+            )
+        )
+        assert result.error is not None
@@ -0,0 +1,98 @@
+import concurrent.futures
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import CompareMode, JudgeStatus
+from judge.tools import minimize
+
+
+class HeaderReducer(minimize.LineReducer):
+    """the first line is the number of following lines"""
+
+    def split(self, data):
+        return super().split(data)[1:]
+
+    def join(self, parts):
+        return f"{len(parts)}\n".encode() + b"".join(parts)
+
+
+@pytest.mark.offline
+def test_reducers():
+    assert minimize.LineReducer().split(b"1\n2 3\n") == [b"1\n", b"2 3\n"]
+    parts = minimize.TokenReducer().split(b"1\n2  3\n")
+    assert parts == [b"1", b"\n2", b"  3\n"]
+    assert minimize.TokenReducer().join(parts) == b"1\n2  3\n"
+
+    assert isinstance(minimize.load_reducer("line"), minimize.LineReducer)
+    assert isinstance(
+        minimize.load_reducer("judge.tools.minimize:TokenReducer"),
+        minimize.TokenReducer,
+    )
+    with pytest.raises(ValueError):
+        minimize.load_reducer("unknown")
+    with pytest.raises(TypeError):
+        minimize.load_reducer("judge.schema:History")
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [1, 4])
+def test_ddmin(job):
+    def is_failing(parts):
+        return 13 in parts and 57 in parts
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=job) as executor:
+        assert minimize.ddmin(list(range(100)), is_failing, executor) == [13, 57]
+        assert minimize.ddmin([1], is_failing, executor) == [1]
+
+
+@pytest.mark.offline
+def test_minimize():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        ref = tempdir / "ref.py"
+        with ref.open("w") as f:
+            f.write("import sys\nprint(sum(map(int, sys.stdin.read().split()[1:])))\n")
+        sol = tempdir / "sol.py"
+        with sol.open("w") as f:
+            # wrong if 7 is included
+            f.write(
+                "import sys\n"
+                "a = list(map(int, sys.stdin.read().split()[1:]))\n"
+                "print(sum(a) + (7 in a))\n"
+            )
+        data = b"8\n" + b"".join(f"{i}\n".encode() for i in range(1, 9))
+        args = minimize.MinimizeArgs(
+            command=f"python3 {sol}",
+            status=JudgeStatus.WA,
+            compare_mode=CompareMode.EXACT_MATCH,
+            reference=f"python3 {ref}",
+            jobs=4,
+            tle=1e5,
+        )
+        assert minimize.build_verdict(args)(data) == JudgeStatus.WA
+        minimized = minimize.minimize(data, [HeaderReducer()], args)
+        assert minimized == b"1\n7\n"
+
+
+@pytest.mark.offline
+def test_hanging_reference():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        ref = tempdir / "ref.py"
+        with ref.open("w") as f:
+            # loops forever for the input without 7
+            f.write(
+                "import sys\nwhile b'7' not in sys.stdin.buffer.read():\n    pass\n"
+            )
+        args = minimize.MinimizeArgs(
+            command=f"python3 {ref}",
+            status=JudgeStatus.WA,
+            compare_mode=CompareMode.EXACT_MATCH,
+            reference=f"python3 {ref}",
+            tle=50,
+        )
+        assert minimize.run_reference(b"7\n", args) == b""
+        assert minimize.run_reference(b"1\n", args) is None
+        assert minimize.build_verdict(args)(b"1\n") is None
@@ -0,0 +1,75 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import JudgeStatus
+from judge.tools import profile
+
+
+@pytest.mark.offline
+def test_select_targets(make_history):
+    histories = [
+        make_history("sample-1", JudgeStatus.AC, elapsed=10),
+        make_history("sample-2", JudgeStatus.TLE, elapsed=30),
+        make_history("sample-3", JudgeStatus.TLE, elapsed=20),
+    ]
+    assert [h.testcase.name for h in profile.select_targets(histories, "slowest")] == [
+        "sample-2"
+    ]
+    assert [h.testcase.name for h in profile.select_targets(histories, "tle")] == [
+        "sample-2",
+        "sample-3",
+    ]
+    assert [h.testcase.name for h in profile.select_targets(histories, "sample-1")] == [
+        "sample-1"
+    ]
+    assert not profile.select_targets(histories, "sample-4")
+    assert not profile.select_targets([], "slowest")
+
+
+@pytest.mark.offline
+def test_bootstrap_command():
+    command = profile.bootstrap_command("python3 a.py", "print(1)", Path("out"))
+    assert command == "python3 -c 'print(1)' out a.py"
+
+    with pytest.raises(ValueError):
+        profile.bootstrap_command("./a.out", "print(1)", Path("out"))
+
+
+@pytest.mark.offline
+def test_profile(make_history):
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        solution = tempdir / "solve.py"
+        with solution.open("w") as f:
+            f.write(
+                "def fib(n):\n"
+                "    return n if n < 2 else fib(n - 1) + fib(n - 2)\n"
+                "print(fib(int(input())))\n"
+            )
+        in_path = tempdir / "sample-1.in"
+        with in_path.open("wb") as f:
+            f.write(b"18\n")
+
+        result = profile.profile(
+            profile.ProfileArgs(
+                history=make_history(
+                    "sample-1", JudgeStatus.AC, elapsed=10, in_path=in_path
+                ),
+                command=f"python3 {solution}",
+                directory=tempdir,
+                tle=1e5,
+            )
+        )
+        assert result.error is None
+        assert result.stats is not None
+        assert result.pstats_path.exists()
+        assert result.collapsed_path is not None
+        with result.collapsed_path.open() as f:
+            stacks = f.read().splitlines()
+        assert any("fib (solve.py:1)" in stack for stack in stacks)
+        for stack in stacks:
+            key, weight = stack.rsplit(" ", 1)
+            assert key
+            assert int(weight) > 0
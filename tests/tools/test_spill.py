@@ -0,0 +1,61 @@
+import gc
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import CompareMode, History, JudgeStatus, TestCasePath
+from judge.tools import spill, testing
+
+
+@pytest.mark.offline
+def test_spill_store():
+    store = spill.SpillStore(threshold=4)
+    directory = store.directory
+    assert store.put(b"1234") == b"1234"
+
+    spilled = store.put(b"12345")
+    assert isinstance(spilled, spill.SpilledOutput)
+    history = History(
+        JudgeStatus.AC,
+        TestCasePath("case 1"),
+        output=spilled,
+        exitcode=0,
+        elapsed=10,
+    )
+    assert history.output == b"12345"
+    assert history.output_size == 5
+    assert history.output_path is not None
+    assert history.output_path.parent == directory
+
+    # the directory is alive while the spilled outputs are referenced
+    del store, spilled
+    gc.collect()
+    assert directory.exists()
+    del history
+    gc.collect()
+    assert not directory.exists()
+
+
+@pytest.mark.offline
+def test_testing_spill():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        (tempdir / "sample-1.in").write_bytes(b"3\n")
+        (tempdir / "sample-1.out").write_bytes(b"0\n1\n2\n")
+        testcases = testing.get_testcases(
+            testing.GetTestCasesArgs(test=None, directory=tempdir, format="sample%s.%e")
+        )
+        args = testing.TestingArgs(
+            testcases=testcases,
+            command="python3 -c 'print(*range(int(input())), sep=chr(10))'",
+            gnu_time=None,
+            mle=None,
+            tle=None,
+            compare_mode=CompareMode.EXACT_MATCH,
+            spill_threshold=4,
+        )
+        (history,) = testing.test(args)
+        assert history.status == JudgeStatus.AC
+        assert history.output_path is not None
+        assert history.output == b"0\n1\n2\n"
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+from onlinejudge.type import TestCase as OJTestCase
+
+from judge.schema import CompareMode, JudgeStatus
+from judge.tools import testing
+from judge.tools.download import SaveArgs, save
+from judge.tools.store import TestCaseStore as Store
+from judge.tools.store import find_duplicates
+
+
+@pytest.mark.offline
+def test_store_link(tmp_path):
+    store = Store(tmp_path / "store")
+    first = tmp_path / "abc001_a"
+    second = tmp_path / "abc001_a-copy"
+    testcases = [
+        OJTestCase("sample-1", "1.in", b"1\n", "1.out", b"1\n"),
+        OJTestCase("sample-2", "2.in", b"1\n", "2.out", b"2\n"),
+    ]
+    for directory in (first, second):
+        save(
+            testcases, SaveArgs(format="sample-%i.%e", directory=directory, store=store)
+        )
+
+    inputs = [d / f"sample-{i}.in" for d in (first, second) for i in (1, 2)]
+    assert all(path.read_bytes() == b"1\n" for path in inputs)
+    assert len({path.stat().st_ino for path in inputs}) == 1
+    # objects for "1\n" and "2\n"
+    assert len([p for p in (tmp_path / "store").glob("*/*")]) == 2
+
+    # objects are not changed through the links. root can write read-only files
+    if os.geteuid() != 0:
+        with pytest.raises(PermissionError):
+            inputs[0].write_bytes(b"2\n")
+
+
+@pytest.mark.offline
+def test_find_duplicates(tmp_path):
+    store = Store(tmp_path / "store")
+    store.link(b"1\n", tmp_path / "a.in")
+    store.link(b"1\n", tmp_path / "b.in")
+    (tmp_path / "c.in").write_bytes(b"1\n")
+    (tmp_path / "d.in").write_bytes(b"2\n")
+    (tmp_path / "e.in").write_bytes(b"10\n")
+    duplicates = find_duplicates(
+        tmp_path / name for name in ("a.in", "b.in", "c.in", "d.in", "e.in")
+    )
+    assert duplicates == {
+        tmp_path / "b.in": tmp_path / "a.in",
+        tmp_path / "c.in": tmp_path / "a.in",
+    }
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_dedupe_executions(tmp_path, job):
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    for i, (data, expected) in enumerate(
+        [(b"1\n", b"1\n"), (b"1\n", b"2\n"), (b"3\n", b"3\n")]
+    ):
+        (tests / f"sample-{i}.in").write_bytes(data)
+        (tests / f"sample-{i}.out").write_bytes(expected)
+    log = tmp_path / "log"
+    testcases = testing.get_testcases(
+        testing.GetTestCasesArgs(test=None, directory=tests, format="sample%s.%e")
+    )
+    args = testing.TestingArgs(
+        testcases=testcases,
+        command=f"sh -c 'echo >> {log}; cat'",
+        gnu_time=None,
+        mle=None,
+        tle=None,
+        compare_mode=CompareMode.EXACT_MATCH,
+        jobs=job,
+        dedupe=True,
+    )
+    statuses = {h.testcase.name: h.status for h in testing.test(args)}
+    assert statuses == {
+        "sample-0": JudgeStatus.AC,
+        "sample-1": JudgeStatus.WA,
+        "sample-2": JudgeStatus.AC,
+    }
+    assert log.read_text().count("\n") == 2
+
+    log.unlink()
+    args.dedupe = False
+    list(testing.test(args))
+    assert log.read_text().count("\n") == 3
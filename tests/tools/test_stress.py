@@ -0,0 +1,115 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from judge.schema import CompareMode, JudgeStatus
+from judge.tools import stress
+
+
+def write(path: Path, body: str) -> Path:
+    with path.open("w") as f:
+        f.write(body)
+    return path
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 4])
+def test_stress(job):
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        gen = write(
+            tempdir / "gen.py",
+            "import random, sys\n"
+            "random.seed(int(sys.argv[1]))\n"
+            "print(*[random.randint(0, 9) for _ in range(3)])\n",
+        )
+        ref = write(tempdir / "ref.py", "print(sum(map(int, input().split())))\n")
+        good = write(
+            tempdir / "good.py",
+            "a, b, c = map(int, input().split())\nprint(a + b + c)\n",
+        )
+        bad = write(
+            tempdir / "bad.py",
+            "a, b, c = map(int, input().split())\nprint(a + b + c if a != 0 else 0)\n",
+        )
+
+        args = stress.StressArgs(
+            generator=f"python3 {gen}",
+            reference=f"python3 {ref}",
+            command=f"python3 {good}",
+            iterations=20,
+            compare_mode=CompareMode.EXACT_MATCH,
+            jobs=job,
+            tle=1e5,
+        )
+        cases = list(stress.stress(args))
+        assert len(cases) == 20
+        assert sorted(case.seed for case in cases) == list(range(20))
+        assert all(case.status == JudgeStatus.AC for case in cases)
+
+        args.command = f"python3 {bad}"
+        args.iterations = 200
+        cases = list(stress.stress(args))
+        failures = [case for case in cases if case.status != JudgeStatus.AC]
+        assert len(failures) == 1
+        assert failures[0].status == JudgeStatus.WA
+        assert failures[0].input.startswith(b"0 ")
+
+        saved = stress.save_failures(failures, "sample-stress%i.%e", tempdir / "tests")
+        assert [path.name for path in saved] == [
+            "sample-stress1.in",
+            "sample-stress1.out",
+        ]
+        saved = stress.save_failures(failures, "sample-stress%i.%e", tempdir / "tests")
+        assert [path.name for path in saved] == [
+            "sample-stress2.in",
+            "sample-stress2.out",
+        ]
+        with saved[0].open("rb") as f:
+            assert f.read() == failures[0].input
+        with saved[1].open("rb") as f:
+            assert f.read() == failures[0].expected
+
+
+@pytest.mark.offline
+def test_stress_broken_generator():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        gen = write(tempdir / "gen.py", "raise SystemExit(1)\n")
+        ref = write(tempdir / "ref.py", "print(input())\n")
+        args = stress.StressArgs(
+            generator=f"python3 {gen}",
+            reference=f"python3 {ref}",
+            command=f"python3 {ref}",
+            iterations=3,
+            compare_mode=CompareMode.EXACT_MATCH,
+        )
+        with pytest.raises(stress.StressError):
+            list(stress.stress(args))
+
+
+@pytest.mark.offline
+def test_stress_hanging_reference():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        gen = write(tempdir / "gen.py", "print(1)\n")
+        ref = write(tempdir / "ref.py", "while True:\n    pass\n")
+        args = stress.StressArgs(
+            generator=f"python3 {gen}",
+            reference=f"python3 {ref}",
+            command=f"python3 {gen}",
+            iterations=1,
+            compare_mode=CompareMode.EXACT_MATCH,
+            tle=50,
+        )
+        with pytest.raises(stress.StressError, match="Timeout"):
+            list(stress.stress(args))
+
+
+@pytest.mark.offline
+def test_run_command_without_input():
+    # the generator doesn't read stdin of the judge
+    command = "python3 -c 'import sys; print(len(sys.stdin.read()))'"
+    assert stress.run_command(command, None, None) == b"0\n"
+    assert stress.run_command(command, b"123", None) == b"3\n"
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import zipfile
+
+import pytest
+import requests
+
+from judge.tools.system import (
+    RemoteFile,
+    VerificationError,
+    dropbox_content_hash,
+    extract_yukicoder_archive,
+    fetch,
+)
+
+BODY = os.urandom(300_000)
+
+
+@pytest.fixture
+def server(local_server):
+    ranges = []
+
+    def respond(request):
+        ranges.append(request.headers.get("Range"))
+        if request.path == "/resumable" and request.headers.get("Range"):
+            start = int(request.headers["Range"][len("bytes=") : -1])
+            content_range = f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"
+            return 206, {"Content-Range": content_range}, BODY[start:]
+        return 200, {}, BODY
+
+    yield local_server(respond), ranges
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("resumable", [True, False])
+def test_fetch_resume(tmp_path, server, resumable):
+    origin, ranges = server
+    url = f"{origin}/{'resumable' if resumable else 'plain'}"
+    # left by the interrupted download
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / ".01.txt.part").write_bytes(BODY[:1000])
+
+    with requests.Session() as session:
+        path = fetch(session, RemoteFile(path="in/01.txt", url=url), tmp_path)
+        assert path.read_bytes() == BODY
+        assert ranges == ["bytes=1000-"]
+        assert sorted(p.name for p in (tmp_path / "in").iterdir()) == ["01.txt"]
+
+        # downloaded files are skipped
+        fetch(session, RemoteFile(path="in/01.txt", url=url), tmp_path)
+        assert len(ranges) == 1
+
+
+@pytest.mark.offline
+def test_fetch_verify(tmp_path, server):
+    origin, _ = server
+    with requests.Session() as session:
+        with pytest.raises(VerificationError):
+            fetch(
+                session,
+                RemoteFile(path="01.txt", url=f"{origin}/plain", size=len(BODY) + 1),
+                tmp_path,
+            )
+        with pytest.raises(VerificationError):
+            fetch(
+                session,
+                RemoteFile(path="01.txt", url=f"{origin}/plain", content_hash="0" * 64),
+                tmp_path,
+            )
+        # broken files are not resumed
+        assert not list(tmp_path.iterdir())
+
+        remote = RemoteFile(path="01.txt", url=f"{origin}/plain", size=len(BODY))
+        remote.content_hash = hashlib.sha256(hashlib.sha256(BODY).digest()).hexdigest()
+        assert fetch(session, remote, tmp_path).read_bytes() == BODY
+
+
+@pytest.mark.offline
+def test_dropbox_content_hash(tmp_path):
+    path = tmp_path / "data"
+    data = os.urandom((4 << 20) + 10)
+    path.write_bytes(data)
+    expected = hashlib.sha256(
+        hashlib.sha256(data[: 4 << 20]).digest()
+        + hashlib.sha256(data[4 << 20 :]).digest()
+    ).hexdigest()
+    assert dropbox_content_hash(path) == expected
+
+
+@pytest.mark.offline
+def test_extract_yukicoder_archive(tmp_path):
+    path = tmp_path / ".system.zip"
+    with zipfile.ZipFile(str(path), "w") as zf:
+        zf.writestr("test_in/01.txt", b"1\n")
+        zf.writestr("test_out/01.txt", b"2\n")
+        zf.writestr("garbage/01.txt", b"\n")
+    paths = extract_yukicoder_archive(path, tmp_path)
+    assert paths == [tmp_path / "in" / "01.txt", tmp_path / "out" / "01.txt"]
+    assert (tmp_path / "out" / "01.txt").read_bytes() == b"2\n"
+    assert not (tmp_path / "garbage").exists()
@@ -167,35 +167,98 @@ def test_mode_only_exact(job):
 
         # ignore CRLF
         helper(
-            br'print("1 1\r\n2 2\r\n")',
+            rb'print("1 1\r\n2 2\r\n")',
             CompareMode.CRLF_INSENSITIVE_EXACT_MATCH,
             testing.JudgeStatus.AC,
         )
 
         # not ignore extra spaces
         helper(
-            br'print("1     1\n2 2\n")',
+            rb'print("1     1\n2 2\n")',
             CompareMode.CRLF_INSENSITIVE_EXACT_MATCH,
             testing.JudgeStatus.WA,
         )
 
         # ignore extra spaces
         helper(
-            br'print("1     1\r\n2 2\r\n")',
+            rb'print("1     1\r\n2 2\r\n")',
             CompareMode.IGNORE_SPACES,
             testing.JudgeStatus.AC,
         )
 
         # cannot ignore extra newlines
         helper(
-            br'print("1     1\r\n\r\n2 2")',
+            rb'print("1     1\r\n\r\n2 2")',
             CompareMode.IGNORE_SPACES,
             testing.JudgeStatus.WA,
         )
 
         # ignore extra newlines
         helper(
-            br'print("1     1\r\n\r\n2 2")',
+            rb'print("1     1\r\n\r\n2 2")',
             CompareMode.IGNORE_SPACES_AND_NEWLINES,
             testing.JudgeStatus.AC,
         )
+
+
+@pytest.mark.offline
+def test_mismatch():
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        with (tempdir / "sample-1.in").open("wb") as f:
+            f.write(b"1 2\n")
+        with (tempdir / "sample-1.out").open("wb") as f:
+            f.write(b"1\n3\n")
+        testcases = testing.get_testcases(
+            testing.GetTestCasesArgs(test=None, directory=tempdir, format="sample%s.%e")
+        )
+        args = testing.TestingArgs(
+            testcases=testcases,
+            command="python3 -c 'print(*input().split(), sep=chr(10))'",
+            gnu_time=None,
+            mle=None,
+            tle=None,
+            compare_mode=CompareMode.EXACT_MATCH,
+        )
+        (history,) = testing.test(args)
+        assert history.status == testing.JudgeStatus.WA
+        assert history.mismatch is not None
+        assert (history.mismatch.line, history.mismatch.column) == (2, 1)
+        assert (history.mismatch.actual, history.mismatch.expected) == (b"2", b"3")
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_special_judge(job):
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        # any pair (a, b) such that a + b = n is accepted
+        checker = tempdir / "checker.py"
+        with checker.open("w") as f:
+            f.write(
+                "import sys\n"
+                "n = int(open(sys.argv[1]).read())\n"
+                "a, b = map(int, open(sys.argv[2]).read().split())\n"
+                "sys.exit(0 if a + b == n else 1)\n"
+            )
+        for i, n in enumerate([3, 4, 5]):
+            with (tempdir / f"sample-{i}.in").open("wb") as f:
+                f.write(b"%d\n" % n)
+        testcases = testing.get_testcases(
+            testing.GetTestCasesArgs(test=None, directory=tempdir, format="sample%s.%e")
+        )
+        args = testing.TestingArgs(
+            testcases=testcases,
+            command="python3 -c 'n = int(input()); print(n // 2, n - n // 2 - (n == 5))'",
+            gnu_time=None,
+            mle=None,
+            tle=None,
+            compare_mode=CompareMode.EXACT_MATCH,
+            jobs=job,
+            judge=f"python3 {checker}",
+        )
+        histories = {h.testcase.name: h for h in testing.test(args)}
+        assert histories["sample-0"].status == testing.JudgeStatus.AC
+        assert histories["sample-1"].status == testing.JudgeStatus.AC
+        assert histories["sample-2"].status == testing.JudgeStatus.WA
+        assert all(h.checker_elapsed is not None for h in histories.values())
@@ -0,0 +1,95 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from judge.schema import CompareMode
+from judge.testing import main
+from judge.tools import testing
+from judge.tools.trace import Tracer, span, tracer
+
+
+@pytest.mark.offline
+def test_tracer_disabled():
+    _tracer = Tracer()
+    with _tracer.span("nothing"):
+        pass
+    assert not _tracer.events()
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("job", [None, 2])
+def test_trace_export(job):
+    with tempfile.TemporaryDirectory() as _tempdir:
+        tempdir = Path(_tempdir)
+        for i in range(3):
+            # distinct inputs not to share executions
+            with (tempdir / f"sample-{i}.in").open("wb") as f:
+                f.write(b"%d\n" % i)
+            with (tempdir / f"sample-{i}.out").open("wb") as f:
+                f.write(b"%d\n" % i)
+
+        tracer.enable()
+        try:
+            with span("load config"):
+                pass
+            testcases = testing.get_testcases(
+                testing.GetTestCasesArgs(
+                    test=None, directory=tempdir, format="sample%s.%e"
+                )
+            )
+            args = testing.TestingArgs(
+                testcases=testcases,
+                command="python3 -c 'print(input())'",
+                gnu_time=None,
+                mle=None,
+                tle=1e6,
+                compare_mode=CompareMode.EXACT_MATCH,
+                jobs=job,
+            )
+            histories = list(testing.test(args))
+            assert len(histories) == 3
+
+            trace_file = tempdir / "trace.json"
+            tracer.export(trace_file)
+        finally:
+            tracer.disable()
+
+        with trace_file.open() as f:
+            events = json.load(f)["traceEvents"]
+        names = [e["name"] for e in events if e["ph"] == "X"]
+        assert names.count("load config") == 1
+        assert names.count("discover") == 1
+        for name in ["case", "spawn", "run", "compare", "locked"]:
+            assert names.count(name) == 3, name
+        for event in events:
+            if event["ph"] == "X":
+                assert event["dur"] >= 0
+        assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in events)
+
+        # the tracer is disabled
+        with span("nothing"):
+            pass
+        assert "nothing" not in [e["name"] for e in tracer.events()]
+
+
+@pytest.mark.offline
+def test_trace_exported_if_aborted(tmp_path):
+    app = typer.Typer()
+    app.command()(main)
+    trace_file = tmp_path / "trace.json"
+    result = CliRunner().invoke(
+        app, [str(tmp_path / "not-exist"), "--trace", str(trace_file)]
+    )
+    assert result.exit_code == 1
+    assert f"Trace is exported: {trace_file}" in result.stdout
+    with trace_file.open() as f:
+        events = json.load(f)["traceEvents"]
+    # the span is never ended
+    assert [(e["ph"], e.get("name")) for e in events if e["ph"] != "M"] == [
+        ("B", "load config")
+    ]
+    assert not tracer.enabled
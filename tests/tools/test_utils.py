@@ -1,9 +1,10 @@
+import os
 import tempfile
 from pathlib import Path
 
 import pytest
 
-from judge.tools.utils import exec_command
+from judge.tools.utils import exec_command, interpreter_version
 
 
 @pytest.mark.offline
@@ -49,3 +50,52 @@ def test_exec_command():
                     stdin=f,
                     gnu_time="gnutime",
                 )
+
+
+@pytest.mark.offline
+def test_interpreter_version(tmp_path, monkeypatch):
+    log = tmp_path / "log"
+    interpreter = tmp_path / "bin" / "python3"
+    interpreter.parent.mkdir()
+    interpreter.write_text(f"#!/bin/sh\necho >> {log}\necho 'Python 3.8.5'\n")
+    interpreter.chmod(0o755)
+    monkeypatch.setenv("PATH", str(interpreter.parent), prepend=os.pathsep)
+
+    cache = tmp_path / "versions.json"
+    for _ in range(2):
+        assert interpreter_version("python3", cache) == "Python 3.8.5"
+    assert log.read_text().count("\n") == 1
+
+    # probed again when the executable is updated
+    interpreter.write_text(f"#!/bin/sh\necho >> {log}\necho 'Python 3.10.0'\n")
+    assert interpreter_version("python3", cache) == "Python 3.10.0"
+    assert interpreter_version("not-exist-interpreter", cache) is None
+
+
+@pytest.mark.offline
+def test_interpreter_version_shim(tmp_path, monkeypatch):
+    # the shim runs the interpreter selected by the environment variable or the version file
+    log = tmp_path / "log"
+    shim = tmp_path / "bin" / "python3"
+    shim.parent.mkdir()
+    shim.write_text(
+        f"#!/bin/sh\necho >> {log}\n"
+        'echo "Python ${PYENV_VERSION:-$(cat .python-version)}"\n'
+    )
+    shim.chmod(0o755)
+    monkeypatch.setenv("PATH", str(shim.parent), prepend=os.pathsep)
+    monkeypatch.setenv("PYENV_ROOT", str(tmp_path / "pyenv"))
+    monkeypatch.delenv("PYENV_VERSION", raising=False)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".python-version").write_text("3.8.5")
+
+    cache = tmp_path / "versions.json"
+    assert interpreter_version("python3", cache) == "Python 3.8.5"
+    assert interpreter_version("python3", cache) == "Python 3.8.5"
+    assert log.read_text().count("\n") == 1
+
+    (tmp_path / ".python-version").write_text("3.9.0")
+    assert interpreter_version("python3", cache) == "Python 3.9.0"
+    monkeypatch.setenv("PYENV_VERSION", "3.10.0")
+    assert interpreter_version("python3", cache) == "Python 3.10.0"
+    assert log.read_text().count("\n") == 3